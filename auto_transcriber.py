@@ -1,40 +1,1366 @@
 import os
 import sys
 import time
+import glob
+import re
+import argparse
+import tempfile
+import queue
+import bisect
+import json
+import hashlib
+import io
+import types
+import contextlib
+import itertools
+import heapq
+import fnmatch
 import threading
-import whisper
-from moviepy.editor import VideoFileClip
-from datetime import timedelta
-
-# Kivy imports
-import kivy
-from kivy.app import App
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.button import Button
-from kivy.uix.label import Label
-from kivy.uix.filechooser import FileChooserListView
-from kivy.uix.progressbar import ProgressBar
-from kivy.uix.dropdown import DropDown
-from kivy.uix.textinput import TextInput
-from kivy.clock import Clock
-from kivy.core.window import Window
-from kivy.properties import StringProperty, BooleanProperty, ObjectProperty
-from kivy.uix.popup import Popup
-from kivy.graphics import Color, Rectangle, Line
-
-# KivyMD imports
-from kivymd.app import MDApp
-from kivymd.uix.button import MDRaisedButton, MDFlatButton
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.boxlayout import MDBoxLayout
-from kivymd.uix.card import MDCard
-from kivymd.uix.label import MDLabel
-from kivymd.uix.progressbar import MDProgressBar
-from kivymd.uix.selectioncontrol import MDSwitch
-from kivymd.uix.filemanager import MDFileManager
-from kivymd.uix.textfield import MDTextField
-
-class Transcriber:
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import subprocess
+import numpy as np
+
+# Ciężkie zależności (whisper/torch, MoviePy, proglog, Kivy) są importowane
+# dopiero przy pierwszym użyciu, aby start programu i `--help` były szybkie
+
+# Rozszerzenia plików wideo obsługiwane przez tryb wsadowy
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".wmv")
+
+# Częstotliwość próbkowania audio oczekiwana przez Whisper
+SAMPLE_RATE = 16000
+
+# Długość okna audio przetwarzanego przez koder Whisper w jednym przebiegu (sekundy)
+WHISPER_WINDOW = 30.0
+
+# Domyślny katalog pamięci podręcznej
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "auto_transcriber")
+
+# Polecenia wiersza poleceń (bez polecenia uruchamiany jest interfejs graficzny)
+CLI_COMMANDS = ("gui", "batch", "serve", "watch", "bench")
+
+def default_output_path(video_path, output_dir=None, extension=".srt"):
+    """Zwraca domyślną ścieżkę pliku napisów obok pliku wideo (lub w output_dir)"""
+    base_name = os.path.splitext(video_path)[0]
+    if output_dir:
+        base_name = os.path.join(output_dir, os.path.basename(base_name))
+    return f"{base_name}{extension}"
+
+
+def frame_energy(audio, frame_length):
+    """Zwraca energię RMS kolejnych ramek audio o długości frame_length próbek"""
+    frame_count = len(audio) // frame_length
+    frames = audio[:frame_count * frame_length].reshape(frame_count, frame_length)
+    # einsum nie tworzy kopii całego nagrania (w przeciwieństwie do frames ** 2)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_length)
+
+
+def split_audio_chunks(audio, chunk_length=600.0, overlap=5.0, search_window=None, sample_rate=SAMPLE_RATE):
+    """Dzieli nagranie na fragmenty o długości do chunk_length sekund, cięte w najcichszych miejscach
+    
+    Zwraca listę krotek (start, end, keep_from, keep_to): granice fragmentu
+    w próbkach (z zakładką overlap) oraz przedział w sekundach, z którego
+    segmenty tego fragmentu trafiają do wyniku.
+    """
+    total = len(audio)
+    if total <= chunk_length * sample_rate:
+        return [(0, total, 0.0, float("inf"))]
+    
+    if search_window is None:
+        search_window = chunk_length / 4
+    
+    # Energia w ramkach 100 ms, wygładzona do ~0,5 s, aby preferować dłuższą ciszę
+    frame_length = sample_rate // 10
+    energy = frame_energy(audio, frame_length)
+    energy = np.convolve(energy, np.ones(5) / 5, mode="same")
+    
+    boundaries = [0]
+    chunk_frames = int(chunk_length * 10)
+    search_frames = int(search_window * 10)
+    while total - boundaries[-1] > chunk_length * sample_rate:
+        target = boundaries[-1] // frame_length + chunk_frames
+        lo = max(boundaries[-1] // frame_length + 1, target - search_frames)
+        quietest = lo + int(np.argmin(energy[lo:target]))
+        boundaries.append(quietest * frame_length + frame_length // 2)
+    boundaries.append(total)
+    
+    half_overlap = int(overlap / 2 * sample_rate)
+    chunks = []
+    for i in range(len(boundaries) - 1):
+        start = max(0, boundaries[i] - half_overlap)
+        end = min(total, boundaries[i + 1] + half_overlap)
+        keep_from = boundaries[i] / sample_rate if i > 0 else 0.0
+        keep_to = boundaries[i + 1] / sample_rate if i < len(boundaries) - 2 else float("inf")
+        chunks.append((start, end, keep_from, keep_to))
+    return chunks
+
+
+def merge_chunk_segments(chunks, chunk_segments, sample_rate=SAMPLE_RATE):
+    """Łączy segmenty fragmentów w jedną oś czasu, usuwając powtórzenia z obszarów zakładki"""
+    merged = []
+    for (start, _end, keep_from, keep_to), segments in zip(chunks, chunk_segments):
+        offset = start / sample_rate
+        for segment in segments:
+            seg_start = segment["start"] + offset
+            seg_end = segment["end"] + offset
+            text = segment["text"].strip()
+            # Segment należy do fragmentu, w którego przedziale leży jego środek
+            if not keep_from <= (seg_start + seg_end) / 2 < keep_to or not text:
+                continue
+            if merged and seg_start < merged[-1]["end"]:
+                if text == merged[-1]["text"]:
+                    continue
+                seg_start = merged[-1]["end"]
+                if seg_start >= seg_end:
+                    continue
+            merged.append({"start": seg_start, "end": seg_end, "text": text})
+    return merged
+
+
+def detect_speech_regions(audio, sample_rate=SAMPLE_RATE, frame_duration=0.03, min_speech=0.25,
+                          min_silence=0.5, padding=0.2):
+    """Wykrywa fragmenty mowy na podstawie energii (bez modelu, tylko NumPy)
+    
+    Próg jest wyznaczany adaptacyjnie między poziomem szumu tła a poziomem
+    głośnych ramek. Zwraca listę (start, end) w próbkach.
+    """
+    frame_length = int(frame_duration * sample_rate)
+    if len(audio) < frame_length:
+        return [(0, len(audio))] if len(audio) else []
+    
+    level = 20 * np.log10(frame_energy(audio, frame_length) + 1e-10)
+    noise_floor = np.percentile(level, 10)
+    speech_level = np.percentile(level, 90)
+    if speech_level < -60:
+        return []
+    if speech_level - noise_floor < 6:
+        # Brak wyraźnej różnicy między tłem a sygnałem - traktujemy wszystko jako mowę
+        return [(0, len(audio))]
+    threshold = max(noise_floor + (speech_level - noise_floor) * 0.3, noise_floor + 6, -60)
+    voiced = level > threshold
+    
+    # Zamiana ramek na przedziały (w ramkach)
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    
+    regions = []
+    gap_frames = min_silence / frame_duration
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < gap_frames:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    
+    min_frames = min_speech / frame_duration
+    pad = int(padding * sample_rate)
+    result = []
+    for start, end in regions:
+        if end - start < min_frames:
+            continue
+        start = max(0, int(start) * frame_length - pad)
+        end = min(len(audio), int(end) * frame_length + pad)
+        if result and start <= result[-1][1]:
+            result[-1] = (result[-1][0], end)
+        else:
+            result.append((start, end))
+    return result
+
+
+def compact_speech(audio, regions, gap=0.3, sample_rate=SAMPLE_RATE):
+    """Skleja fragmenty mowy (rozdzielone krótką ciszą) i zwraca (audio, mapa czasu)
+    
+    Mapa to lista (początek w sklejonym audio, początek w oryginale, długość) w sekundach.
+    """
+    silence = np.zeros(int(gap * sample_rate), dtype=audio.dtype)
+    pieces = []
+    speech_map = []
+    position = 0
+    for start, end in regions:
+        if pieces:
+            pieces.append(silence)
+            position += len(silence)
+        pieces.append(audio[start:end])
+        speech_map.append((position / sample_rate, start / sample_rate, (end - start) / sample_rate))
+        position += end - start
+    if not pieces:
+        return np.zeros(0, dtype=audio.dtype), speech_map
+    return np.concatenate(pieces), speech_map
+
+
+def map_time_to_original(seconds, speech_map, compact_starts=None):
+    """Przelicza czas ze sklejonego audio (compact_speech) na czas oryginalnego nagrania"""
+    if compact_starts is None:
+        compact_starts = [entry[0] for entry in speech_map]
+    index = max(0, bisect.bisect_right(compact_starts, seconds) - 1)
+    compact_start, original_start, length = speech_map[index]
+    return original_start + min(max(seconds - compact_start, 0.0), length)
+
+
+def map_segments_to_original(transcription, speech_map):
+    """Przelicza czasy segmentów ze sklejonego audio na oś czasu oryginalnego nagrania"""
+    compact_starts = [entry[0] for entry in speech_map]
+    return [
+        dict(
+            segment,
+            start=map_time_to_original(segment["start"], speech_map, compact_starts),
+            end=map_time_to_original(segment["end"], speech_map, compact_starts)
+        )
+        for segment in transcription
+    ]
+
+
+def sample_probe_windows(audio, count=3, window=30.0, sample_rate=SAMPLE_RATE):
+    """Wybiera do count okien po window sekund, rozłożonych równomiernie w mowie nagrania
+    
+    Środki okien leżą w równych odstępach czasu mowy (wg detect_speech_regions),
+    więc długa cisza na początku czy końcu nagrania nie trafia do próbek.
+    Zwraca widoki audio (bez kopiowania); pustą listę, gdy nie wykryto mowy.
+    """
+    regions = detect_speech_regions(audio, sample_rate)
+    if not regions:
+        return []
+    cumulative = np.cumsum([end - start for start, end in regions])
+    length = int(window * sample_rate)
+    # Krótkie nagranie nie potrzebuje zachodzących na siebie okien
+    count = min(count, int(np.ceil(cumulative[-1] / length)))
+    starts = set()
+    for k in range(count):
+        target = (k + 0.5) / count * cumulative[-1]
+        i = int(np.searchsorted(cumulative, target))
+        center = regions[i][1] - int(cumulative[i] - target)
+        starts.add(int(max(0, min(center - length // 2, len(audio) - length))))
+    return [audio[start:start + length] for start in sorted(starts)]
+
+
+def format_duration(seconds):
+    """Formatuje czas w sekundach jako HH:MM:SS"""
+    seconds = max(0, int(seconds))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_timestamp(seconds, decimal_marker=","):
+    """Formatuje czas jako HH:MM:SS,mmm (SRT) lub HH:MM:SS.mmm (WebVTT)
+    
+    Liczone na całkowitych milisekundach (bez timedelta), bo formatowanie
+    jest wywoływane dwa razy dla każdego segmentu każdego formatu.
+    """
+    milliseconds = max(0, round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{decimal_marker}{milliseconds:03d}"
+
+
+# Kontekst dekodowania bieżącego wątku (ustawiany przez WhisperBackend.transcribe):
+# callback - odbiorca pozycji dekodowania, cancelled - funkcja sprawdzająca anulowanie
+_decode_context = threading.local()
+
+
+class TranscriptionCancelled(Exception):
+    """Zgłaszany wewnątrz dekodowania lub wyodrębniania audio po anulowaniu operacji"""
+
+
+def _check_cancelled(*args):
+    """Hak przed każdym przebiegiem kodera/dekodera Whisper - przerywa anulowane dekodowanie"""
+    cancelled = getattr(_decode_context, "cancelled", None)
+    if cancelled is not None and cancelled():
+        raise TranscriptionCancelled()
+
+
+def _install_cancel_hooks(model):
+    """Rejestruje sprawdzanie anulowania przed każdym przebiegiem kodera i dekodera (raz na model)"""
+    if getattr(model, "_cancel_hooks_installed", False):
+        return
+    model.encoder.register_forward_pre_hook(_check_cancelled)
+    model.decoder.register_forward_pre_hook(_check_cancelled)
+    model._cancel_hooks_installed = True
+
+
+class _DecodeProgress:
+    """Zastępuje pasek tqdm w whisper.transcribe i przekazuje pozycję dekodowania
+    
+    Whisper wywołuje update() po każdym zdekodowanym oknie, podając liczbę
+    ramek mel (100 na sekundę audio).
+    """
+    
+    def __init__(self, total=None, **kwargs):
+        self.total = total or 0
+        self.position = 0
+        self.listener = getattr(_decode_context, "callback", None)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+    
+    def update(self, frames):
+        self.position += frames
+        if self.listener:
+            self.listener(self.position / 100, self.total / 100)
+
+
+def _install_decode_progress():
+    """Podłącza _DecodeProgress do modułu whisper.transcribe (raz na proces)"""
+    module = sys.modules.get("whisper.transcribe")
+    if module is not None and not isinstance(module.tqdm, types.SimpleNamespace):
+        module.tqdm = types.SimpleNamespace(tqdm=_DecodeProgress)
+
+
+def _state_tensors(value):
+    """Rozwija wartość ze state_dict (tensor lub krotka spakowanych wag) na tensory"""
+    if hasattr(value, "element_size"):
+        yield value
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            yield from _state_tensors(item)
+
+
+def model_memory_size(model):
+    """Szacuje pamięć zajmowaną przez wagi i bufory modelu PyTorch (bajty)
+    
+    Liczone jest state_dict, a nie parameters(), aby uwzględnić spakowane
+    wagi warstw kwantyzowanych, które nie są parametrami modułu.
+    """
+    tensors = itertools.chain.from_iterable(_state_tensors(value) for value in model.state_dict().values())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+def bf16_supported():
+    """Czy procesor wykonuje obliczenia bfloat16 natywnie (AVX512-BF16 / AMX)"""
+    import torch
+    try:
+        return torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def apply_inference_mode(model, mode):
+    """Przygotowuje model Whisper załadowany na CPU do wnioskowania w trybie mode
+    
+    int8 - dynamiczna kwantyzacja wszystkich warstw liniowych (wagi int8,
+    aktywacje kwantyzowane w locie); bf16 - wagi kodera w bfloat16, a jego
+    przebieg w torch.autocast. Dekoder zostaje w fp32: generuje po jednym
+    tokenie, więc zysk z bf16 zjadałyby konwersje typów przy każdym kroku.
+    """
+    import torch
+    if mode == "int8":
+        # quantize_dynamic rozpoznaje tylko dokładny typ nn.Linear; podklasa
+        # whisper.model.Linear różni się jedynie rzutowaniem wag na typ wejścia
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear):
+                module.__class__ = torch.nn.Linear
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif mode == "bf16":
+        encoder = model.encoder
+        encoder.to(torch.bfloat16)
+        for module in encoder.modules():
+            if isinstance(module, torch.nn.LayerNorm):
+                module.float()  # LayerNorm Whispera liczy zawsze w fp32
+        forward = encoder.forward
+        
+        def autocast_forward(mel):
+            with torch.autocast("cpu", dtype=torch.bfloat16):
+                # Dekoder oczekuje cech audio w fp32
+                return forward(mel).float()
+        encoder.forward = autocast_forward
+    return model
+
+
+class TranscriptionBackend:
+    """Silnik transkrypcji: ładowanie modelu i zamiana audio na segmenty
+    
+    Segmenty to słowniki z kluczami start i end (sekundy względem
+    przekazanego audio) oraz text. transcribe() jest generatorem; silniki
+    z supports_streaming zwracają segmenty już w trakcie dekodowania,
+    pozostałe dopiero po przetworzeniu całego audio. on_position(pozycja,
+    długość) raportuje postęp, a cancelled() sprawdza anulowanie - wtedy
+    silnik zgłasza TranscriptionCancelled.
+    """
+    
+    description = ""
+    supports_streaming = False
+    supports_batching = False  # Czy transcribe_batch() łączy okna wielu nagrań w jeden przebieg modelu
+    accepts_paths = True  # Czy transcribe() przyjmuje ścieżkę pliku audio zamiast tablicy
+    
+    def supports_inference(self, mode):
+        """Czy silnik obsługuje dany tryb wnioskowania (Transcriber.INFERENCE_MODES)"""
+        return mode == "fp32"
+    
+    def load(self, model_name, inference="fp32"):
+        """Ładuje model i zwraca obiekt przekazywany później do transcribe()"""
+        raise NotImplementedError
+    
+    def transcribe(self, model, audio, language, on_position=None, cancelled=None, **options):
+        """Generator segmentów transkrypcji audio (options: np. initial_prompt)"""
+        raise NotImplementedError
+    
+    def detect_language(self, model, windows):
+        """Zwraca dla każdego okna audio (do 30 s) słownik {kod języka: prawdopodobieństwo}"""
+        raise NotImplementedError
+    
+    def transcribe_batch(self, model, audios, language, on_position=None, cancelled=None, batch_size=8):
+        """Transkrybuje wiele (krótkich) nagrań i zwraca listę list segmentów w kolejności audios
+        
+        Silniki z supports_batching dekodują okna różnych nagrań wspólnymi
+        przebiegami modelu (do batch_size okien naraz); domyślnie nagrania są
+        transkrybowane po kolei. on_position raportuje łączną pozycję we
+        wszystkich nagraniach.
+        """
+        total = sum(len(audio) for audio in audios) / SAMPLE_RATE
+        results = []
+        done = 0.0
+        for audio in audios:
+            position = None
+            if on_position:
+                position = lambda current, _length, base=done: on_position(base + current, total)
+            results.append(list(self.transcribe(model, audio, language, on_position=position, cancelled=cancelled)))
+            done += len(audio) / SAMPLE_RATE
+        return results
+    
+    def memory_size(self, model):
+        """Pamięć zajmowana przez załadowany model (bajty)"""
+        return 0
+    
+    def device_info(self, model):
+        """Opis urządzenia i konfiguracji, na których działa model"""
+        return "cpu"
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper (PyTorch) - silnik domyślny"""
+    
+    description = "openai-whisper (PyTorch)"
+    supports_batching = True
+    
+    # Temperatury kolejnych prób dekodowania i progi odrzucenia wyniku jak w whisper.transcribe
+    TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+    COMPRESSION_RATIO_THRESHOLD = 2.4
+    LOGPROB_THRESHOLD = -1.0
+    NO_SPEECH_THRESHOLD = 0.6
+    
+    def supports_inference(self, mode):
+        return mode in ("fp32", "int8") or (mode == "bf16" and bf16_supported())
+    
+    def load(self, model_name, inference="fp32"):
+        import whisper
+        if inference == "fp32":
+            model = whisper.load_model(model_name)
+        else:
+            # Kwantyzowane i bf16 jądra są dostępne tylko na CPU
+            model = apply_inference_mode(whisper.load_model(model_name, device="cpu"), inference)
+        _install_decode_progress()
+        _install_cancel_hooks(model)
+        return model
+    
+    def transcribe(self, model, audio, language, on_position=None, cancelled=None, **options):
+        previous = (getattr(_decode_context, "callback", None), getattr(_decode_context, "cancelled", None))
+        _decode_context.callback = on_position
+        _decode_context.cancelled = cancelled
+        try:
+            result = model.transcribe(audio, language=language, verbose=False, **options)
+        finally:
+            _decode_context.callback, _decode_context.cancelled = previous
+        yield from result["segments"]
+    
+    def transcribe_batch(self, model, audios, language, on_position=None, cancelled=None, batch_size=8):
+        """Dzieli nagrania na okna do 30 s (cięte w ciszy) i dekoduje je partiami przez whisper.decode
+        
+        Okna różnych nagrań trafiają do jednego tensora mel, więc koder
+        i dekoder pracują na pełnych partiach zamiast na pojedynczych
+        oknach. Okna są dekodowane niezależnie (bez tekstu poprzedniego okna
+        jako kontekstu), a nieudane próby są powtarzane w wyższej
+        temperaturze jak w whisper.transcribe.
+        """
+        import torch
+        import whisper
+        from whisper.tokenizer import get_tokenizer
+        
+        tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages, language=language,
+                                  task="transcribe")
+        chunks = [split_audio_chunks(audio, WHISPER_WINDOW, overlap=0.0) for audio in audios]
+        windows = [
+            (index, window)
+            for index, audio_chunks in enumerate(chunks)
+            for window, (start, end, _keep_from, _keep_to) in enumerate(audio_chunks) if end > start
+        ]
+        window_segments = [[[] for _ in audio_chunks] for audio_chunks in chunks]
+        total = sum(len(audio) for audio in audios) / SAMPLE_RATE
+        done = 0.0
+        
+        previous = getattr(_decode_context, "cancelled", None)
+        _decode_context.cancelled = cancelled
+        try:
+            for first in range(0, len(windows), batch_size):
+                _check_cancelled()
+                batch = windows[first:first + batch_size]
+                samples = [audios[index][chunks[index][window][0]:chunks[index][window][1]] for index, window in batch]
+                mel = torch.stack([
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(audio)), model.dims.n_mels)
+                    for audio in samples
+                ]).to(model.device)
+                for (index, window), audio, result in zip(batch, samples, self._decode_windows(model, mel, language)):
+                    if result.no_speech_prob > self.NO_SPEECH_THRESHOLD and result.avg_logprob < self.LOGPROB_THRESHOLD:
+                        continue  # Okno bez mowy
+                    window_segments[index][window] = self._window_segments(tokenizer, result.tokens,
+                                                                           len(audio) / SAMPLE_RATE)
+                done += sum(len(audio) for audio in samples) / SAMPLE_RATE
+                if on_position:
+                    on_position(done, total)
+        finally:
+            _decode_context.cancelled = previous
+        return [merge_chunk_segments(audio_chunks, segments) for audio_chunks, segments in zip(chunks, window_segments)]
+    
+    def detect_language(self, model, windows):
+        """Wykrywanie języka Whispera dla wszystkich okien jednym przebiegiem kodera"""
+        import torch
+        import whisper
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(np.ascontiguousarray(window))), model.dims.n_mels)
+            for window in windows
+        ]).to(model.device)
+        with torch.no_grad():
+            _tokens, probabilities = model.detect_language(mel)
+        return probabilities
+    
+    def _decode_windows(self, model, mel, language):
+        """Dekoduje partię okien mel; okna z nieudanym wynikiem są ponawiane w kolejnej temperaturze"""
+        import whisper
+        results = [None] * len(mel)
+        pending = list(range(len(mel)))
+        for temperature in self.TEMPERATURES:
+            options = whisper.DecodingOptions(language=language, temperature=temperature,
+                                              best_of=5 if temperature > 0 else None,
+                                              fp16=model.device.type != "cpu")
+            if temperature > 0:
+                # Próbkowanie best_of w whisper.decode obsługuje tylko jedno okno na wywołanie
+                decoded = [whisper.decode(model, mel[index:index + 1], options)[0] for index in pending]
+            else:
+                decoded = whisper.decode(model, mel[pending], options)
+            retry = []
+            for index, result in zip(pending, decoded):
+                results[index] = result
+                failed = (result.compression_ratio > self.COMPRESSION_RATIO_THRESHOLD
+                          or result.avg_logprob < self.LOGPROB_THRESHOLD)
+                # Ciszy nie ma sensu dekodować ponownie
+                if failed and result.no_speech_prob <= self.NO_SPEECH_THRESHOLD:
+                    retry.append(index)
+            pending = retry
+            if not pending:
+                break
+        return results
+    
+    @staticmethod
+    def _window_segments(tokenizer, tokens, duration):
+        """Dzieli tokeny okna na segmenty według znaczników czasu (co 0,02 s)"""
+        segments = []
+        start = None
+        text_tokens = []
+        for token in tokens:
+            if token >= tokenizer.timestamp_begin:
+                position = min((token - tokenizer.timestamp_begin) * 0.02, duration)
+                if text_tokens:
+                    segments.append({"start": start or 0.0, "end": position, "text": tokenizer.decode(text_tokens)})
+                    text_tokens = []
+                    start = None
+                else:
+                    start = position
+            elif token < tokenizer.eot:
+                text_tokens.append(token)
+        if text_tokens:
+            # Brak końcowego znacznika czasu - segment trwa do końca okna
+            segments.append({"start": start or 0.0, "end": duration, "text": tokenizer.decode(text_tokens)})
+        return segments
+    
+    def memory_size(self, model):
+        return model_memory_size(model)
+    
+    def device_info(self, model):
+        import torch
+        return f"{model.device}, {torch.get_num_threads()} wątków PyTorch"
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """faster-whisper (CTranslate2) - szybszy silnik CPU, wymaga pakietu faster-whisper
+    
+    Liczba wątków jest brana ze zmiennej OMP_NUM_THREADS (ustawianej przez
+    procesy robocze puli). Anulowanie jest sprawdzane między segmentami.
+    """
+    
+    description = "faster-whisper (CTranslate2), szybszy na CPU"
+    supports_streaming = True
+    
+    # Typy obliczeń CTranslate2 odpowiadające trybom wnioskowania
+    COMPUTE_TYPES = {"fp32": "float32", "int8": "int8", "bf16": "bfloat16"}
+    
+    # Przybliżona liczba parametrów modeli (CTranslate2 nie podaje zajętości pamięci)
+    PARAMETERS = {"tiny": 39e6, "base": 74e6, "small": 244e6, "medium": 769e6, "large": 1550e6}
+    BYTES_PER_PARAMETER = {"fp32": 4, "int8": 1, "bf16": 2}
+    
+    def supports_inference(self, mode):
+        return mode in self.COMPUTE_TYPES
+    
+    def load(self, model_name, inference="fp32"):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("Silnik faster-whisper wymaga pakietu faster-whisper (pip install faster-whisper)")
+        model = WhisperModel(model_name, device="cpu", compute_type=self.COMPUTE_TYPES[inference])
+        model.inference = inference
+        model.model_name = model_name
+        return model
+    
+    def transcribe(self, model, audio, language, on_position=None, cancelled=None, **options):
+        segments, info = model.transcribe(audio, language=language, **options)
+        for segment in segments:
+            if cancelled is not None and cancelled():
+                raise TranscriptionCancelled()
+            if on_position:
+                on_position(segment.end, info.duration)
+            yield {"start": segment.start, "end": segment.end, "text": segment.text}
+        if on_position:
+            on_position(info.duration, info.duration)
+    
+    def detect_language(self, model, windows):
+        # transcribe() wykrywa język od razu, a segmenty dekoduje dopiero przy iteracji
+        probabilities = []
+        for window in windows:
+            _segments, info = model.transcribe(np.ascontiguousarray(window), language=None)
+            probabilities.append(dict(info.all_language_probs or [(info.language, info.language_probability)]))
+        return probabilities
+    
+    def memory_size(self, model):
+        return int(self.PARAMETERS.get(model.model_name, 0) * self.BYTES_PER_PARAMETER[model.inference])
+    
+    def device_info(self, model):
+        threads = os.environ.get("OMP_NUM_THREADS", "domyślna liczba")
+        return f"cpu ({self.COMPUTE_TYPES[model.inference]}), {threads} wątków CTranslate2"
+
+
+class FakeBackend(TranscriptionBackend):
+    """Deterministyczny silnik testowy bez modelu: jeden segment na fragment mowy
+    
+    Fragmenty mowy wyznacza detect_speech_regions, dłuższe są dzielone na
+    odcinki do segment_length sekund. Tekst zależy tylko od numeru i czasu
+    segmentu, więc wynik jest powtarzalny. Przy realtime_factor > 0 silnik
+    symuluje czas dekodowania (sekundy pracy na sekundę audio). Wykrywanie
+    języka zawsze zwraca język podany w konstruktorze.
+    """
+    
+    description = "Silnik testowy (bez pobierania modelu)"
+    supports_streaming = True
+    supports_batching = True  # Domyślne transcribe_batch (nagrania po kolei) - do testów ścieżki wsadowej
+    accepts_paths = False
+    
+    def __init__(self, segment_length=5.0, realtime_factor=0.0, language="pl"):
+        self.segment_length = segment_length
+        self.realtime_factor = realtime_factor
+        self.language = language  # Język "wykrywany" w każdym oknie
+    
+    def supports_inference(self, mode):
+        return True
+    
+    def load(self, model_name, inference="fp32"):
+        return types.SimpleNamespace(name=model_name, inference=inference)
+    
+    def transcribe(self, model, audio, language, on_position=None, cancelled=None, **options):
+        duration = len(audio) / SAMPLE_RATE
+        index = 0
+        for region_start, region_end in detect_speech_regions(audio):
+            start = region_start / SAMPLE_RATE
+            while start < region_end / SAMPLE_RATE:
+                end = min(start + self.segment_length, region_end / SAMPLE_RATE)
+                if cancelled is not None and cancelled():
+                    raise TranscriptionCancelled()
+                if self.realtime_factor:
+                    time.sleep((end - start) * self.realtime_factor)
+                index += 1
+                if on_position:
+                    on_position(end, duration)
+                yield {"start": start, "end": end, "text": f"Segment {index} ({language}, {format_duration(start)})"}
+                start = end
+        if on_position:
+            on_position(duration, duration)
+    
+    def detect_language(self, model, windows):
+        return [{self.language: 1.0} for _ in windows]
+    
+    def device_info(self, model):
+        return "brak (silnik testowy)"
+
+
+# Dostępne silniki transkrypcji
+BACKENDS = {
+    "whisper": WhisperBackend(),
+    "faster-whisper": FasterWhisperBackend(),
+    "fake": FakeBackend()
+}
+
+
+def format_model_key(backend, model_name, inference="fp32"):
+    """Klucz modelu (np. "large", "small-int8", "faster-whisper/small") w MODEL_REGISTRY i historii RTF"""
+    key = model_name if inference == "fp32" else f"{model_name}-{inference}"
+    if backend != "whisper":
+        key = f"{backend}/{key}"
+    return key
+
+
+def default_model_memory_budget():
+    """Domyślny budżet pamięci na załadowane modele: połowa pamięci RAM (lub 8 GB, gdy nieznana)"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (AttributeError, ValueError, OSError):
+        return 8 * 1024 ** 3
+
+
+class ModelRegistry:
+    """Wspólna dla procesu pula załadowanych modeli, kluczowana nazwą modelu
+    
+    Modele pozostają w pamięci po zmianie wybranego modelu; gdy łączny
+    rozmiar przekracza budżet, usuwane są najdawniej używane (LRU).
+    Równoczesne żądania tego samego modelu czekają na jedno ładowanie.
+    """
+    
+    def __init__(self, memory_budget=None):
+        self.memory_budget = memory_budget or default_model_memory_budget()
+        self._models = OrderedDict()
+        self._sizes = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+    
+    def set_memory_budget(self, memory_budget):
+        """Ustawia budżet pamięci (bajty) i od razu usuwa nadmiarowe modele"""
+        with self._lock:
+            self.memory_budget = memory_budget
+            self._evict()
+    
+    def loaded(self):
+        """Zwraca klucze załadowanych modeli (od najdawniej używanego)"""
+        with self._lock:
+            return list(self._models)
+    
+    def get(self, key, loader, sizer=model_memory_size):
+        """Zwraca model z pamięci lub ładuje go funkcją loader(); drugi element wyniku mówi, czy ładowano
+        
+        sizer(model) podaje zajętość pamięci modelu uwzględnianą w budżecie.
+        """
+        while True:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key], False
+                event = self._loading.get(key)
+                owner = event is None
+                if owner:
+                    event = self._loading[key] = threading.Event()
+            if not owner:
+                # Model ładuje inny wątek (np. wstępne ładowanie) - czekamy na wynik
+                event.wait()
+                continue
+            try:
+                model = loader()
+                with self._lock:
+                    self._models[key] = model
+                    self._sizes[key] = sizer(model)
+                    self._evict(keep=key)
+                return model, True
+            finally:
+                with self._lock:
+                    del self._loading[key]
+                event.set()
+    
+    def preload(self, key, loader, on_error=None, sizer=model_memory_size):
+        """Ładuje model w tle; zwraca wątek ładowania"""
+        def run():
+            try:
+                self.get(key, loader, sizer)
+            except Exception as e:
+                if on_error:
+                    on_error(e)
+        thread = threading.Thread(target=run, name=f"preload-{key}", daemon=True)
+        thread.start()
+        return thread
+    
+    def _evict(self, keep=None):
+        """Usuwa najdawniej używane modele ponad budżet (wywoływane pod blokadą)"""
+        total = sum(self._sizes.values())
+        for key in list(self._models):
+            if total <= self.memory_budget:
+                break
+            if key == keep:
+                continue
+            del self._models[key]
+            total -= self._sizes.pop(key)
+
+
+# Pula modeli wspólna dla wszystkich obiektów Transcriber w procesie
+MODEL_REGISTRY = ModelRegistry()
+
+
+def _cancel_logger(transcriber):
+    """Tworzy logger MoviePy przerywający zapis audio po anulowaniu (sprawdzane przy każdym bloku)"""
+    import proglog
+    
+    class CancelLogger(proglog.ProgressBarLogger):
+        def bars_callback(self, bar, attr, value, old_value=None):
+            if transcriber.cancel_flag:
+                raise TranscriptionCancelled()
+    
+    return CancelLogger()
+
+
+class TranscriptExporter:
+    """Format wyjściowy transkrypcji (napisy lub tekst)
+    
+    Formaty tekstowe składają się z nagłówka i niezależnie formatowanych
+    segmentów (numerowanych od 1), więc mogą być też zapisywane na bieżąco.
+    metadata to słownik z ustawieniami transkrypcji (model, język, silnik).
+    """
+    
+    extension = ""
+    description = ""
+    
+    def header(self, metadata):
+        """Początek pliku (przed pierwszym segmentem)"""
+        return ""
+    
+    def format_segment(self, index, segment):
+        """Tekst jednego segmentu"""
+        raise NotImplementedError
+    
+    def write(self, transcription, f, metadata=None):
+        """Zapisuje całą transkrypcję do otwartego pliku tekstowego"""
+        f.write(self.header(metadata or {}))
+        f.writelines(self.format_segment(i + 1, segment) for i, segment in enumerate(transcription))
+    
+    def format(self, transcription, metadata=None):
+        """Zwraca zawartość pliku jako tekst"""
+        buffer = io.StringIO()
+        self.write(transcription, buffer, metadata)
+        return buffer.getvalue()
+
+
+class SrtExporter(TranscriptExporter):
+    extension = ".srt"
+    description = "Napisy SubRip"
+    
+    def format_segment(self, index, segment):
+        return f"{index}\n{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}\n{segment['text']}\n\n"
+
+
+class VttExporter(TranscriptExporter):
+    extension = ".vtt"
+    description = "Napisy WebVTT (przeglądarki, odtwarzacze HTML5)"
+    
+    def header(self, metadata):
+        return "WEBVTT\n\n"
+    
+    def format_segment(self, index, segment):
+        return f"{format_timestamp(segment['start'], '.')} --> {format_timestamp(segment['end'], '.')}\n{segment['text']}\n\n"
+
+
+class TextExporter(TranscriptExporter):
+    extension = ".txt"
+    description = "Sam tekst, jeden segment w wierszu"
+    
+    def format_segment(self, index, segment):
+        return f"{segment['text']}\n"
+
+
+class TsvExporter(TranscriptExporter):
+    extension = ".tsv"
+    description = "Tabela start/end (milisekundy) i tekst rozdzielone tabulatorami"
+    
+    def header(self, metadata):
+        return "start\tend\ttext\n"
+    
+    def format_segment(self, index, segment):
+        text = segment["text"].replace("\t", " ")
+        return f"{round(segment['start'] * 1000)}\t{round(segment['end'] * 1000)}\t{text}\n"
+
+
+class JsonExporter(TranscriptExporter):
+    """Ustawienia transkrypcji i lista segmentów (z polem words, jeśli silnik podał czasy słów)"""
+    
+    extension = ".json"
+    description = "Segmenty z czasami i ustawieniami transkrypcji (JSON)"
+    
+    def write(self, transcription, f, metadata=None):
+        segments = [{"id": i + 1, **segment} for i, segment in enumerate(transcription)]
+        json.dump({**(metadata or {}), "segments": segments}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+# Dostępne formaty wyjściowe
+EXPORTERS = {
+    "srt": SrtExporter(),
+    "vtt": VttExporter(),
+    "txt": TextExporter(),
+    "json": JsonExporter(),
+    "tsv": TsvExporter()
+}
+
+
+class SrtStreamWriter:
+    """Dopisuje kolejne napisy do pliku SRT na bieżąco
+    
+    Napisy trafiają najpierw do pliku `<output_file>.part` (opróżnianego po
+    każdym napisie, więc można go śledzić na żywo), a finalize() atomowo
+    zamienia go na plik docelowy.
+    """
+    
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.part_file = f"{output_file}.part"
+        self.exporter = EXPORTERS["srt"]
+        self.count = 0
+        self.file = open(self.part_file, "w", encoding="utf-8")
+    
+    def write(self, segment):
+        """Zapisuje jeden napis i opróżnia bufor pliku"""
+        self.count += 1
+        self.file.write(self.exporter.format_segment(self.count, segment))
+        self.file.flush()
+    
+    def finalize(self):
+        """Zamyka plik tymczasowy i zastępuje nim plik docelowy"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.part_file, self.output_file)
+    
+    def abort(self, keep_partial=False):
+        """Przerywa zapis; plik .part jest usuwany, chyba że keep_partial=True"""
+        if not self.file.closed:
+            self.file.close()
+        if not keep_partial and os.path.exists(self.part_file):
+            os.remove(self.part_file)
+
+
+# Blokada zapisu indeksów skrótów (wątki wyodrębniające audio i wątek główny czytają te same pliki)
+_FINGERPRINT_LOCK = threading.Lock()
+
+# Największa liczba wpisów indeksu skrótów (np. usługa HTTP dodaje nową ścieżkę z każdym przesłanym plikiem)
+FINGERPRINT_INDEX_LIMIT = 10000
+
+
+def _read_fingerprint_index(index_path):
+    """Wczytuje indeks skrótów; pusty słownik, gdy plik nie istnieje lub jest uszkodzony"""
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def file_fingerprint(path, index_path=None):
+    """Zwraca skrót SHA-256 zawartości pliku
+    
+    Jeśli podano index_path, skróty są zapamiętywane w indeksie JSON razem
+    z rozmiarem i czasem modyfikacji pliku, więc niezmieniony plik nie jest
+    ponownie czytany. Zapis łączy nowy wpis z aktualną zawartością indeksu
+    na dysku (pod blokadą, przez unikalny plik tymczasowy); po przekroczeniu
+    FINGERPRINT_INDEX_LIMIT usuwane są wpisy nieistniejących plików, a potem
+    najdawniej dodane.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    if index_path:
+        entry = _read_fingerprint_index(index_path).get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+    
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    fingerprint = digest.hexdigest()
+    
+    if index_path:
+        directory = os.path.dirname(os.path.abspath(index_path))
+        with _FINGERPRINT_LOCK:
+            index = _read_fingerprint_index(index_path)
+            index.pop(path, None)  # Ponowne dodanie przenosi wpis na koniec (najnowszy)
+            index[path] = [stat.st_size, stat.st_mtime_ns, fingerprint]
+            if len(index) > FINGERPRINT_INDEX_LIMIT:
+                index = {key: value for key, value in index.items() if os.path.exists(key)}
+                for key in list(index)[:max(0, len(index) - FINGERPRINT_INDEX_LIMIT)]:
+                    del index[key]
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix="fingerprints.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(index, f)
+                os.replace(temp_path, index_path)
+            except OSError:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+    return fingerprint
+
+
+class DiskCache:
+    """Katalog plików pamięci podręcznej z limitem rozmiaru i usuwaniem najdawniej używanych (LRU)
+    
+    Czas ostatniego użycia wpisu to czas modyfikacji jego pliku (odświeżany przy odczycie).
+    """
+    
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def path_for(self, key, suffix):
+        """Zwraca ścieżkę pliku wpisu"""
+        return os.path.join(self.directory, f"{key}{suffix}")
+    
+    def touch(self, path):
+        """Oznacza wpis jako właśnie użyty"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    
+    def evict(self):
+        """Usuwa najdawniej używane wpisy, aż rozmiar katalogu zmieści się w limicie"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class TranscriptionCache(DiskCache):
+    """Trwała pamięć podręczna wyników transkrypcji
+    
+    Klucz to skrót zawartości pliku źródłowego oraz ustawień wpływających
+    na wynik (model, język, opcje dekodowania); wartość to lista segmentów.
+    """
+    
+    def __init__(self, root=None, max_bytes=500 * 1024 * 1024):
+        self.root = root or CACHE_DIR
+        super().__init__(os.path.join(self.root, "transcripts"), max_bytes)
+        self.index_path = os.path.join(self.root, "fingerprints.json")
+    
+    def key(self, video_path, signature):
+        """Wylicza klucz wpisu dla pliku źródłowego i ustawień"""
+        payload = json.dumps({"source": file_fingerprint(video_path, self.index_path), **signature}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def language_key(self, video_path):
+        """Klucz wpisu z wykrytym językiem pliku źródłowego (niezależny od ustawień)"""
+        payload = f"language:{file_fingerprint(video_path, self.index_path)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key):
+        """Zwraca zapisane segmenty (lub inną wartość JSON wpisu) albo None"""
+        path = self.path_for(key, ".json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                segments = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.touch(path)
+        return segments
+    
+    def put(self, key, segments):
+        """Zapisuje segmenty (atomowo) i pilnuje limitu rozmiaru"""
+        path = self.path_for(key, ".json")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(segments, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        self.evict()
+
+
+class AudioCache(DiskCache):
+    """Trwała pamięć podręczna wyodrębnionego audio (16 kHz, mono, int16 w plikach .npy)
+    
+    Klucz to skrót zawartości pliku źródłowego, więc ta sama ścieżka audio
+    służy wszystkim modelom, językom i opcjom dekodowania. Wpisy są
+    odczytywane przez mapowanie pamięci, dzięki czemu wznowienie od
+    zadanej sekundy czyta z dysku tylko potrzebną część nagrania.
+    """
+    
+    def __init__(self, root=None, max_bytes=2048 * 1024 * 1024):
+        self.root = root or CACHE_DIR
+        super().__init__(os.path.join(self.root, "audio"), max_bytes)
+        self.index_path = os.path.join(self.root, "fingerprints.json")
+    
+    def key(self, video_path):
+        """Wylicza klucz wpisu dla pliku źródłowego"""
+        return hashlib.sha256(f"{file_fingerprint(video_path, self.index_path)}:{SAMPLE_RATE}".encode("utf-8")).hexdigest()
+    
+    def get(self, key):
+        """Zwraca próbki int16 (tablica mapowana z pliku) lub None"""
+        path = self.path_for(key, ".npy")
+        try:
+            samples = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        self.touch(path)
+        return samples
+    
+    def put(self, key, samples):
+        """Zapisuje próbki int16 (atomowo) i pilnuje limitu rozmiaru"""
+        path = self.path_for(key, ".npy")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, np.asarray(samples, dtype=np.int16))
+        os.replace(temp_path, path)
+        self.evict()
+
+
+class JobCheckpoint:
+    """Plik stanu zadania (`<output_file>.checkpoint.json`) pozwalający wznowić przerwaną transkrypcję
+    
+    Zapisuje przesunięcie (sekundy nagrania) zakończonych okien dekodowania
+    oraz wyemitowane już segmenty. Stan jest ważny tylko dla tego samego
+    pliku źródłowego (rozmiar, czas modyfikacji) i tych samych ustawień.
+    """
+    
+    def __init__(self, output_file, signature):
+        self.path = f"{output_file}.checkpoint.json"
+        self.signature = signature
+        self.offset = 0.0
+        self.segments = []
+        self.previous_text = ""
+    
+    def load(self):
+        """Wczytuje zapisany stan; zwraca True, jeśli pasuje do bieżącego zadania"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get("signature") != self.signature:
+            return False
+        self.offset = state["offset"]
+        self.segments = state["segments"]
+        self.previous_text = state.get("previous_text", "")
+        return True
+    
+    def save(self, offset, previous_text):
+        """Zapisuje stan atomowo (plik tymczasowy + zamiana)"""
+        self.offset = offset
+        self.previous_text = previous_text[-200:]
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "signature": self.signature,
+                "offset": self.offset,
+                "previous_text": self.previous_text,
+                "segments": self.segments
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+    
+    def remove(self):
+        """Usuwa plik stanu po udanym zakończeniu zadania"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class EventSource:
+    """Haki zdarzeń strukturalnych (uzupełnienie tekstowych komunikatów statusu)
+    
+    Zdarzenie to słownik z kluczami event (nazwa), time (czas uniksowy)
+    i polami zależnymi od rodzaju, np. stage_start/stage_end (stage,
+    duration, audio_seconds, segments), model_load, cache_hit/cache_miss
+    (z polem cache="audio" dla pamięci podręcznej audio),
+    job_queued/job_started/job_end. Haki są wywoływane synchronicznie,
+    także z wątków roboczych, więc muszą być szybkie i bezpieczne wątkowo.
+    """
+    
+    def add_event_hook(self, hook):
+        """Rejestruje funkcję hook(event) wywoływaną dla każdego zdarzenia (raz, nawet przy ponownym dodaniu)"""
+        if hook not in self.event_hooks:
+            self.event_hooks.append(hook)
+    
+    def remove_event_hook(self, hook):
+        """Wyrejestrowuje hak zdarzeń"""
+        if hook in self.event_hooks:
+            self.event_hooks.remove(hook)
+    
+    def emit_event(self, name, **fields):
+        """Przekazuje zdarzenie wszystkim hakom; błąd haka nie przerywa przetwarzania"""
+        if not self.event_hooks:
+            return
+        event = {"event": name, "time": time.time(), **fields}
+        for hook in list(self.event_hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"Błąd haka zdarzeń: {e}", file=sys.stderr)
+    
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        """Otacza etap przetwarzania zdarzeniami stage_start i stage_end (z czasem trwania)
+        
+        Blok otrzymuje słownik, którego zawartość (np. audio_seconds,
+        segments) trafia do stage_end; przy wyjątku dodawane jest pole error.
+        """
+        self.emit_event("stage_start", stage=name, **fields)
+        started = time.perf_counter()
+        result = {}
+        try:
+            yield result
+        except BaseException as e:
+            result["error"] = type(e).__name__
+            raise
+        finally:
+            self.emit_event("stage_end", stage=name, duration=time.perf_counter() - started, **fields, **result)
+
+
+class JsonLinesExporter:
+    """Hak zdarzeń zapisujący każde zdarzenie jako jeden wiersz JSON (plik lub strumień)"""
+    
+    def __init__(self, target):
+        self._owned = isinstance(target, str)
+        self.stream = open(target, "a", encoding="utf-8") if self._owned else target
+        self._lock = threading.Lock()
+    
+    def __call__(self, event):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+    
+    def close(self):
+        """Zamyka plik otwarty przez eksporter"""
+        if self._owned:
+            self.stream.close()
+
+
+class PrometheusMetrics:
+    """Hak zdarzeń agregujący metryki w formacie tekstowym Prometheus
+    
+    render() zwraca bieżący stan (np. dla punktu /metrics). Jeśli podano
+    path, plik jest atomowo nadpisywany po każdym zakończonym zadaniu
+    (katalog textfile collectora node_exportera).
+    """
+    
+    PREFIX = "auto_transcriber"
+    
+    # Nazwa metryki -> (typ, opis)
+    METRICS = {
+        "stage_duration_seconds": ("summary", "Czas etapów przetwarzania"),
+        "stage_errors_total": ("counter", "Etapy przerwane błędem lub anulowaniem"),
+        "audio_seconds_total": ("counter", "Sekundy przetranskrybowanego audio"),
+        "segments_total": ("counter", "Wygenerowane segmenty napisów"),
+        "model_load_duration_seconds": ("summary", "Czas ładowania modeli"),
+        "cache_requests_total": ("counter", "Zapytania do pamięci podręcznej wyników i audio"),
+        "jobs_queued_total": ("counter", "Zadania zlecone puli procesów"),
+        "queue_wait_seconds": ("summary", "Czas oczekiwania zadań w kolejce puli"),
+        "jobs_total": ("counter", "Zakończone zadania według wyniku"),
+        "job_duration_seconds": ("summary", "Czas przetwarzania zadań")
+    }
+    
+    def __init__(self, path=None):
+        self.path = path
+        self._values = {}  # (metryka, etykiety) -> wartość
+        self._lock = threading.Lock()
+    
+    def _add(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self._values[key] = self._values.get(key, 0) + value
+    
+    def _observe(self, name, value, **labels):
+        self._add(f"{name}_sum", value, **labels)
+        self._add(f"{name}_count", 1, **labels)
+    
+    def __call__(self, event):
+        kind = event["event"]
+        with self._lock:
+            if kind == "stage_end":
+                self._observe("stage_duration_seconds", event["duration"], stage=event["stage"])
+                if "error" in event:
+                    self._add("stage_errors_total", stage=event["stage"])
+                elif event["stage"] == "transcribe":
+                    self._add("audio_seconds_total", event.get("audio_seconds") or 0)
+                    self._add("segments_total", event.get("segments") or 0)
+            elif kind == "model_load":
+                self._observe("model_load_duration_seconds", event["duration"], backend=event["backend"], model=event["model"])
+            elif kind in ("cache_hit", "cache_miss"):
+                self._add("cache_requests_total", cache=event.get("cache", "transcript"), result=kind[len("cache_"):])
+            elif kind == "job_queued":
+                self._add("jobs_queued_total")
+            elif kind == "job_started" and "queue_seconds" in event:
+                self._observe("queue_wait_seconds", event["queue_seconds"])
+            elif kind == "job_end":
+                self._add("jobs_total", status=event["status"])
+                self._observe("job_duration_seconds", event["duration"])
+        if kind == "job_end" and self.path:
+            self.write(self.path)
+    
+    def render(self):
+        """Zwraca metryki w formacie tekstowym Prometheus (wersja 0.0.4)"""
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = []
+        for metric, (kind, help_text) in self.METRICS.items():
+            name = f"{self.PREFIX}_{metric}"
+            samples = [(key, value) for key, value in values
+                       if key[0] == metric or key[0] in (f"{metric}_sum", f"{metric}_count")]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (sample, labels), value in samples:
+                label_text = ",".join(f'{label}="{str(text).replace(chr(34), chr(39))}"' for label, text in labels)
+                lines.append(f"{self.PREFIX}_{sample}{{{label_text}}} {value:.12g}" if label_text
+                             else f"{self.PREFIX}_{sample} {value:.12g}")
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path):
+        """Zapisuje metryki do pliku atomowo (plik tymczasowy + zamiana)"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+
+class UpdateChannel:
+    """Kanał najnowszego stanu (status, postęp) z wątków roboczych do wątku interfejsu
+    
+    Wątek roboczy publikuje wartości pod kluczami; wartość niepobrana przez
+    interfejs jest zastępowana nowszą, więc kolejka zdarzeń interfejsu nie
+    rośnie z liczbą komunikatów. notify() jest wywoływane tylko przy
+    przejściu kanału z pustego w niepusty - wystarcza jedno zlecenie
+    odczytu (np. wyzwalacz Kivy Clock.create_trigger) na klatkę, w którym
+    drain() zwraca wszystkie zmiany naraz.
+    """
+    
+    def __init__(self, notify=None):
+        self.notify = notify
+        self._updates = {}
+        self._lock = threading.Lock()
+    
+    def publish(self, key, value):
+        """Ustawia najnowszą wartość klucza (bezpieczne z dowolnego wątku)"""
+        with self._lock:
+            first = not self._updates
+            self._updates[key] = value
+        if first and self.notify:
+            self.notify()
+    
+    def drain(self):
+        """Zwraca i usuwa zebrane zmiany {klucz: najnowsza wartość}"""
+        with self._lock:
+            updates, self._updates = self._updates, {}
+        return updates
+
+
+class Transcriber(EventSource):
     """Klasa odpowiedzialna za transkrypcję audio do tekstu"""
     
     # Dostępne modele Whisper i ich opisy
@@ -46,8 +1372,22 @@ class Transcriber:
         "large": "Najdokładniejszy, najwolniejszy"
     }
     
-    # Dostępne języki
+    # Tryby wnioskowania na CPU (precyzja wag i obliczeń) i ich koszt/zysk
+    INFERENCE_MODES = {
+        "fp32": "Pełna precyzja, najdokładniejszy",
+        "int8": "Kwantyzacja int8: ok. 2x mniej pamięci, szybszy, nieznacznie mniej dokładny",
+        "bf16": "Koder w bfloat16: szybszy na CPU z AVX512-BF16/AMX, minimalna utrata dokładności"
+    }
+    
+    # Tryby wyodrębniania audio
+    AUDIO_MODES = {
+        "memory": "Dekodowanie ffmpeg bezpośrednio do pamięci (bez pliku tymczasowego)",
+        "file": "Zapis pliku WAV przez MoviePy (tryb zgodności)"
+    }
+    
+    # Dostępne języki ("auto" - wykrywanie na próbkach nagrania spośród pozostałych)
     AVAILABLE_LANGUAGES = {
+        "auto": "Automatycznie",
         "pl": "Polski",
         "en": "Angielski",
         "de": "Niemiecki",
@@ -60,27 +1400,83 @@ class Transcriber:
         "sk": "Słowacki"
     }
     
+    # Liczba 30-sekundowych okien mowy, na których głosuje wykrywanie języka
+    LANGUAGE_PROBES = 3
+    
+    # Język używany, gdy w nagraniu nie wykryto mowy
+    FALLBACK_LANGUAGE = "pl"
+    
     def __init__(self):
-        self.model = None
         self.model_name = "large"  # Używamy najdokładniejszego modelu dla języka polskiego
         self.language = "pl"
+        self.inference = "fp32"
+        self.backend = "whisper"  # Klucz w BACKENDS
+        self.audio_mode = "memory"
+        self.chunk_length = None  # Tryb dzielenia długich nagrań (sekundy), None = wyłączony
+        self.chunk_overlap = 5.0
+        self.chunk_workers = 1
+        self.chunk_pool = None
+        self.vad = False  # Wstępne wykrywanie mowy (pomijanie ciszy)
+        self.streaming = False  # Zapis napisów na bieżąco w trakcie transkrypcji
+        self.stream_window = 120.0
+        self.checkpointing = False  # Zapis stanu zadania pozwalający je wznowić
+        self.output_formats = ["srt"]  # Klucze EXPORTERS zapisywane przez process_video
+        self.batch_size = 1  # Liczba okien krótkich nagrań dekodowanych razem (1 = wyłączone)
+        self.batch_max_length = 60.0  # Najdłuższe nagranie (sekundy) dekodowane wspólnie z innymi
+        self.cache = None  # TranscriptionCache lub None
+        self.audio_cache = None  # AudioCache lub None
+        self.model_cache_mb = None  # Budżet pamięci MODEL_REGISTRY (MB); None = domyślny
+        self._ready_model = None  # Klucz ostatnio pobranego modelu (sam model trzyma tylko MODEL_REGISTRY)
+        self.detected_languages = {}  # (ścieżka, rozmiar, czas modyfikacji) -> wykryty język
+        self.event_hooks = []  # Haki zdarzeń strukturalnych (EventSource)
         self.progress_callback = None
+        self.progress_details_callback = None
         self.status_callback = None
         self.cancel_flag = False
+        
+        # Stan raportowania postępu dekodowania
+        self._progress_started = None
+        self._progress_duration = 0.0
     
-    def set_callbacks(self, progress_callback=None, status_callback=None):
-        """Ustawia funkcje callback do raportowania postępu"""
+    def set_callbacks(self, progress_callback=None, status_callback=None, progress_details_callback=None):
+        """Ustawia funkcje callback do raportowania postępu
+        
+        progress_callback(postęp) otrzymuje sam postęp (0-100), a opcjonalny
+        progress_details_callback(postęp, szczegóły) także słownik szczegółów.
+        """
         self.progress_callback = progress_callback
+        self.progress_details_callback = progress_details_callback
         self.status_callback = status_callback
     
     def set_model(self, model_name):
         """Ustawia model Whisper"""
         if model_name in self.AVAILABLE_MODELS:
             self.model_name = model_name
-            self.model = None  # Resetujemy załadowany model, aby wymusić ponowne załadowanie
             return True
         return False
     
+    def set_backend(self, backend):
+        """Ustawia silnik transkrypcji (klucz w BACKENDS); nieobsługiwany tryb wnioskowania wraca do fp32"""
+        if backend not in BACKENDS:
+            return False
+        if backend != self.backend:
+            self.backend = backend
+            if not self.backend_impl().supports_inference(self.inference):
+                self.inference = "fp32"
+        return True
+    
+    def backend_impl(self):
+        """Obiekt TranscriptionBackend bieżącego silnika"""
+        return BACKENDS[self.backend]
+    
+    def set_inference(self, mode):
+        """Ustawia tryb wnioskowania (jeśli obsługuje go bieżący silnik, np. bf16 tylko na odpowiednim procesorze)"""
+        if mode not in self.INFERENCE_MODES or not self.backend_impl().supports_inference(mode):
+            return False
+        if mode != self.inference:
+            self.inference = mode
+        return True
+    
     def set_language(self, language):
         """Ustawia język transkrypcji"""
         if language in self.AVAILABLE_LANGUAGES:
@@ -88,67 +1484,483 @@ class Transcriber:
             return True
         return False
         
+    def set_audio_mode(self, audio_mode):
+        """Ustawia tryb wyodrębniania audio"""
+        if audio_mode in self.AUDIO_MODES:
+            self.audio_mode = audio_mode
+            return True
+        return False
+        
+    def set_chunking(self, chunk_length=None, overlap=5.0, workers=1):
+        """Włącza transkrypcję długich nagrań we fragmentach (chunk_length w sekundach, None wyłącza)
+        
+        Przy workers > 1 fragmenty są transkrybowane równolegle w procesach
+        TranscriptionWorkerPool, z których każdy trzyma własny model.
+        """
+        if chunk_length is not None and chunk_length <= overlap:
+            return False
+        self.chunk_length = chunk_length
+        self.chunk_overlap = overlap
+        self.chunk_workers = max(1, workers)
+        return True
+    
+    def set_vad(self, enabled):
+        """Włącza lub wyłącza wstępne wykrywanie mowy"""
+        self.vad = bool(enabled)
+        return True
+    
+    def set_streaming(self, enabled, window=120.0):
+        """Włącza zapis napisów na bieżąco (okna dekodowania o długości window sekund)"""
+        if window <= 0:
+            return False
+        self.streaming = bool(enabled)
+        self.stream_window = window
+        return True
+    
+    def set_checkpointing(self, enabled):
+        """Włącza zapis stanu zadań (process_video wznawia wtedy przerwaną pracę)"""
+        self.checkpointing = bool(enabled)
+        return True
+    
+    def set_output_formats(self, formats):
+        """Ustawia formaty wyjściowe (klucze EXPORTERS) zapisywane z jednego wyniku transkrypcji"""
+        formats = list(dict.fromkeys(formats))
+        if not formats or any(name not in EXPORTERS for name in formats):
+            return False
+        self.output_formats = formats
+        return True
+    
+    def set_batching(self, batch_size, max_length=60.0):
+        """Włącza wspólne dekodowanie krótkich nagrań (do max_length sekund) partiami po batch_size okien"""
+        if batch_size < 1 or max_length <= 0:
+            return False
+        self.batch_size = int(batch_size)
+        self.batch_max_length = max_length
+        return True
+    
+    def batching_enabled(self):
+        """Czy krótkie nagrania mogą być dekodowane wspólnie (tryby strumieniowe i fragmentów mają własny podział)"""
+        return (self.batch_size > 1 and self.backend_impl().supports_batching
+                and not (self.streaming or self.checkpointing or self.chunk_workers > 1))
+    
+    def set_cache(self, root, max_size_mb=500):
+        """Włącza pamięć podręczną wyników w katalogu root ("" = domyślny, None wyłącza)"""
+        if root is None:
+            self.cache = None
+        else:
+            self.cache = TranscriptionCache(root or None, int(max_size_mb * 1024 * 1024))
+        return True
+    
+    def set_model_cache(self, max_size_mb):
+        """Ustawia budżet pamięci załadowanych modeli w MB (wspólny dla procesu; None = połowa RAM)"""
+        if max_size_mb is not None and max_size_mb <= 0:
+            return False
+        self.model_cache_mb = max_size_mb
+        MODEL_REGISTRY.set_memory_budget(int(max_size_mb * 1024 * 1024) if max_size_mb else default_model_memory_budget())
+        return True
+    
+    def set_audio_cache(self, root, max_size_mb=2048):
+        """Włącza pamięć podręczną wyodrębnionego audio w katalogu root ("" = domyślny, None wyłącza)"""
+        if root is None:
+            self.audio_cache = None
+        else:
+            self.audio_cache = AudioCache(root or None, int(max_size_mb * 1024 * 1024))
+        return True
+    
+    def decoding_signature(self, batched=False):
+        """Ustawienia wpływające na wynik transkrypcji (klucz pamięci podręcznej i stanu zadania)
+        
+        batched oznacza wynik wspólnego dekodowania (process_batch) - okna są
+        dekodowane bez kontekstu poprzednich, więc segmenty różnią się od
+        zwykłej transkrypcji i nie mogą dzielić z nią wpisu.
+        """
+        signature = {
+            "backend": self.backend,
+            "model": self.model_name,
+            "inference": self.inference,
+            "language": self.language,
+            "vad": self.vad,
+            "chunk": [self.chunk_length, self.chunk_overlap] if self.chunk_length else None,
+            "window": self.stream_window if self.streaming or self.checkpointing else None
+        }
+        if batched:
+            signature["batch"] = True
+        return signature
+    
+    def export_settings(self):
+        """Ustawienia przekazywane procesom roboczym (nazwa metody set_* -> argumenty)"""
+        return {
+            "backend": self.backend,
+            "model": self.model_name,
+            "inference": self.inference,
+            "language": self.language,
+            "audio_mode": self.audio_mode,
+            "vad": self.vad,
+            "streaming": (self.streaming, self.stream_window),
+            "checkpointing": self.checkpointing,
+            "output_formats": self.output_formats,
+            "chunking": (self.chunk_length, self.chunk_overlap, self.chunk_workers),
+            "batching": (self.batch_size, self.batch_max_length),
+            "model_cache": self.model_cache_mb,
+            "cache": (self.cache.root, self.cache.max_bytes / (1024 * 1024)) if self.cache else None,
+            "audio_cache": (self.audio_cache.root, self.audio_cache.max_bytes / (1024 * 1024)) if self.audio_cache else None
+        }
+    
+    def cached_transcription(self, video_path, batched=False):
+        """Zwraca (klucz, segmenty) z pamięci podręcznej; segmenty są None przy braku wpisu"""
+        if self.cache is None:
+            return None, None
+        key = self.cache.key(video_path, self.decoding_signature(batched))
+        return key, self.cache.get(key)
+    
+    def close(self):
+        """Zwalnia zasoby pomocnicze (pulę procesów trybu fragmentów)"""
+        if self.chunk_pool is not None:
+            self.chunk_pool.shutdown(wait=False)
+            self.chunk_pool = None
+        
     def cancel(self):
         """Ustawia flagę anulowania operacji"""
         self.cancel_flag = True
     
+    def reset_cancel(self):
+        """Czyści flagę anulowania przed nowym zadaniem
+        
+        Wywołuje ją tylko zlecający zadanie (proces roboczy puli, tryb
+        wsadowy); metody transkrypcji flagi nie czyszczą, więc anulowanie
+        zgłoszone tuż przed rozpoczęciem zadania nie jest gubione.
+        """
+        self.cancel_flag = False
+    
     def update_status(self, message):
         """Aktualizuje status operacji"""
         print(message)
         if self.status_callback:
             self.status_callback(message)
     
-    def update_progress(self, progress):
-        """Aktualizuje postęp operacji (0-100)"""
+    def update_progress(self, progress, details=None):
+        """Aktualizuje postęp operacji (0-100)
+        
+        details to opcjonalny słownik: position i duration (sekundy audio),
+        elapsed (sekundy), realtime_factor (czas przetwarzania / czas audio),
+        speed (odwrotność realtime_factor) oraz eta (sekundy do końca);
+        otrzymuje go tylko progress_details_callback.
+        """
         if self.progress_callback:
             self.progress_callback(progress)
+        if self.progress_details_callback:
+            self.progress_details_callback(progress, details)
+    
+    def begin_progress(self, duration):
+        """Rozpoczyna pomiar postępu dla audio o podanej długości (sekundy)"""
+        self._progress_started = time.time()
+        self._progress_duration = duration
+        self.update_progress(0, self.progress_details(0.0))
+    
+    def progress_details(self, position):
+        """Wylicza szczegóły postępu dla pozycji dekodowania (sekundy audio)"""
+        elapsed = time.time() - self._progress_started if self._progress_started else 0.0
+        duration = self._progress_duration
+        position = min(position, duration) if duration else position
+        realtime_factor = elapsed / position if position > 0 else None
+        return {
+            "position": position,
+            "duration": duration,
+            "elapsed": elapsed,
+            "realtime_factor": realtime_factor,
+            "speed": 1 / realtime_factor if realtime_factor else None,
+            "eta": (duration - position) * realtime_factor if realtime_factor is not None else None
+        }
+    
+    def report_position(self, position):
+        """Raportuje bieżącą pozycję dekodowania (sekundy audio od początku nagrania)"""
+        details = self.progress_details(position)
+        progress = details["position"] / details["duration"] * 100 if details["duration"] else 0
+        self.update_progress(int(progress), details)
     
     def format_time(self, seconds):
         """Konwertuje sekundy do formatu czasu SRT (HH:MM:SS,mmm)"""
-        td = timedelta(seconds=seconds)
-        hours, remainder = divmod(td.seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        milliseconds = int(td.microseconds / 1000)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
-    
-    def extract_audio(self, video_path, output_path="temp_audio.wav"):
-        """Wyodrębnia audio z pliku wideo"""
+        return format_timestamp(seconds)
+    
+    def extract_audio(self, video_path, output_path=None):
+        """Wyodrębnia audio z pliku wideo
+        
+        W trybie "memory" zwraca tablicę NumPy (16 kHz, mono, float32),
+        w trybie "file" zapisuje plik WAV (domyślnie unikalny plik tymczasowy)
+        i zwraca jego ścieżkę. Z włączoną pamięcią podręczną audio zawsze
+        zwracana jest tablica (wpisy przechowują próbki, nie pliki WAV).
+        """
+        if (self.audio_mode == "memory" and output_path is None) or self.audio_cache is not None:
+            return self.extract_audio_array(video_path)
+        
+        if output_path is None:
+            fd, output_path = tempfile.mkstemp(prefix="auto_transcriber_", suffix=".wav")
+            os.close(fd)
+        
         self.update_status(f"Wyodrębnianie audio z pliku wideo: {video_path}")
+        with self.stage("extract_audio", source=video_path, audio_mode="file") as stage:
+            try:
+                from moviepy.editor import VideoFileClip
+                video = VideoFileClip(video_path)
+                stage["audio_seconds"] = video.audio.duration
+                video.audio.write_audiofile(output_path, codec='pcm_s16le', verbose=False, logger=_cancel_logger(self))
+                self.update_status(f"Audio wyodrębnione pomyślnie: {output_path}")
+                return output_path
+            except TranscriptionCancelled:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
+            except Exception as e:
+                self.update_status(f"Błąd podczas wyodrębniania audio: {e}")
+                raise
+    
+    def extract_audio_array(self, video_path, start=0.0):
+        """Dekoduje ścieżkę audio wideo przez potok ffmpeg do tablicy float32 (16 kHz, mono)
+        
+        start (sekundy) pozwala pominąć początek nagrania bez jego dekodowania.
+        Z włączoną pamięcią podręczną audio próbki są najpierw szukane w niej,
+        a całe zdekodowane nagranie jest w niej zapisywane.
+        """
+        with self.stage("extract_audio", source=video_path, audio_mode="memory") as stage:
+            samples = None
+            if self.audio_cache is not None:
+                key = self.audio_cache.key(video_path)
+                samples = self.audio_cache.get(key)
+                self.emit_event("cache_hit" if samples is not None else "cache_miss", source=video_path, cache="audio")
+            if samples is not None:
+                self.update_status(f"Audio z pamięci podręcznej ({len(samples) / SAMPLE_RATE:.1f} s)")
+                samples = samples[int(start * SAMPLE_RATE):]
+            elif self.audio_cache is not None and start <= 0:
+                samples = self._decode_audio_array(video_path, 0.0)
+                self.audio_cache.put(key, samples)
+            else:
+                samples = self._decode_audio_array(video_path, start)
+            
+            # asarray: zwykła tablica zamiast np.memmap (audio trafia też do procesów roboczych)
+            audio = np.asarray(samples).astype(np.float32)
+            audio /= 32768.0
+            stage["audio_seconds"] = len(audio) / SAMPLE_RATE
+        return audio
+    
+    def _decode_audio_array(self, video_path, start):
+        """Uruchamia ffmpeg i odczytuje zdekodowane próbki int16 (z obsługą anulowania)"""
+        self.update_status(f"Dekodowanie audio z pliku wideo do pamięci: {video_path}")
+        seek = ["-ss", f"{start:.3f}"] if start > 0 else []
+        command = [
+            "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+            *seek, "-i", video_path,
+            "-vn", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+            "-"
+        ]
         try:
-            video = VideoFileClip(video_path)
-            video.audio.write_audiofile(output_path, codec='pcm_s16le', verbose=False, logger=None)
-            self.update_status(f"Audio wyodrębnione pomyślnie: {output_path}")
-            return output_path
-        except Exception as e:
-            self.update_status(f"Błąd podczas wyodrębniania audio: {e}")
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            self.update_status("Błąd podczas wyodrębniania audio: nie znaleziono programu ffmpeg w PATH")
             raise
+        
+        # stderr czytany w osobnym wątku: przy wielu komunikatach (np. uszkodzony
+        # plik) zapełniony potok wstrzymałby ffmpeg, zanim stdout dobiegnie końca
+        errors = []
+        stderr_reader = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+        stderr_reader.start()
+        
+        chunks = []
+        while True:
+            if self.cancel_flag:
+                process.kill()
+                process.wait()
+                stderr_reader.join()
+                raise TranscriptionCancelled()
+            chunk = process.stdout.read(1 << 20)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        process.wait()
+        stderr_reader.join()
+        stderr = b"".join(errors).decode("utf-8", errors="replace").strip()
+        
+        if process.returncode != 0:
+            message = f"Błąd podczas wyodrębniania audio: ffmpeg zakończył się kodem {process.returncode}: {stderr}"
+            self.update_status(message)
+            raise RuntimeError(message)
+        
+        samples = np.frombuffer(b"".join(chunks), np.int16)
+        self.update_status(f"Audio zdekodowane pomyślnie ({len(samples) / SAMPLE_RATE:.1f} s)")
+        return samples
+    
+    def model_key(self):
+        """Klucz modelu w MODEL_REGISTRY"""
+        return format_model_key(self.backend, self.model_name, self.inference)
+    
+    def _load_model_weights(self):
+        """Ładuje model z dysku (wywoływane przez MODEL_REGISTRY tylko przy braku modelu w pamięci)"""
+        backend = self.backend_impl()
+        started = time.time()
+        self.update_status(f"Ładowanie modelu {self.model_key()} ({backend.description})...")
+        model = backend.load(self.model_name, self.inference)
+        duration = time.time() - started
+        memory = backend.memory_size(model)
+        self.update_status(f"Model {self.model_key()} załadowany pomyślnie ({duration:.1f} s, {memory / (1024 * 1024):.0f} MB, "
+                           f"{backend.device_info(model)})")
+        self.emit_event("model_load", backend=self.backend, model=self.model_name, inference=self.inference,
+                        duration=duration, memory_bytes=memory)
+        return model
     
     def load_model(self):
-        """Ładuje model Whisper"""
-        if self.model is None:
-            self.update_status(f"Ładowanie modelu Whisper {self.model_name}...")
-            self.model = whisper.load_model(self.model_name)
-            self.update_status(f"Model Whisper {self.model_name} załadowany pomyślnie")
-            return True
-        return False
+        """Ładuje model bieżącego silnika (lub pobiera już załadowany z MODEL_REGISTRY)
+        
+        Zwraca True, gdy model był ładowany z dysku.
+        """
+        _model, loaded = MODEL_REGISTRY.get(self.model_key(), self._load_model_weights, self.backend_impl().memory_size)
+        if not loaded and self._ready_model != self.model_key():
+            self.update_status(f"Model {self.model_key()} gotowy (już w pamięci)")
+        self._ready_model = self.model_key()
+        return loaded
     
-    def transcribe_audio(self, audio_path, language=None):
-        """Transkrybuje audio za pomocą Whisper"""
-        self.cancel_flag = False
+    @property
+    def model(self):
+        """Model bieżącego silnika pobierany z MODEL_REGISTRY przy każdym użyciu
+        
+        Transcriber nie trzyma trwałej referencji do modelu, więc model
+        usunięty z rejestru po przekroczeniu budżetu pamięci jest zwalniany
+        po zakończeniu korzystających z niego zadań.
+        """
+        return MODEL_REGISTRY.get(self.model_key(), self._load_model_weights, self.backend_impl().memory_size)[0]
+    
+    def preload_model(self):
+        """Ładuje bieżący model w tle, aby był gotowy przed rozpoczęciem transkrypcji"""
+        return MODEL_REGISTRY.preload(
+            self.model_key(),
+            self._load_model_weights,
+            on_error=lambda e: self.update_status(f"Błąd wstępnego ładowania modelu: {e}"),
+            sizer=self.backend_impl().memory_size
+        )
+    
+    def detect_language(self, audio):
+        """Wykrywa język na kilku oknach mowy (LANGUAGE_PROBES) i zwraca (język, pewność)
+        
+        Prawdopodobieństwa języków z AVAILABLE_LANGUAGES są sumowane po
+        oknach (głosowanie miękkie); pewność to średnie prawdopodobieństwo
+        zwycięskiego języka.
+        """
+        if isinstance(audio, str):
+            audio = self.extract_audio_array(audio)
+        windows = sample_probe_windows(audio, self.LANGUAGE_PROBES, WHISPER_WINDOW)
+        if not windows:
+            self.update_status(f"Nie wykryto mowy - używany jest język {self.FALLBACK_LANGUAGE}")
+            return self.FALLBACK_LANGUAGE, 0.0
         
+        self.load_model()
+        with self.stage("detect_language", backend=self.backend, model=self.model_name, windows=len(windows)) as stage:
+            votes = dict.fromkeys((code for code in self.AVAILABLE_LANGUAGES if code != "auto"), 0.0)
+            for probabilities in self.backend_impl().detect_language(self.model, windows):
+                for code in votes:
+                    votes[code] += probabilities.get(code, 0.0)
+            language = max(votes, key=votes.get)
+            confidence = votes[language] / len(windows)
+            stage["language"] = language
+        self.update_status(f"Wykryty język: {self.AVAILABLE_LANGUAGES[language]} ({language}, pewność {confidence:.0%}, "
+                           f"okna: {len(windows)})")
+        return language, confidence
+    
+    def source_language(self, video_path, audio):
+        """Język nagrania video_path: zapamiętany w tym procesie, z pamięci podręcznej lub wykryty w audio"""
+        stat = os.stat(video_path)
+        identity = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+        if identity in self.detected_languages:
+            return self.detected_languages[identity]
+        
+        cache_key = self.cache.language_key(video_path) if self.cache is not None else None
+        entry = self.cache.get(cache_key) if cache_key else None
+        if entry:
+            language = entry["language"]
+            self.update_status(f"Język nagrania z pamięci podręcznej: {language}")
+        else:
+            language, confidence = self.detect_language(audio)
+            if cache_key:
+                self.cache.put(cache_key, {"language": language, "confidence": confidence})
+        self.emit_event("language_detected", source=video_path, language=language, cached=bool(entry))
+        self.detected_languages[identity] = language
+        return language
+    
+    @contextlib.contextmanager
+    def using_language(self, language):
+        """Na czas bloku ustawia język transkrypcji (przywracając poprzedni)"""
+        previous = self.language
+        self.language = language
+        try:
+            yield language
+        finally:
+            self.language = previous
+    
+    def resolved_language(self, audio, video_path=None):
+        """Kontekst z językiem "auto" zastąpionym wykrytym (dla video_path zapamiętywanym per plik)"""
+        if self.language != "auto":
+            return contextlib.nullcontext(self.language)
+        if video_path is not None:
+            return self.using_language(self.source_language(video_path, audio))
+        return self.using_language(self.detect_language(audio)[0])
+    
+    def transcribe_audio(self, audio, language=None):
+        """Transkrybuje audio (ścieżka do pliku lub tablica NumPy 16 kHz) za pomocą Whisper"""
         if language is not None:
             self.language = language
         
+        with self.resolved_language(audio):
+            return self._transcribe_audio(audio)
+    
+    def _transcribe_audio(self, audio):
+        """Etap transcribe dla transcribe_audio (język jest już ustalony)"""
+        with self.stage("transcribe", backend=self.backend, model=self.model_name, inference=self.inference) as stage:
+            try:
+                transcription = self._transcribe(audio)
+            except TranscriptionCancelled:
+                self.update_status("Transkrypcja anulowana przez użytkownika")
+                transcription = None
+            if transcription is None:
+                stage["error"] = "cancelled"
+            else:
+                stage["audio_seconds"] = len(audio) / SAMPLE_RATE if not isinstance(audio, str) else self._progress_duration
+                stage["segments"] = len(transcription)
+        return transcription
+    
+    def _transcribe(self, audio):
+        """Wykrywanie mowy, transkrypcja całości lub we fragmentach i przeliczenie czasów"""
+        if (self.chunk_length or self.vad or not self.backend_impl().accepts_paths) and isinstance(audio, str):
+            audio = self.extract_audio_array(audio)
+        
+        # Wstępne wykrywanie mowy: transkrybujemy tylko fragmenty z mową
+        speech_map = None
+        if self.vad:
+            audio, speech_map = self.apply_vad(audio)
+            if len(audio) == 0:
+                self.update_status("Nie wykryto mowy w nagraniu")
+                return []
+        
+        # Długość audio ścieżki pliku jest znana dopiero po zdekodowaniu przez Whisper
+        self.begin_progress(0.0 if isinstance(audio, str) else len(audio) / SAMPLE_RATE)
+        
+        if self.chunk_length and len(audio) > self.chunk_length * SAMPLE_RATE:
+            transcription = self.transcribe_chunked(audio)
+        else:
+            transcription = self._transcribe_whole(audio)
+        
+        if transcription and speech_map:
+            transcription = map_segments_to_original(transcription, speech_map)
+        return transcription
+    
+    def _transcribe_whole(self, audio):
+        """Transkrybuje całe audio jednym wywołaniem modelu"""
         self.load_model()
         
-        self.update_status(f"Rozpoczęcie transkrypcji z użyciem Whisper (model: {self.model_name}, język: {self.language})...")
-        result = self.model.transcribe(audio_path, language=self.language, verbose=False)
+        self.update_status(f"Rozpoczęcie transkrypcji (silnik: {self.backend}, model: {self.model_name}, język: {self.language})...")
+        segments = self._run_model(audio)
         
         # Konwersja segmentów Whisper do naszego formatu
         transcription = []
-        total_segments = len(result["segments"])
+        total_segments = len(segments)
         
-        for i, segment in enumerate(result["segments"]):
+        for i, segment in enumerate(segments):
             if self.cancel_flag:
                 self.update_status("Transkrypcja anulowana przez użytkownika")
                 return None
@@ -158,41 +1970,470 @@ class Transcriber:
                 "end": segment["end"],
                 "text": segment["text"].strip()
             })
-            progress = int((i + 1) / total_segments * 100)
-            self.update_progress(progress)
             self.update_status(f"Transkrypcja segmentu {i+1}/{total_segments}: Udana")
         
-        self.update_status("Transkrypcja zakończona pomyślnie")
-        return transcription
-    
-    def create_srt_file(self, transcription, output_file):
-        """Tworzy plik SRT z danych transkrypcji"""
-        self.update_status(f"Tworzenie pliku SRT: {output_file}")
-        with open(output_file, "w", encoding="utf-8") as f:
-            for i, segment in enumerate(transcription):
-                # SRT index
-                f.write(f"{i+1}\n")
-                
-                # Time codes
-                start_time = self.format_time(segment["start"])
-                end_time = self.format_time(segment["end"])
-                f.write(f"{start_time} --> {end_time}\n")
+        self.update_progress(100, self.progress_details(self._progress_duration))
+        self.update_status("Transkrypcja zakończona pomyślnie")
+        return transcription
+    
+    def transcribe_batch(self, audios):
+        """Transkrybuje wiele krótkich nagrań (tablice NumPy 16 kHz) wspólnymi przebiegami modelu
+        
+        Zwraca listę transkrypcji w kolejności audios lub None po anulowaniu.
+        """
+        speech_maps = [None] * len(audios)
+        if self.vad:
+            audios = list(audios)
+            for i, audio in enumerate(audios):
+                audios[i], speech_maps[i] = self.apply_vad(audio)
+        
+        duration = sum(len(audio) for audio in audios) / SAMPLE_RATE
+        with self.stage("transcribe", backend=self.backend, model=self.model_name, inference=self.inference, files=len(audios)) as stage:
+            self.load_model()
+            self.update_status(f"Wspólna transkrypcja {len(audios)} nagrań ({duration:.0f} s audio, "
+                               f"partie po {self.batch_size} okien, model: {self.model_name}, język: {self.language})...")
+            self.begin_progress(duration)
+            try:
+                results = self.backend_impl().transcribe_batch(
+                    self.model, audios, self.language,
+                    on_position=lambda position, _total: self.report_position(position),
+                    cancelled=lambda: self.cancel_flag,
+                    batch_size=self.batch_size
+                )
+            except TranscriptionCancelled:
+                self.update_status("Transkrypcja anulowana przez użytkownika")
+                stage["error"] = "cancelled"
+                return None
+            
+            transcriptions = []
+            for segments, speech_map in zip(results, speech_maps):
+                transcription = [
+                    {"start": segment["start"], "end": segment["end"], "text": segment["text"].strip()}
+                    for segment in segments
+                ]
+                if transcription and speech_map:
+                    transcription = map_segments_to_original(transcription, speech_map)
+                transcriptions.append(transcription)
+            stage["audio_seconds"] = duration
+            stage["segments"] = sum(len(transcription) for transcription in transcriptions)
+        
+        self.update_progress(100, self.progress_details(duration))
+        self.update_status("Transkrypcja zakończona pomyślnie")
+        return transcriptions
+    
+    def apply_vad(self, audio):
+        """Wykrywa mowę i zwraca (audio złożone z samych fragmentów mowy, mapa czasu)"""
+        regions = detect_speech_regions(audio)
+        speech_samples = sum(end - start for start, end in regions)
+        ratio = speech_samples / len(audio) if len(audio) else 0.0
+        self.update_status(f"Wykrywanie mowy: {len(regions)} fragmentów, mowa stanowi {ratio * 100:.0f}% nagrania")
+        if ratio > 0.95:
+            # Prawie całe nagranie to mowa - składanie nie przyniesie oszczędności
+            return audio, None
+        return compact_speech(audio, regions)
+    
+    def _decode_segments(self, audio, offset=0.0, **options):
+        """Generator surowych segmentów z silnika transkrypcji
+        
+        Pozycja dekodowania (przesunięta o offset sekund) jest raportowana
+        przez report_position. Po anulowaniu silnik zgłasza
+        TranscriptionCancelled (Whisper przed kolejnym przebiegiem kodera
+        lub dekodera).
+        """
+        def on_position(position, total):
+            if not self._progress_duration:
+                self._progress_duration = offset + total
+            self.report_position(offset + position)
+        
+        return self.backend_impl().transcribe(self.model, audio, self.language, on_position=on_position,
+                                              cancelled=lambda: self.cancel_flag, **options)
+    
+    def _run_model(self, audio, offset=0.0, **options):
+        """Transkrybuje audio i zwraca surową listę segmentów (zob. _decode_segments)"""
+        return list(self._decode_segments(audio, offset, **options))
+    
+    def transcribe_chunked(self, audio):
+        """Transkrybuje długie nagranie we fragmentach dzielonych w miejscach ciszy
+        
+        Fragmenty zachodzą na siebie o chunk_overlap sekund; segmenty są łączone
+        w jedną oś czasu, a powtórzenia z obszarów nakładania są usuwane.
+        """
+        chunks = split_audio_chunks(audio, self.chunk_length, self.chunk_overlap)
+        duration = len(audio) / SAMPLE_RATE
+        self.update_status(f"Transkrypcja {duration:.0f} s audio w {len(chunks)} fragmentach "
+                           f"(model: {self.model_name}, język: {self.language}, procesy: {self.chunk_workers})...")
+        
+        if self.chunk_workers > 1:
+            chunk_segments = self._transcribe_chunks_in_pool(audio, chunks)
+        else:
+            self.load_model()
+            chunk_segments = []
+            for i, (start, end, _keep_from, _keep_to) in enumerate(chunks):
+                if self.cancel_flag:
+                    break
+                chunk_segments.append(self._run_model(audio[start:end], offset=start / SAMPLE_RATE))
+                self.update_status(f"Transkrypcja fragmentu {i+1}/{len(chunks)}: Udana")
+        
+        if self.cancel_flag or chunk_segments is None:
+            self.update_status("Transkrypcja anulowana przez użytkownika")
+            return None
+        
+        transcription = merge_chunk_segments(chunks, chunk_segments)
+        self.update_progress(100, self.progress_details(duration))
+        self.update_status(f"Transkrypcja zakończona pomyślnie ({len(transcription)} segmentów)")
+        return transcription
+    
+    def _transcribe_chunks_in_pool(self, audio, chunks):
+        """Zleca fragmenty procesom roboczym i zwraca listy segmentów w kolejności fragmentów"""
+        if self.chunk_pool is not None and (self.chunk_pool.workers != self.chunk_workers
+                                            or self.chunk_pool.settings["backend"] != self.backend
+                                            or self.chunk_pool.settings["model"] != self.model_name
+                                            or self.chunk_pool.settings["inference"] != self.inference):
+            self.close()
+        if self.chunk_pool is None:
+            # Procesy robocze transkrybują gotowe fragmenty: bez ponownego dzielenia,
+            # wspólnego dekodowania i wykrywania mowy (już zastosowanego do całości)
+            settings = {name: value for name, value in self.export_settings().items()
+                        if name not in ("chunking", "batching")}
+            settings["vad"] = False
+            self.chunk_pool = TranscriptionWorkerPool(
+                workers=self.chunk_workers,
+                model_name=self.model_name,
+                language=self.language,
+                audio_mode=self.audio_mode,
+                settings=settings
+            )
+            self.chunk_pool.set_callbacks(status_callback=self.status_callback,
+                                          progress_details_callback=self.update_progress)
+        
+        futures = [
+            self.chunk_pool.submit("transcribe_audio", audio[start:end], language=self.language)
+            for start, end, _keep_from, _keep_to in chunks
+        ]
+        results = []
+        for i, future in enumerate(futures):
+            while not future.done():
+                if self.cancel_flag:
+                    for pending in futures:
+                        self.chunk_pool.cancel(pending)
+                    return None
+                time.sleep(0.2)
+            segments = future.result()
+            if segments is None:  # Fragment anulowany w procesie roboczym
+                return None
+            results.append(segments)
+            self.update_status(f"Transkrypcja fragmentu {i+1}/{len(chunks)}: Udana")
+        return results
+    
+    def output_paths(self, output_file, formats=None):
+        """Ścieżki plików wyjściowych {format: ścieżka}; output_file wyznacza nazwę bez rozszerzenia
+        
+        Plik SRT ma dokładnie ścieżkę output_file (także z niestandardowym
+        rozszerzeniem), pozostałe formaty leżą obok z własnym rozszerzeniem.
+        """
+        base_name = os.path.splitext(output_file)[0]
+        return {
+            name: output_file if name == "srt" else base_name + EXPORTERS[name].extension
+            for name in (formats or self.output_formats)
+        }
+    
+    def transcript_metadata(self):
+        """Ustawienia transkrypcji zapisywane w formatach z metadanymi (JSON)"""
+        return {"backend": self.backend, "model": self.model_name, "inference": self.inference, "language": self.language}
+    
+    def write_outputs(self, transcription, output_file, formats=None):
+        """Zapisuje transkrypcję we wszystkich wybranych formatach jednym przebiegiem; zwraca listę ścieżek"""
+        paths = self.output_paths(output_file, formats)
+        metadata = self.transcript_metadata()
+        with self.stage("write_output", segments=len(transcription), formats=list(paths)):
+            for name, path in paths.items():
+                self.update_status(f"Tworzenie pliku {name.upper()}: {path}")
+                with open(path, "w", encoding="utf-8") as f:
+                    EXPORTERS[name].write(transcription, f, metadata)
+        
+        self.update_status(f"Utworzono pliki: {', '.join(paths.values())}")
+        return list(paths.values())
+    
+    def create_srt_file(self, transcription, output_file):
+        """Tworzy plik SRT z danych transkrypcji"""
+        return self.write_outputs(transcription, output_file, ["srt"])[0]
+    
+    def format_transcription(self, transcription, output_format="srt"):
+        """Zwraca zawartość pliku w danym formacie (bez zapisu na dysk)"""
+        return EXPORTERS[output_format].format(transcription, self.transcript_metadata())
+    
+    def format_srt(self, transcription):
+        """Zwraca zawartość pliku SRT dla danych transkrypcji (bez zapisu na dysk)"""
+        return self.format_transcription(transcription, "srt")
+    
+    def transcribe_stream(self, audio, language=None, start_offset=0.0, previous_text="", window_callback=None):
+        """Generator segmentów transkrypcji zwracanych w miarę postępu dekodowania
+        
+        Audio jest przetwarzane w kolejnych oknach stream_window sekund,
+        ciętych w miejscach ciszy; koniec tekstu poprzedniego okna trafia do
+        następnego jako initial_prompt, aby zachować kontekst. Silniki
+        z supports_streaming dekodują całość jednym wywołaniem, a oknem jest
+        wtedy co najmniej stream_window sekund zwróconych segmentów. Jeśli
+        audio zaczyna się w start_offset sekundzie nagrania, czasy segmentów
+        są odpowiednio przesuwane. window_callback(koniec_okna, tekst) jest
+        wywoływany po każdym zakończonym oknie.
+        """
+        if language is not None:
+            self.language = language
+        
+        if isinstance(audio, str):
+            audio = self.extract_audio_array(audio)
+        
+        speech_map = None
+        if self.vad:
+            audio, speech_map = self.apply_vad(audio)
+        
+        self.load_model()
+        self.begin_progress(len(audio) / SAMPLE_RATE)
+        if start_offset:
+            self.update_status(f"Wznawianie od {format_duration(start_offset)}")
+        self.update_status(f"Rozpoczęcie transkrypcji strumieniowej (silnik: {self.backend}, model: {self.model_name}, "
+                           f"język: {self.language})...")
+        
+        if len(audio) == 0:
+            return
+        
+        def report_window(window_end):
+            if speech_map:
+                window_end = map_time_to_original(window_end, speech_map)
+            window_callback(start_offset + window_end, previous_text)
+        
+        native_streaming = self.backend_impl().supports_streaming
+        if native_streaming:
+            windows = [(0, len(audio))]
+        else:
+            windows = [(start, end) for start, end, _keep_from, _keep_to in
+                       split_audio_chunks(audio, self.stream_window, overlap=0.0)]
+        last_end = 0.0
+        last_window_end = 0.0
+        count = 0
+        for start, end in windows:
+            if self.cancel_flag:
+                self.update_status("Transkrypcja anulowana przez użytkownika")
+                return
+            offset = start / SAMPLE_RATE
+            options = {"initial_prompt": previous_text[-200:]} if previous_text else {}
+            segments = self._decode_segments(audio[start:end], offset=offset, **options)
+            while True:
+                try:
+                    segment = next(segments, None)
+                except TranscriptionCancelled:
+                    self.update_status("Transkrypcja anulowana przez użytkownika")
+                    return
+                if segment is None:
+                    break
+                text = segment["text"].strip()
+                if not text:
+                    continue
+                converted = {
+                    "start": max(segment["start"] + offset, last_end),
+                    "end": segment["end"] + offset,
+                    "text": text
+                }
+                if converted["end"] <= converted["start"]:
+                    continue
+                last_end = converted["end"]
+                previous_text += " " + text
+                if speech_map:
+                    converted = map_segments_to_original([converted], speech_map)[0]
+                if start_offset:
+                    converted["start"] += start_offset
+                    converted["end"] += start_offset
+                count += 1
+                yield converted
                 
-                # Text
-                f.write(f"{segment['text']}\n\n")
+                # Silnik strumieniowy: stan zapisywany co stream_window sekund audio
+                if native_streaming and window_callback and last_end - last_window_end >= self.stream_window:
+                    last_window_end = last_end
+                    report_window(last_end)
+            
+            if window_callback and not self.cancel_flag:
+                report_window(end / SAMPLE_RATE)
         
+        self.update_progress(100, self.progress_details(self._progress_duration))
+        self.update_status(f"Transkrypcja zakończona pomyślnie ({count} segmentów)")
+    
+    def stream_to_srt(self, audio, output_file, checkpoint=None, audio_start=0.0, collected=None):
+        """Transkrybuje audio, dopisując każdy gotowy segment do pliku SRT na bieżąco
+        
+        Z checkpoint (JobCheckpoint) praca jest wznawiana od zapisanego
+        przesunięcia, a stan zapisywany po każdym oknie; audio_start to
+        sekunda nagrania, od której zaczyna się przekazane audio. Jeśli
+        podano listę collected, trafiają do niej wszystkie segmenty.
+        """
+        self.update_status(f"Zapisywanie napisów na bieżąco: {output_file}")
+        start_offset = checkpoint.offset if checkpoint else 0.0
+        previous_text = checkpoint.previous_text if checkpoint else ""
+        
+        if start_offset > audio_start:
+            if isinstance(audio, str):
+                audio = self.extract_audio_array(audio)
+            audio = audio[int((start_offset - audio_start) * SAMPLE_RATE):]
+        
+        writer = SrtStreamWriter(output_file)
+        if checkpoint:
+            for segment in checkpoint.segments:
+                writer.write(segment)
+            if collected is not None:
+                collected.extend(checkpoint.segments)
+        # Po każdym zakończonym oknie zapisywany jest punkt kontrolny
+        window_callback = checkpoint.save if checkpoint else None
+        with self.stage("transcribe", backend=self.backend, model=self.model_name, inference=self.inference, streaming=True) as stage:
+            segments = 0
+            try:
+                for segment in self.transcribe_stream(audio, start_offset=start_offset, previous_text=previous_text,
+                                                      window_callback=window_callback):
+                    writer.write(segment)
+                    segments += 1
+                    if checkpoint:
+                        checkpoint.segments.append(segment)
+                    if collected is not None:
+                        collected.append(segment)
+                stage["segments"] = segments
+                stage["audio_seconds"] = len(audio) / SAMPLE_RATE if not isinstance(audio, str) else self._progress_duration
+                if self.cancel_flag:
+                    stage["error"] = "cancelled"
+                    writer.abort(keep_partial=checkpoint is not None)
+                    return None
+                writer.finalize()
+            except BaseException:
+                writer.abort(keep_partial=checkpoint is not None)
+                raise
+        if checkpoint:
+            checkpoint.remove()
         self.update_status(f"Plik SRT został utworzony: {output_file}")
         return output_file
     
-    def process_video(self, video_path, output_file=None):
-        """Przetwarza plik wideo do pliku SRT"""
+    def job_checkpoint(self, video_path, output_file):
+        """Zwraca JobCheckpoint dla zadania (wczytany, jeśli istnieje zgodny zapisany stan)"""
+        stat = os.stat(video_path)
+        signature = {
+            "source": os.path.abspath(video_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            **self.decoding_signature()
+        }
+        checkpoint = JobCheckpoint(output_file, signature)
+        if checkpoint.load() and checkpoint.offset > 0:
+            self.update_status(f"Znaleziono zapisany stan zadania: {len(checkpoint.segments)} segmentów, "
+                               f"{format_duration(checkpoint.offset)} nagrania")
+        return checkpoint
+    
+    def transcribe_video(self, video_path):
+        """Transkrybuje plik wideo i zwraca listę segmentów bez tworzenia pliku SRT
+        
+        Korzysta z pamięci podręcznej wyników jak process_video; po
+        anulowaniu zwraca None.
+        """
+        cache_key, cached = self.cached_transcription(video_path)
+        if cache_key:
+            self.emit_event("cache_hit" if cached is not None else "cache_miss", source=video_path)
+        if cached is not None:
+            self.update_status(f"Znaleziono wynik w pamięci podręcznej ({len(cached)} segmentów)")
+            return cached
+        
+        audio = None
+        try:
+            audio = self.extract_audio(video_path)
+            with self.resolved_language(audio, video_path):
+                transcription = self.transcribe_audio(audio)
+        except TranscriptionCancelled:
+            self.update_status("Operacja anulowana przez użytkownika")
+            return None
+        finally:
+            if isinstance(audio, str) and os.path.exists(audio):
+                os.remove(audio)
+        
+        if transcription is not None and cache_key:
+            self.cache.put(cache_key, transcription)
+        return transcription
+    
+    def process_video(self, video_path, output_file=None, audio=None):
+        """Przetwarza plik wideo do pliku SRT (i pozostałych formatów z output_formats)
+        
+        Zwraca ścieżkę pierwszego zapisanego pliku. Jeśli podano audio (wyodrębnione wcześniej, np. przez tryb wsadowy),
+        etap wyodrębniania jest pomijany, a plik audio nie jest usuwany.
+        Całe zadanie jest otoczone zdarzeniami job_start i job_end.
+        """
+        started = time.perf_counter()
+        self.emit_event("job_start", source=video_path)
+        status = "failed"
+        try:
+            result = self._process_video(video_path, output_file, audio)
+            status = "done" if result else "cancelled"
+            return result
+        finally:
+            self.emit_event("job_end", source=video_path, status=status, duration=time.perf_counter() - started)
+    
+    def process_batch(self, items):
+        """Przetwarza listę krótkich nagrań (video_path, output_file, audio) jedną wspólną transkrypcją
+        
+        Audio to tablice NumPy wyodrębnione wcześniej. Zwraca listę ścieżek
+        plików SRT (None dla nagrań nieprzetworzonych) w kolejności items;
+        każde nagranie ma własne zdarzenia job_start i job_end.
+        """
+        started = time.perf_counter()
+        for video_path, _output_file, _audio in items:
+            self.emit_event("job_start", source=video_path)
+        statuses = ["failed"] * len(items)
+        results = [None] * len(items)
+        try:
+            # Klucze pamięci podręcznej z ustawionym językiem (także "auto"), jak w process_video;
+            # nagrania z zapisanym wynikiem nie są ponownie dekodowane
+            cache_keys = [None] * len(items)
+            pending = []
+            for i, (video_path, output_file, _audio) in enumerate(items):
+                cache_keys[i], cached = self.cached_transcription(video_path, batched=True)
+                if cache_keys[i]:
+                    self.emit_event("cache_hit" if cached is not None else "cache_miss", source=video_path)
+                if cached is None:
+                    pending.append(i)
+                    continue
+                results[i] = self.write_outputs(cached, output_file)[0]
+                statuses[i] = "done"
+                self.update_status(f"Znaleziono wynik w pamięci podręcznej: {results[i]}")
+            
+            # Przy języku "auto" wspólnie dekodowane są nagrania o tym samym wykrytym języku
+            groups = {}
+            for i in pending:
+                video_path, _output_file, audio = items[i]
+                language = self.source_language(video_path, audio) if self.language == "auto" else self.language
+                groups.setdefault(language, []).append(i)
+            
+            for language, indices in groups.items():
+                with self.using_language(language):
+                    transcriptions = self.transcribe_batch([items[i][2] for i in indices])
+                    if transcriptions is None:
+                        statuses = ["cancelled" if status != "done" else status for status in statuses]
+                        return results
+                    for i, transcription in zip(indices, transcriptions):
+                        output_file = self.write_outputs(transcription, items[i][1])[0]
+                        if cache_keys[i]:
+                            self.cache.put(cache_keys[i], transcription)
+                        results[i] = output_file
+                        statuses[i] = "done"
+                        self.update_status(f"Transkrypcja zakończona pomyślnie! Utworzono plik: {output_file}")
+            return results
+        finally:
+            duration = time.perf_counter() - started
+            for (video_path, _output_file, _audio), status in zip(items, statuses):
+                self.emit_event("job_end", source=video_path, status=status, duration=duration)
+    
+    def _process_video(self, video_path, output_file, audio):
+        """Etapy process_video: pamięć podręczna, wyodrębnienie audio, transkrypcja i zapis SRT"""
         start_time = time.time()
-        self.cancel_flag = False
+        extracted_audio = None
+        checkpoint = None
+        audio_start = 0.0
         
         # Ustawienie domyślnej ścieżki wyjściowej, jeśli nie podano
         if not output_file or not output_file.strip():
-            base_name = os.path.splitext(video_path)[0]
-            output_file = f"{base_name}.srt"
+            output_file = default_output_path(video_path)
         
         try:
             # Wyodrębnienie audio z wideo
@@ -200,754 +2441,1174 @@ class Transcriber:
                 self.update_status("Operacja anulowana przez użytkownika")
                 return None
                 
-            audio_path = self.extract_audio(video_path)
+            cache_key, cached = self.cached_transcription(video_path)
+            if cache_key:
+                self.emit_event("cache_hit" if cached is not None else "cache_miss", source=video_path)
+            if cached is not None:
+                self.update_status(f"Znaleziono wynik w pamięci podręcznej ({len(cached)} segmentów)")
+                output_file = self.write_outputs(cached, output_file)[0]
+                self.update_progress(100)
+                self.update_status(f"Transkrypcja zakończona pomyślnie! Utworzono plik: {output_file}")
+                return output_file
+            
+            if self.checkpointing:
+                checkpoint = self.job_checkpoint(video_path, output_file)
+            
+            if audio is None:
+                if checkpoint and checkpoint.offset > 0 and self.audio_mode == "memory":
+                    # Wznowienie: dekodujemy tylko nieprzetworzoną część nagrania
+                    audio_start = checkpoint.offset
+                    audio = extracted_audio = self.extract_audio_array(video_path, start=audio_start)
+                else:
+                    audio = extracted_audio = self.extract_audio(video_path)
             
             # Transkrypcja audio
             if self.cancel_flag:
                 self.update_status("Operacja anulowana przez użytkownika")
                 return None
                 
-            transcription = self.transcribe_audio(audio_path)
-            if transcription is None:  # Anulowano podczas transkrypcji
-                return None
-            
-            # Utworzenie pliku SRT
-            if self.cancel_flag:
-                self.update_status("Operacja anulowana przez użytkownika")
-                return None
+            # Język "auto" jest wykrywany raz na plik (także dla stanu wznowienia i fragmentów)
+            with self.resolved_language(audio, video_path):
+                if self.streaming or checkpoint:
+                    # Napisy zapisywane na bieżąco, bez gromadzenia całej transkrypcji w pamięci
+                    # (chyba że potrzebują jej pamięć podręczna lub pozostałe formaty wyjściowe)
+                    other_formats = [name for name in self.output_formats if name != "srt"]
+                    collected = [] if cache_key or other_formats else None
+                    if self.stream_to_srt(audio, output_file, checkpoint, audio_start, collected) is None:
+                        return None
+                    if other_formats:
+                        self.write_outputs(collected, output_file, other_formats)
+                    if cache_key:
+                        self.cache.put(cache_key, collected)
+                else:
+                    transcription = self.transcribe_audio(audio)
+                    if transcription is None:  # Anulowano podczas transkrypcji
+                        return None
+                    
+                    # Utworzenie plików wyjściowych
+                    if self.cancel_flag:
+                        self.update_status("Operacja anulowana przez użytkownika")
+                        return None
+                        
+                    output_file = self.write_outputs(transcription, output_file)[0]
+                    if cache_key:
+                        self.cache.put(cache_key, transcription)
                 
-            self.create_srt_file(transcription, output_file)
-            
             elapsed_time = time.time() - start_time
             self.update_status(f"Transkrypcja zakończona pomyślnie! Utworzono plik: {output_file}")
             self.update_status(f"Całkowity czas wykonania: {elapsed_time:.2f} sekund")
             
             return output_file
+        except TranscriptionCancelled:
+            self.update_status("Operacja anulowana przez użytkownika")
+            return None
         except Exception as e:
             self.update_status(f"Błąd: {str(e)}")
             raise
         finally:
             # Usunięcie tymczasowego pliku audio
-            if 'audio_path' in locals() and os.path.exists(audio_path):
-                os.remove(audio_path)
+            if isinstance(extracted_audio, str) and os.path.exists(extracted_audio):
+                os.remove(extracted_audio)
                 self.update_status("Usunięto tymczasowy plik audio")
 
-class TranscriberGUI(MDBoxLayout):
-    """Główny interfejs użytkownika aplikacji"""
-    
-    def __init__(self, **kwargs):
-        super(TranscriberGUI, self).__init__(**kwargs)
-        self.orientation = "vertical"
-        self.padding = [20, 20, 20, 20]  # Jednolite marginesy
-        self.spacing = 15  # Zwiększony odstęp między elementami
-        self.md_bg_color = [0.1, 0.1, 0.12, 1]  # Tło dla całego interfejsu
-        
-        self.transcriber = Transcriber()
-        self.selected_file = None
-        self.output_file = None
-        self.transcription_thread = None
-        self.file_manager = None
-        
-        # Główna karta z całą zawartością
-        self.main_card = MDCard(
-            orientation="vertical",
-            padding=(20, 40, 20, 20),  # Jeszcze bardziej zwiększony padding górny
-            size_hint=(0.95, 0.92),  # Bardziej zmniejszona wysokość karty
-            pos_hint={"center_x": 0.5, "center_y": 0.5},
-            elevation=4,
-            md_bg_color=(0.1, 0.1, 0.12, 1)
-        )
-        
-        # Tytuł aplikacji
-        self.title_label = MDLabel(
-            text="Automatyczna transkrypcja plików wideo",
-            halign="center",
-            font_style="H5",
-            size_hint_y=None,
-            height=70,  # Jeszcze bardziej zwiększona wysokość etykiety tytułu
-            theme_text_color="Custom",
-            text_color=(0.9, 0.9, 0.9, 1),
-            padding=(0, 10, 0, 0)  # Dodatkowy padding górny
-        )
-        self.main_card.add_widget(self.title_label)
-        
-        # Opis aplikacji
-        self.description_label = MDLabel(
-            text="",
-            halign="center",
-            size_hint_y=None,
-            height=40,  # Zmniejszona wysokość
-            theme_text_color="Secondary",
-            font_style="Subtitle1"
-        )
-        self.main_card.add_widget(self.description_label)
-        
-        # Separator po tytule
-        self.separator1 = BoxLayout(
-            size_hint_y=None,
-            height=2,
-            padding=(0, 15, 0, 15),  # Zwiększony padding
-            pos_hint={"center_x": 0.5}  # Wycentrowanie w poziomie
-        )
-        with self.separator1.canvas:
-            Color(0.3, 0.3, 0.3, 1)
-            Rectangle(pos=self.separator1.pos, size=self.separator1.size)
-        self.main_card.add_widget(self.separator1)
-        
-        # Inicjalizacja file managera - nie będziemy go używać, zamiast tego użyjemy eksploratora Windows
-        
-        # Sekcja wyboru pliku wejściowego i wyjściowego
-        self.file_section = MDBoxLayout(
-            orientation="vertical",
-            size_hint_y=None,
-            height=220,  # Zwiększona wysokość sekcji dla dodatkowego pola
-            spacing=10,  # Zmniejszony odstęp
-            padding=[0, 10, 0, 10]
-        )
-        
-        # Nagłówek sekcji
-        self.file_section_header = MDLabel(
-            text="WYBIERZ PLIKI",
-            halign="center",
-            size_hint_y=None,
-            height=20,
-            bold=True,
-            theme_text_color="Primary"
-        )
-        self.file_section.add_widget(self.file_section_header)
-        
-        # Wybór pliku wejściowego - pole tekstowe z przyciskiem eksploratora
-        self.file_input_label = MDLabel(
-            text="Plik wideo wejściowy:",
-            size_hint_y=None,
-            height=20,
-            theme_text_color="Secondary"
-        )
-        self.file_section.add_widget(self.file_input_label)
-        
-        self.file_input_layout = MDBoxLayout(
-            orientation="horizontal",
-            size_hint_y=None,
-            height=50,
-            spacing=10
-        )
-        
-        # Pole tekstowe w stylu MDTextField dla pliku wejściowego
-        self.file_input = MDTextField(
-            hint_text="Ścieżka do pliku wideo",
-            helper_text="Wprowadź ścieżkę lub kliknij 'Przeglądaj'",
-            helper_text_mode="on_focus",
-            multiline=False,
-            size_hint_x=0.8
-        )
-        self.file_input.bind(text=self.on_file_input_change)
-        self.file_input_layout.add_widget(self.file_input)
-        
-        # Przycisk eksploratora dla pliku wejściowego
-        self.browse_button = MDRaisedButton(
-            text="Przeglądaj",
-            on_release=self.open_file_manager,
-            size_hint_x=0.2,
-            md_bg_color=self.theme_cls.accent_color
-        )
-        self.file_input_layout.add_widget(self.browse_button)
-        
-        self.file_section.add_widget(self.file_input_layout)
-        
-        # Wybór pliku wyjściowego - pole tekstowe z przyciskiem eksploratora
-        self.output_file_label = MDLabel(
-            text="Plik napisów wyjściowy:",
-            size_hint_y=None,
-            height=20,
-            theme_text_color="Secondary"
-        )
-        self.file_section.add_widget(self.output_file_label)
-        
-        self.output_file_layout = MDBoxLayout(
-            orientation="horizontal",
-            size_hint_y=None,
-            height=50,
-            spacing=10
-        )
-        
-        # Pole tekstowe w stylu MDTextField dla pliku wyjściowego
-        self.output_file_input = MDTextField(
-            hint_text="Ścieżka do pliku SRT",
-            helper_text="Wprowadź ścieżkę lub kliknij 'Przeglądaj'",
-            helper_text_mode="on_focus",
-            multiline=False,
-            size_hint_x=0.8
-        )
-        self.output_file_layout.add_widget(self.output_file_input)
-        
-        # Przycisk eksploratora dla pliku wyjściowego
-        self.output_browse_button = MDRaisedButton(
-            text="Przeglądaj",
-            on_release=self.open_output_file_manager,
-            size_hint_x=0.2,
-            md_bg_color=self.theme_cls.accent_color
-        )
-        self.output_file_layout.add_widget(self.output_browse_button)
-        
-        self.file_section.add_widget(self.output_file_layout)
-        
-        # Informacja o wybranych plikach
-        self.selected_file_label = MDLabel(
-            text="Nie wybrano plików",
-            halign="center",
-            size_hint_y=None,
-            height=20,
-            theme_text_color="Secondary",
-            font_style="Caption"
-        )
-        self.file_section.add_widget(self.selected_file_label)
-        
-        self.main_card.add_widget(self.file_section)
-        
-        # Separator (linia pozioma)
-        self.separator2 = BoxLayout(
-            size_hint_y=None,
-            height=2,
-            padding=[5, 5, 5, 5]
-        )
-        # Dodajemy kolor tła do separatora
-        with self.separator2.canvas.before:
-            Color(0.3, 0.3, 0.3, 1)
-            Rectangle(pos=self.separator2.pos, size=self.separator2.size)
-        self.main_card.add_widget(self.separator2)
-        
 
-        
-        # Sekcja opcji transkrypcji
-        self.options_section = MDBoxLayout(
-            orientation="vertical",
-            size_hint_y=None,
-            height=150,
-            spacing=10,
-            padding=[0, 10, 0, 10]
-        )
-        
-        # Nagłówek sekcji opcji
-        self.options_section_header = MDLabel(
-            text="OPCJE TRANSKRYPCJI",
-            halign="center",
-            size_hint_y=None,
-            height=30,
-            bold=True,
-            theme_text_color="Primary"
-        )
-        self.options_section.add_widget(self.options_section_header)
-        
-        # Opcje transkrypcji - dropdowny
-        self.options_layout = MDBoxLayout(
-            orientation="horizontal",
-            size_hint_y=None,
-            height=100,
-            spacing=20
-        )
-        
-        # Wybór języka
-        self.language_layout = MDBoxLayout(
-            orientation="vertical",
-            size_hint_x=0.5,
-            spacing=5
-        )
-        
-        self.language_label = MDLabel(
-            text="Język transkrypcji:",
-            size_hint_y=None,
-            height=20,
-            theme_text_color="Secondary"
-        )
-        self.language_layout.add_widget(self.language_label)
-        
-        # Dropdown języka
-        self.language_dropdown = DropDown()
-        self.language_dropdown.background_color = [0.2, 0.2, 0.25, 1]
-        
-        for lang_code, lang_name in self.transcriber.AVAILABLE_LANGUAGES.items():
-            btn = Button(
-                text=f"{lang_name} ({lang_code})",
-                size_hint_y=None,
-                height=44,
-                background_color=[0.25, 0.25, 0.3, 1],
-                background_normal="",
-                color=[0.9, 0.9, 0.9, 1]
-            )
-            btn.bind(on_release=lambda btn, lang_code=lang_code: self.select_language(lang_code, btn.text))
-            self.language_dropdown.add_widget(btn)
-        
-        self.language_button = Button(
-            text="Polski (pl)",
-            size_hint_y=None,
-            height=50,
-            background_color=[0.3, 0.3, 0.35, 1],
-            background_normal="",
-            color=[0.9, 0.9, 0.9, 1]
-        )
-        self.language_button.bind(on_release=self.language_dropdown.open)
-        self.language_layout.add_widget(self.language_button)
-        
-        self.options_layout.add_widget(self.language_layout)
-        
-        # Wybór modelu
-        self.model_layout = MDBoxLayout(
-            orientation="vertical",
-            size_hint_x=0.5,
-            spacing=5
-        )
-        
-        self.model_label = MDLabel(
-            text="Siła transkrypcji (model):",
-            size_hint_y=None,
-            height=20,
-            theme_text_color="Secondary"
-        )
-        self.model_layout.add_widget(self.model_label)
-        
-        # Dropdown modelu
-        self.model_dropdown = DropDown()
-        self.model_dropdown.background_color = [0.2, 0.2, 0.25, 1]
-        
-        for model_name, model_desc in self.transcriber.AVAILABLE_MODELS.items():
-            btn = Button(
-                text=f"{model_name} - {model_desc}",
-                size_hint_y=None,
-                height=44,
-                background_color=[0.25, 0.25, 0.3, 1],
-                background_normal="",
-                color=[0.9, 0.9, 0.9, 1]
-            )
-            btn.bind(on_release=lambda btn, model=model_name: self.select_model(model, btn.text))
-            self.model_dropdown.add_widget(btn)
-        
-        self.model_button = Button(
-            text="large - Najdokładniejszy, najwolniejszy",
-            size_hint_y=None,
-            height=50,
-            background_color=[0.3, 0.3, 0.35, 1],
-            background_normal="",
-            color=[0.9, 0.9, 0.9, 1]
-        )
-        self.model_button.bind(on_release=self.model_dropdown.open)
-        self.model_layout.add_widget(self.model_button)
-        
-        self.options_layout.add_widget(self.model_layout)
-        
-        self.options_section.add_widget(self.options_layout)
-        self.main_card.add_widget(self.options_section)
-        
-        # Separator (linia pozioma)
-        self.separator3 = BoxLayout(
-            size_hint_y=None,
-            height=2,
-            padding=[5, 5, 5, 5]
-        )
-        # Dodajemy kolor tła do separatora
-        with self.separator3.canvas.before:
-            Color(0.3, 0.3, 0.3, 1)
-            Rectangle(pos=self.separator3.pos, size=self.separator3.size)
-        self.main_card.add_widget(self.separator3)
-        
-        # Sekcja postępu
-        self.progress_section = MDBoxLayout(
-            orientation="vertical",
-            size_hint_y=None,
-            height=150,
-            spacing=10,
-            padding=[0, 10, 0, 10]
-        )
-        
-        # Nagłówek sekcji postępu
-        self.progress_section_header = MDLabel(
-            text="STATUS TRANSKRYPCJI",
-            halign="center",
-            size_hint_y=None,
-            height=30,
-            bold=True,
-            theme_text_color="Primary"
-        )
-        self.progress_section.add_widget(self.progress_section_header)
-        
-        # Pasek postępu - asynchroniczny
-        self.progress_bar = MDProgressBar(
-            value=0,
-            size_hint_y=None,
-            height=15,
-            color=self.theme_cls.accent_color,
-            running_duration=1,
-            catching_duration=1.5
-        )
-        self.progress_section.add_widget(self.progress_bar)
-        
-        # Status transkrypcji
-        self.status_label = MDLabel(
-            text="Gotowy do transkrypcji",
-            halign="center",
-            size_hint_y=None,
-            height=30,
-            theme_text_color="Primary",
-            font_style="Subtitle1"
-        )
-        self.progress_section.add_widget(self.status_label)
-        
-        # Dodatkowy label dla informacji o modelu i języku
-        self.info_label = MDLabel(
-            text="Model: large | Język: Polski (pl)",
-            halign="center",
-            size_hint_y=None,
-            height=30,
-            theme_text_color="Secondary",
-            font_style="Caption"
-        )
-        self.progress_section.add_widget(self.info_label)
-        
-        self.main_card.add_widget(self.progress_section)
-        
-        # Separator (linia pozioma)
-        self.separator4 = BoxLayout(
-            size_hint_y=None,
-            height=2,
-            padding=[5, 5, 5, 5]
-        )
-        # Dodajemy kolor tła do separatora
-        with self.separator4.canvas.before:
-            Color(0.3, 0.3, 0.3, 1)
-            Rectangle(pos=self.separator4.pos, size=self.separator4.size)
-        self.main_card.add_widget(self.separator4)
-        
-        # Sekcja przycisków akcji
-        self.buttons_section = MDBoxLayout(
-            orientation="vertical",
-            size_hint_y=None,
-            height=100,
-            spacing=10,
-            padding=[0, 20, 0, 10]
-        )
-        
-        # Przyciski akcji
-        self.buttons_layout = MDBoxLayout(
-            orientation="horizontal",
-            size_hint_y=None,
-            height=60,
-            spacing=20,
-            padding=[20, 0, 20, 0]
-        )
-        
-        self.transcribe_button = MDRaisedButton(
-            text="ROZPOCZNIJ TRANSKRYPCJĘ",
-            on_release=self.start_transcription,
-            disabled=True,
-            size_hint_x=0.6,
-            height=50,
-            md_bg_color=self.theme_cls.primary_color,
-            elevation=4,
-            font_style="Button"
-        )
-        self.buttons_layout.add_widget(self.transcribe_button)
-        
-        self.cancel_button = MDRaisedButton(
-            text="ANULUJ",
-            on_release=self.cancel_transcription,
-            disabled=True,
-            md_bg_color=[0.8, 0.2, 0.2, 1],
-            size_hint_x=0.4,
-            height=50,
-            elevation=4,
-            font_style="Button"
-        )
-        self.buttons_layout.add_widget(self.cancel_button)
-        
-        self.buttons_section.add_widget(self.buttons_layout)
-        self.main_card.add_widget(self.buttons_section)
-        
-        # Dodanie głównej karty do interfejsu
-        self.add_widget(self.main_card)
-        
-        # Ustawienie callbacków dla Transcribera
-        self.transcriber.set_callbacks(
-            progress_callback=self.update_progress,
-            status_callback=self.update_status
-        )
+
+def probe_duration(path):
+    """Długość nagrania w sekundach odczytana z nagłówka kontenera (bez dekodowania)
     
-    def on_file_input_change(self, instance, value):
-        """Obsługa zmiany tekstu w polu ścieżki pliku wejściowego"""
-        if os.path.isfile(value):
-            self.selected_file = value
-            filename = os.path.basename(self.selected_file)
-            
-            # Ustaw domyślną ścieżkę wyjściową i zaktualizuj pole
-            base_name = os.path.splitext(self.selected_file)[0]
-            self.output_file = f"{base_name}.srt"
-            self.output_file_input.text = self.output_file
-            
-            # Aktualizuj etykietę informacyjną
-            self.selected_file_label.text = f"Wejście: {filename} | Wyjście: {os.path.basename(self.output_file)}"
-            self.update_transcribe_button_state()
-        else:
-            self.selected_file = None
-            self.update_transcribe_button_state()
-            self.selected_file_label.text = "Nieprawidłowa ścieżka pliku wejściowego"
-    
-    def open_file_manager(self, instance):
-        """Otwiera eksplorator Windows do wyboru pliku wejściowego"""
-        import tkinter as tk
-        from tkinter import filedialog
-        
-        # Ukryj główne okno Tkinter
-        root = tk.Tk()
-        root.withdraw()
-        
-        # Otwieranie eksploratora Windows
-        file_types = [
-            ("Pliki wideo", "*.mp4;*.avi;*.mkv;*.mov;*.wmv"),
-            ("Wszystkie pliki", "*.*")
-        ]
-        path = filedialog.askopenfilename(
-            title="Wybierz plik wideo wejściowy",
-            filetypes=file_types,
-            initialdir=os.path.expanduser("~")
-        )
+    Używa ffprobe, a gdy go brak (np. samo ffmpeg z imageio-ffmpeg) -
+    wiersza "Duration:" wypisywanego przez `ffmpeg -i`. Zwraca None, gdy
+    żaden program nie jest dostępny lub plik nie został rozpoznany.
+    """
+    try:
+        try:
+            output = subprocess.run(["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                                     "-of", "default=noprint_wrappers=1:nokey=1", path],
+                                    capture_output=True, text=True, timeout=30).stdout
+            return float(output.strip())
+        except FileNotFoundError:
+            # ffmpeg bez pliku wyjściowego kończy się błędem po odczycie nagłówka
+            output = subprocess.run(["ffmpeg", "-nostdin", "-hide_banner", "-i", path],
+                                    capture_output=True, text=True, timeout=30).stderr
+            match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", output)
+            if match is None:
+                return None
+            hours, minutes, seconds = match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+
+
+def path_priority(path, patterns):
+    """Priorytet pliku: 1, gdy ścieżka lub nazwa pasuje do któregoś wzorca glob, w przeciwnym razie 0"""
+    name = os.path.basename(path)
+    return int(any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns or ()))
+
+
+class RealtimeFactorHistory:
+    """Zmierzone współczynniki czasu rzeczywistego modeli (czas transkrypcji / długość audio)
+    
+    Działa jako hak zdarzeń: każde udane stage_end etapu transcribe
+    aktualizuje średnią wykładniczą dla klucza modelu (format_model_key).
+    Wartości są zapisywane w pliku JSON, więc szacunki kosztu zadań są
+    dostępne od pierwszego pliku kolejnego uruchomienia; zmiany zapisane
+    przez inne procesy (np. procesy robocze puli) są wczytywane przy odczycie.
+    Dla modeli bez pomiarów używane są zgrubne wartości dla CPU z DEFAULTS.
+    """
+    
+    DEFAULTS = {"tiny": 0.05, "base": 0.1, "small": 0.3, "medium": 0.8, "large": 1.5}
+    
+    def __init__(self, path=os.path.join(CACHE_DIR, "realtime_factors.json"), smoothing=0.3):
+        self.path = path
+        self.smoothing = smoothing
+        self._values = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+    
+    def _reload(self):
+        """Wczytuje plik, jeśli zmienił się od ostatniego odczytu (wywoływane pod blokadą)"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._values = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError):
+            pass
+    
+    def get(self, key):
+        """Współczynnik dla klucza modelu (zmierzony lub domyślny dla rozmiaru modelu)"""
+        with self._lock:
+            self._reload()
+            if key in self._values:
+                return self._values[key]
+        size = key.rsplit("/", 1)[-1].split("-", 1)[0]
+        return self.DEFAULTS.get(size, 1.0)
+    
+    def update(self, key, value):
+        """Dodaje pomiar do średniej i zapisuje plik atomowo (plik tymczasowy + zamiana)"""
+        with self._lock:
+            self._reload()
+            previous = self._values.get(key)
+            self._values[key] = value if previous is None else previous + self.smoothing * (value - previous)
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._values, f, indent=1, sort_keys=True)
+                os.replace(temp_path, self.path)
+                self._mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                pass
+    
+    def __call__(self, event):
+        if (event["event"] == "stage_end" and event.get("stage") == "transcribe" and "error" not in event
+                and event.get("audio_seconds")):
+            key = format_model_key(event.get("backend", "whisper"), event.get("model", ""), event.get("inference", "fp32"))
+            self.update(key, event["duration"] / event["audio_seconds"])
+
+
+# Historia RTF wspólna dla procesu (szacowanie kosztu zadań w kolejkach)
+REALTIME_FACTORS = RealtimeFactorHistory()
+
+
+class JobScheduler:
+    """Kolejka zadań oczekujących: najpierw wyższy priorytet, w jego obrębie najmniejszy szacowany koszt
+    
+    Koszt to szacowany czas przetwarzania (długość nagrania razy RTF
+    modelu). Postarzanie zmniejsza koszt o aging sekund za każdą sekundę
+    oczekiwania, więc długie nagranie nie czeka bez końca na coraz nowsze
+    krótkie. Klucz koszt - aging * (teraz - dodanie) porządkuje zadania
+    tak samo jak stały koszt + aging * dodanie, dlatego wystarcza kopiec.
+    Przy jednakowym koszcie (np. 0 dla kolejności fifo) zadania wychodzą
+    w kolejności dodania.
+    """
+    
+    def __init__(self, aging=1.0):
+        self.aging = aging
+        self._heap = []
+        self._counter = itertools.count()
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    def push(self, job, cost=0.0, priority=0, queued=None):
+        queued = time.time() if queued is None else queued
+        heapq.heappush(self._heap, (-priority, cost + self.aging * queued, next(self._counter), job))
+    
+    def pop(self):
+        """Usuwa i zwraca zadanie, które powinno być wykonane jako następne"""
+        return heapq.heappop(self._heap)[-1]
+
+
+def _apply_setting(transcriber, name, value):
+    """Wywołuje Transcriber.set_<name>; krotka jest rozwijana na kolejne argumenty"""
+    setter = getattr(transcriber, f"set_{name}")
+    if isinstance(value, tuple):
+        return setter(*value)
+    return setter(value)
+
+
+def _pool_worker_main(worker_id, settings, threads, inbox, outbox, cancel_event, cancel_job, forward_events=False):
+    """Pętla procesu roboczego puli: jeden model w pamięci, zadania z własnej kolejki"""
+    if threads:
+        os.environ["OMP_NUM_THREADS"] = str(threads)  # Liczba wątków CTranslate2 (faster-whisper)
+        if settings.get("backend", "whisper") == "whisper":
+            import torch
+            torch.set_num_threads(threads)
+    
+    transcriber = Transcriber()
+    for name, value in settings.items():
+        _apply_setting(transcriber, name, value)
+    
+    current = {"job_id": None}
+    if forward_events:
+        transcriber.add_event_hook(lambda event: outbox.put(("event", worker_id, current["job_id"], event)))
+    transcriber.set_callbacks(
+        status_callback=lambda message: outbox.put(("status", worker_id, current["job_id"], message)),
+        progress_details_callback=lambda progress, details: outbox.put(("progress", worker_id, current["job_id"],
+                                                                         (progress, details)))
+    )
+    
+    # Anulowanie zgłaszane przez proces nadrzędny: cancel_job to identyfikator
+    # anulowanego zadania, cancel_event budzi wątek; spóźnione anulowanie
+    # poprzedniego zadania nie dotyczy bieżącego
+    def watch_cancel():
+        while True:
+            cancel_event.wait()
+            cancel_event.clear()
+            if cancel_job.value == current["job_id"]:
+                transcriber.cancel()
+    threading.Thread(target=watch_cancel, daemon=True).start()
+    
+    try:
+        transcriber.load_model()
+    except Exception as e:
+        outbox.put(("failed", worker_id, None, f"{type(e).__name__}: {e}"))
+        return
+    outbox.put(("ready", worker_id, None, None))
+    
+    while True:
+        job = inbox.get()
+        if job is None:
+            break
+        job_id, method, args, kwargs, job_settings = job
+        current["job_id"] = job_id
+        transcriber.reset_cancel()
+        if cancel_job.value == job_id:
+            # Anulowanie zgłoszone po przydzieleniu, a przed rozpoczęciem zadania
+            transcriber.cancel()
+        try:
+            for name, value in job_settings.items():
+                _apply_setting(transcriber, name, value)
+            result = getattr(transcriber, method)(*args, **kwargs)
+            outbox.put(("done", worker_id, job_id, result))
+        except Exception as e:
+            outbox.put(("error", worker_id, job_id, f"{type(e).__name__}: {e}"))
+        finally:
+            current["job_id"] = None
+            # Przywrócenie ustawień puli po zadaniu z własnymi ustawieniami
+            for name in job_settings:
+                if name in settings:
+                    _apply_setting(transcriber, name, settings[name])
+
+
+class TranscriptionWorkerPool(EventSource):
+    """Pula procesów roboczych, z których każdy trzyma w pamięci własny model Whisper
+    
+    Zadania (wywołania metod Transcriber, np. process_video) czekają w kolejce
+    procesu nadrzędnego (JobScheduler) i są przydzielane wolnym procesom:
+    przy schedule="shortest" najpierw zadania o najkrótszym szacowanym czasie
+    przetwarzania (z postarzaniem aging), przy "fifo" w kolejności
+    zgłoszenia; wyższy priorytet zawsze wyprzedza niższy. Wynik każdego
+    zadania jest dostępny jako concurrent.futures.Future, a statusy i łączny
+    postęp trafiają do callbacków ustawionych przez set_callbacks jak w Transcriber.
+    """
+    
+    def __init__(self, workers=2, model_name="large", language="pl", audio_mode="memory", threads_per_worker=None,
+                 settings=None, schedule="shortest", aging=1.0):
+        self.workers = max(1, workers)
+        self.settings = dict(settings or {})
+        self.settings.update({"model": model_name, "language": language, "audio_mode": audio_mode})
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        self.threads_per_worker = threads_per_worker
+        self.progress_callback = None
+        self.progress_details_callback = None
+        self.status_callback = None
+        self.event_hooks = []  # Zdarzenia puli i zdarzenia przekazywane z procesów roboczych
+        self.schedule = schedule
+        self.realtime_factors = REALTIME_FACTORS
+        if schedule == "shortest":
+            # Pomiary czasu transkrypcji z procesów roboczych poprawiają kolejne szacunki
+            self.add_event_hook(self.realtime_factors)
+        
+        self._context = multiprocessing.get_context("spawn")
+        self._outbox = None
+        self._slots = []
+        self._pending = JobScheduler(aging)
+        self._jobs = {}
+        self._job_times = {}  # job_id -> (czas zlecenia, czas rozpoczęcia lub None)
+        self._queued_events = []  # Zdarzenia zebrane pod blokadą, emitowane po jej zwolnieniu
+        self._job_counter = itertools.count(1)
+        self._lock = threading.Lock()
+        # Uruchamianie i zatrzymywanie procesów (start, terminate, shutdown, submit)
+        # wykonuje się w całości pod osobną blokadą, bo terminate czeka na wątek
+        # rozdzielający, który sam korzysta z self._lock
+        self._lifecycle_lock = threading.Lock()
+        self._dispatcher = None
+        self._running = False
+        
+        # Stan do wyliczania łącznego postępu
+        self._submitted = 0
+        self._finished = 0
+        self._job_progress = {}
+        self._finished_audio = 0.0
+        self._series_started = time.time()
+    
+    def set_callbacks(self, progress_callback=None, status_callback=None, progress_details_callback=None):
+        """Ustawia funkcje callback do raportowania postępu
         
-        # Obsługa wybranego pliku
-        if path and os.path.isfile(path):
-            self.file_input.text = path
-            self.selected_file = path
-            filename = os.path.basename(path)
-            
-            # Ustaw domyślną ścieżkę wyjściową i zaktualizuj pole
-            base_name = os.path.splitext(self.selected_file)[0]
-            self.output_file = f"{base_name}.srt"
-            self.output_file_input.text = self.output_file
-            
-            # Aktualizuj etykietę informacyjną
-            self.selected_file_label.text = f"Wejście: {filename} | Wyjście: {os.path.basename(self.output_file)}"
-            self.update_transcribe_button_state()
-        
-        # Zniszcz obiekt Tkinter
-        root.destroy()
-    
-    def open_output_file_manager(self, instance):
-        """Otwiera eksplorator Windows do wyboru pliku wyjściowego"""
-        import tkinter as tk
-        from tkinter import filedialog
-        
-        # Ukryj główne okno Tkinter
-        root = tk.Tk()
-        root.withdraw()
-        
-        # Otwieranie eksploratora Windows
-        file_types = [
-            ("Pliki napisów SRT", "*.srt"),
-            ("Wszystkie pliki", "*.*")
-        ]
+        progress_callback(postęp) otrzymuje sam postęp (0-100), a opcjonalny
+        progress_details_callback(postęp, szczegóły) także słownik szczegółów.
+        """
+        self.progress_callback = progress_callback
+        self.progress_details_callback = progress_details_callback
+        self.status_callback = status_callback
+    
+    def update_status(self, message):
+        """Przekazuje status do callbacku"""
+        if self.status_callback:
+            self.status_callback(message)
+    
+    def update_progress(self):
+        """Przekazuje łączny postęp wszystkich zleconych zadań (0-100) wraz ze szczegółami
         
-        # Ustal domyślną nazwę pliku
-        default_filename = ""
-        if self.selected_file:
-            base_name = os.path.splitext(self.selected_file)[0]
-            default_filename = f"{os.path.basename(base_name)}.srt"
-        
-        # Ustal domyślny katalog
-        initial_dir = os.path.expanduser("~")
-        if self.selected_file:
-            initial_dir = os.path.dirname(self.selected_file)
-        
-        path = filedialog.asksaveasfilename(
-            title="Wybierz plik napisów wyjściowy",
-            filetypes=file_types,
-            initialdir=initial_dir,
-            initialfile=default_filename,
-            defaultextension=".srt"
+        position to suma sekund audio przetworzonych we wszystkich zadaniach,
+        a realtime_factor odnosi czas od rozpoczęcia serii zadań do tej sumy.
+        """
+        if not (self.progress_callback or self.progress_details_callback) or not self._submitted:
+            return
+        running = list(self._job_progress.values())
+        done = self._finished + sum(progress for progress, _details in running) / 100
+        progress = done / self._submitted * 100
+        
+        position = self._finished_audio + sum(details["position"] for _progress, details in running if details)
+        elapsed = time.time() - self._series_started
+        realtime_factor = elapsed / position if position > 0 else None
+        details = {
+            "position": position,
+            "elapsed": elapsed,
+            "realtime_factor": realtime_factor,
+            "speed": 1 / realtime_factor if realtime_factor else None,
+            "eta": elapsed * (100 - progress) / progress if progress > 0 else None
+        }
+        if self.progress_callback:
+            self.progress_callback(int(progress))
+        if self.progress_details_callback:
+            self.progress_details_callback(int(progress), details)
+    
+    def _spawn_worker(self, worker_id):
+        """Uruchamia proces roboczy i zwraca jego opis"""
+        inbox = self._context.Queue()
+        cancel_event = self._context.Event()
+        cancel_job = self._context.Value("q", 0, lock=False)
+        process = self._context.Process(
+            target=_pool_worker_main,
+            args=(worker_id, self.settings, self.threads_per_worker, inbox, self._outbox, cancel_event, cancel_job,
+                  bool(self.event_hooks)),
+            name=f"transcriber-worker-{worker_id}",
+            daemon=True
         )
-        
-        # Obsługa wybranego pliku
-        if path:
-            self.output_file = path
-            self.output_file_input.text = path
-            
-            # Aktualizuj etykietę informacyjną
-            if self.selected_file:
-                input_filename = os.path.basename(self.selected_file)
-                output_filename = os.path.basename(path)
-                self.selected_file_label.text = f"Wejście: {input_filename} | Wyjście: {output_filename}"
+        process.start()
+        return {"id": worker_id, "process": process, "inbox": inbox, "cancel": cancel_event, "cancel_job": cancel_job,
+                "ready": False, "job": None}
+    
+    def update_settings(self, settings):
+        """Zmienia ustawienia, z którymi startują (i ładują model) nowe procesy robocze
+        
+        Dotyczy procesów uruchamianych po wywołaniu: po terminate(), start()
+        i ponownym uruchomieniu procesu po awarii; działające procesy
+        otrzymują ustawienia razem z zadaniami.
+        """
+        with self._lock:
+            self.settings = {**self.settings, **settings}
+    
+    def start(self):
+        """Uruchamia procesy robocze i wątek rozdzielający zadania"""
+        with self._lifecycle_lock:
+            self._start()
+    
+    def _start(self):
+        """Uruchamia procesy robocze (wywoływane pod blokadą _lifecycle_lock)"""
+        if self._running:
+            return
+        self._outbox = self._context.Queue()
+        self._slots = [self._spawn_worker(worker_id) for worker_id in range(self.workers)]
+        self._running = True
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="transcriber-pool", daemon=True)
+        self._dispatcher.start()
+        self.update_status(f"Uruchomiono {self.workers} procesów roboczych (model: {self.settings['model']}, "
+                           f"wątki na proces: {self.threads_per_worker})")
+    
+    def estimate_cost(self, duration, settings=None):
+        """Szacowany czas przetwarzania (sekundy) nagrania o podanej długości; 0 przy fifo lub nieznanej długości"""
+        if self.schedule != "shortest" or not duration:
+            return 0.0
+        settings = {**self.settings, **(settings or {})}
+        key = format_model_key(settings.get("backend", "whisper"), settings["model"], settings.get("inference", "fp32"))
+        return duration * self.realtime_factors.get(key)
+    
+    def submit(self, method, *args, settings=None, priority=0, duration=None, **kwargs):
+        """Zleca wywołanie metody Transcriber w procesie roboczym i zwraca Future
+        
+        duration (długość nagrania w sekundach) i priority ustalają miejsce
+        zadania w kolejce; zadania bez długości trafiają na jej początek.
+        """
+        cost = self.estimate_cost(duration, settings)
+        future = Future()
+        with self._lifecycle_lock:
+            if not self._running:
+                self._start()
+            with self._lock:
+                if not self._jobs:
+                    # Nowa seria zadań - łączny postęp liczony od zera
+                    self._submitted = self._finished = 0
+                    self._finished_audio = 0.0
+                    self._series_started = time.time()
+                job_id = next(self._job_counter)
+                future.job_id = job_id
+                self._jobs[job_id] = future
+                queued = time.time()
+                self._pending.push((job_id, method, args, kwargs, settings or {}), cost, priority, queued)
+                self._job_times[job_id] = (queued, None)
+                self._submitted += 1
+                self._queue_event("job_queued", job_id=job_id, method=method, queue_length=len(self._pending),
+                                  priority=priority, estimated_seconds=cost)
+                self._assign_jobs()
+        self._flush_events()
+        return future
+    
+    def submit_video(self, video_path, output_file=None, priority=0, duration=None, **settings):
+        """Zleca przetworzenie pliku wideo do SRT (Transcriber.process_video)
+        
+        Bez podanej długości nagranie jest sprawdzane przez ffprobe.
+        """
+        if duration is None and self.schedule == "shortest":
+            duration = probe_duration(video_path)
+        return self.submit("process_video", video_path, output_file, settings=settings, priority=priority,
+                           duration=duration)
+    
+    def queue_length(self):
+        """Liczba zadań oczekujących na wolny proces roboczy"""
+        with self._lock:
+            return len(self._pending)
+    
+    def job_progress(self, future):
+        """Postęp (0-100) i szczegóły zadania wykonywanego w procesie roboczym; (0, None) przed startem"""
+        with self._lock:
+            return self._job_progress.get(future.job_id, (0, None))
+    
+    def cancel(self, future):
+        """Anuluje zadanie oczekujące lub przerywa zadanie wykonywane w procesie roboczym"""
+        if future.cancel():
+            return True
+        with self._lock:
+            for slot in self._slots:
+                if slot["job"] == future.job_id:
+                    slot["cancel_job"].value = future.job_id
+                    slot["cancel"].set()
+                    return True
+        return False
+    
+    def _assign_jobs(self):
+        """Przydziela oczekujące zadania wolnym procesom (wywoływane pod blokadą)"""
+        for slot in self._slots:
+            if not self._pending:
+                return
+            if not slot["ready"] or slot["job"] is not None:
+                continue
+            while self._pending:
+                job = self._pending.pop()
+                future = self._jobs[job[0]]
+                if future.set_running_or_notify_cancel():
+                    slot["job"] = job[0]
+                    slot["inbox"].put(job)
+                    queued = self._job_times[job[0]][0]
+                    self._job_times[job[0]] = (queued, time.time())
+                    self._queue_event("job_started", job_id=job[0], worker=slot["id"], queue_seconds=time.time() - queued)
+                    break
+                # Zadanie anulowane przed przydzieleniem
+                del self._jobs[job[0]]
+                self._finished += 1
+                self._end_job_times(job[0], "cancelled")
+    
+    def _queue_event(self, name, **fields):
+        """Odkłada zdarzenie do wysłania po zwolnieniu blokady (wywoływane pod blokadą)"""
+        if self.event_hooks:
+            self._queued_events.append((name, fields))
+    
+    def _flush_events(self):
+        """Wysyła odłożone zdarzenia - haki nie są wywoływane pod blokadą puli"""
+        with self._lock:
+            events, self._queued_events = self._queued_events, []
+        for name, fields in events:
+            self.emit_event(name, **fields)
+    
+    def _end_job_times(self, job_id, status):
+        """Zgłasza job_end z czasem wykonania zadania (wywoływane pod blokadą)"""
+        queued, started = self._job_times.pop(job_id, (None, None))
+        if queued is not None:
+            self._queue_event("job_end", job_id=job_id, status=status, duration=time.time() - (started or queued),
+                              total_seconds=time.time() - queued)
+    
+    def _finish_job(self, job_id, status="failed"):
+        """Usuwa zadanie z rejestru i zwraca jego Future (wywoływane pod blokadą)"""
+        self._end_job_times(job_id, status)
+        _progress, details = self._job_progress.pop(job_id, (0, None))
+        if details:
+            self._finished_audio += details["duration"] or details["position"]
+        self._finished += 1
+        return self._jobs.pop(job_id, None)
+    
+    def _handle_event(self, event):
+        """Obsługuje komunikat z procesu roboczego"""
+        kind, worker_id, job_id, payload = event
+        slot = self._slots[worker_id]
+        future = None
+        with self._lock:
+            if kind == "ready":
+                slot["ready"] = True
+            elif kind == "progress":
+                self._job_progress[job_id] = payload
+            elif kind in ("done", "error"):
+                slot["job"] = None
+                status = "failed" if kind == "error" else "done" if payload else "cancelled"
+                future = self._finish_job(job_id, status)
+            self._assign_jobs()
+        self._flush_events()
+        
+        if kind == "event":
+            # job_start/job_end procesu roboczego zastępują własne zdarzenia puli
+            # (obejmujące też czas w kolejce i zadania przerwane awarią procesu)
+            if payload["event"] not in ("job_start", "job_end"):
+                self.emit_event(payload.pop("event"), **{**payload, "job_id": job_id, "worker": worker_id})
+        elif kind == "status":
+            self.update_status(f"[proces {worker_id}] {payload}" if self.workers > 1 else payload)
+        elif kind == "progress":
+            self.update_progress()
+        elif kind == "failed":
+            message = f"Błąd ładowania modelu: {payload}"
+            self.update_status(f"[proces {worker_id}] {message}" if self.workers > 1 else message)
+        elif future is not None:
+            if kind == "done":
+                future.set_result(payload)
             else:
-                self.selected_file_label.text = f"Wyjście: {os.path.basename(path)}"
+                future.set_exception(RuntimeError(payload))
+            self.update_progress()
+    
+    def _check_workers(self):
+        """Wykrywa procesy, które zakończyły się nieoczekiwanie, i uruchamia je ponownie"""
+        failed = []
+        with self._lock:
+            if not self._running:
+                return  # Procesy są właśnie zatrzymywane (shutdown lub terminate)
+            for index, slot in enumerate(self._slots):
+                if slot["process"].is_alive():
+                    continue
+                if slot["job"] is not None:
+                    failed.append(self._finish_job(slot["job"]))
+                if not slot["ready"]:
+                    # Proces nie załadował modelu - nie ponawiamy w nieskończoność
+                    continue
+                self._slots[index] = self._spawn_worker(slot["id"])
             
-            self.update_transcribe_button_state()
-        
-        # Zniszcz obiekt Tkinter
-        root.destroy()
-    
-    def update_transcribe_button_state(self):
-        """Aktualizuje stan przycisku transkrypcji na podstawie wybranych plików"""
-        # Przycisk jest aktywny tylko jeśli wybrano plik wejściowy
-        self.transcribe_button.disabled = not self.selected_file
-    
-    def select_language(self, lang_code, lang_text):
-        """Obsługa wyboru języka z dropdown"""
-        self.transcriber.set_language(lang_code)
-        self.language_button.text = lang_text
-        self.language_dropdown.dismiss()
-        self.update_info_label()
-    
-    def select_model(self, model_name, model_text):
-        """Obsługa wyboru modelu z dropdown"""
-        self.transcriber.set_model(model_name)
-        self.model_button.text = model_text
-        self.model_dropdown.dismiss()
-        self.update_info_label()
-    
-    def update_info_label(self):
-        """Aktualizuje etykietę informacyjną"""
-        lang_code = self.transcriber.language
-        lang_name = self.transcriber.AVAILABLE_LANGUAGES.get(lang_code, "Nieznany")
-        self.info_label.text = f"Model: {self.transcriber.model_name} | Język: {lang_name} ({lang_code})"
-    
-    def update_progress(self, value):
-        """Aktualizuje pasek postępu"""
-        def update(dt):
-            self.progress_bar.value = value
-        Clock.schedule_once(update, 0)
-    
-    def update_progress_async(self, dt):
-        """Asynchronicznie aktualizuje pasek postępu z efektem płynności"""
-        if not self.transcription_thread or not self.transcription_thread.is_alive():
-            # Jeśli transkrypcja zakończona, zatrzymaj aktualizację
-            Clock.unschedule(self.update_progress_async)
+            # Żaden proces nie działa - oczekujące zadania nie zostaną wykonane
+            if not any(slot["process"].is_alive() for slot in self._slots):
+                while self._pending:
+                    failed.append(self._finish_job(self._pending.pop()[0]))
+        self._flush_events()
+        for future in failed:
+            if future is not None and not future.cancelled():
+                future.set_exception(RuntimeError("Proces roboczy zakończył się nieoczekiwanie"))
+    
+    def _dispatch_loop(self):
+        """Odbiera komunikaty procesów roboczych do czasu zamknięcia puli"""
+        while self._running:
+            try:
+                event = self._outbox.get(timeout=0.5)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            self._handle_event(event)
+    
+    def shutdown(self, wait=True):
+        """Zatrzymuje procesy robocze; oczekujące zadania są anulowane"""
+        if not self._running:
             return
-        
-        # Dodaj efekt płynności - lekkie wahania paska postępu
-        import random
-        if self.progress_bar.value < 100:
-            # Dodaj niewielkie losowe wahania do paska postępu
-            if random.random() < 0.3:  # 30% szans na aktualizację
-                current = self.progress_bar.value
-                # Niewielki przyrost, ale nie więcej niż 1%
-                increment = random.uniform(0, 0.5)
-                self.progress_bar.value = min(current + increment, 100)
+        with self._lock:
+            while self._pending:
+                job = self._pending.pop()
+                self._jobs.pop(job[0]).cancel()
+                self._end_job_times(job[0], "cancelled")
+        self._flush_events()
+        if wait:
+            # Czekamy na zakończenie zadań już przydzielonych
+            for future in list(self._jobs.values()):
+                try:
+                    future.result()
+                except Exception:
+                    pass
+        with self._lifecycle_lock:
+            if not self._running:
+                return  # Pula została w międzyczasie zatrzymana przez terminate()
+            self._running = False
+            self._dispatcher.join()
+            for slot in self._slots:
+                slot["inbox"].put(None)
+            for slot in self._slots:
+                slot["process"].join(timeout=5)
+                if slot["process"].is_alive():
+                    slot["process"].terminate()
+            self._slots = []
     
-    def update_status(self, message):
-        """Aktualizuje etykietę statusu"""
-        def update(dt):
-            self.status_label.text = message
-        Clock.schedule_once(update, 0)
-    
-    def start_transcription(self, instance):
-        """Rozpoczyna proces transkrypcji w osobnym wątku"""
-        if self.selected_file:
-            # Aktualizacja UI
-            self.transcribe_button.disabled = True
-            self.cancel_button.disabled = False
-            self.progress_bar.value = 0
-            self.update_status("Przygotowanie do transkrypcji...")
-            
-            # Uruchomienie transkrypcji w osobnym wątku
-            self.transcription_thread = threading.Thread(
-                target=self.run_transcription,
-                args=(self.selected_file, self.output_file)
-            )
-            self.transcription_thread.daemon = True
-            self.transcription_thread.start()
-            
-            # Uruchomienie asynchronicznego progress bara
-            Clock.schedule_interval(self.update_progress_async, 0.1)
+    def terminate(self):
+        """Natychmiast kończy procesy robocze, nie czekając na reakcję bieżących zadań na anulowanie
+        
+        Zadania wykonywane kończą się wynikiem None (jak po anulowaniu),
+        oczekujące są anulowane. Proces zakończony w trakcie zapisu do
+        kolejki mógłby ją uszkodzić lub zostawić zajętą blokadę, dlatego
+        kolejki są porzucane razem z procesami - start() tworzy nowe i
+        ponownie ładuje modele.
+        """
+        with self._lifecycle_lock:
+            if not self._running:
+                return
+            self._running = False
+            for slot in self._slots:
+                slot["process"].terminate()
+            self._dispatcher.join()
+            with self._lock:
+                interrupted = [self._finish_job(slot["job"], "cancelled") for slot in self._slots
+                               if slot["job"] is not None]
+                while self._pending:
+                    job = self._pending.pop()
+                    self._jobs.pop(job[0]).cancel()
+                    self._end_job_times(job[0], "cancelled")
+                slots, self._slots = self._slots, []
+            self._flush_events()
+            for future in interrupted:
+                if future is not None and not future.done():
+                    future.set_result(None)
+            for slot in slots:
+                slot["process"].join(timeout=5)
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(wait=exc_type is None)
+
+
+def find_video_files(patterns):
+    """Zwraca posortowaną listę plików wideo z podanych katalogów, wzorców glob i plików"""
+    found = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _dirs, files in os.walk(pattern):
+                for name in files:
+                    if name.lower().endswith(VIDEO_EXTENSIONS):
+                        found.append(os.path.join(root, name))
+        elif os.path.isfile(pattern):
+            found.append(pattern)
+        else:
+            for path in glob.glob(pattern, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(VIDEO_EXTENSIONS):
+                    found.append(path)
+    
+    # Usunięcie duplikatów z zachowaniem kolejności
+    unique = []
+    seen = set()
+    for path in sorted(found):
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+class BatchTranscriber:
+    """Transkrypcja wsadowa wielu plików wideo jednym, raz załadowanym modelem
+    
+    Audio kolejnych plików jest wyodrębniane z wyprzedzeniem przez `jobs`
+    wątków, a model Whisper (jeden w pamięci) przetwarza je po kolei.
+    Przy workers > 1 pliki są rozdzielane między procesy TranscriptionWorkerPool,
+    z których każdy ładuje model raz. Gdy w Transcriber włączono dekodowanie
+    wspólne (set_batching), krótkie nagrania są zbierane w grupy i
+    transkrybowane razem przez process_batch. Przy schedule="shortest"
+    pliki są przetwarzane od najkrótszego (długość z ffprobe), więc krótkie
+    nagrania nie czekają za wielogodzinnymi; pliki pasujące do wzorców
+    priorities są zawsze przetwarzane najpierw.
+    """
+    
+    def __init__(self, transcriber, jobs=1, output_dir=None, overwrite=False, workers=1, threads_per_worker=None,
+                 schedule="shortest", priorities=()):
+        self.transcriber = transcriber
+        self.jobs = max(1, jobs)
+        self.output_dir = output_dir
+        self.overwrite = overwrite
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker
+        self.schedule = schedule
+        self.priorities = list(priorities)
+        self.temp_dir = None
+    
+    def plan(self, video_paths):
+        """Dzieli pliki na (do przetworzenia, pominięte), pomijając pliki, dla których istnieją już wszystkie formaty wyjściowe"""
+        pending = []
+        skipped = []
+        for video_path in video_paths:
+            output_file = default_output_path(video_path, self.output_dir)
+            outputs = self.transcriber.output_paths(output_file).values()
+            if all(os.path.exists(path) for path in outputs) and not self.overwrite:
+                skipped.append((video_path, output_file))
+            else:
+                pending.append((video_path, output_file))
+        return pending, skipped
+    
+    def order(self, pending):
+        """Ustala kolejność przetwarzania; zwraca [(ścieżka, plik wyjściowy, długość lub None)]
+        
+        Długości są odczytywane przez ffprobe równolegle. Przy schedule="fifo"
+        zachowywana jest kolejność wejściowa (z wyjątkiem priorytetu), a
+        pliki o nieznanej długości trafiają na początek.
+        """
+        durations = [None] * len(pending)
+        if self.schedule == "shortest":
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                durations = list(executor.map(probe_duration, [video_path for video_path, _ in pending]))
+        jobs = [(video_path, output_file, duration) for (video_path, output_file), duration in zip(pending, durations)]
+        return sorted(jobs, key=lambda job: (-path_priority(job[0], self.priorities),
+                                             (job[2] or 0.0) if self.schedule == "shortest" else 0.0))
     
-    def run_transcription(self, video_path, output_file):
-        """Wykonuje transkrypcję w osobnym wątku"""
+    def _extract(self, index, video_path):
+        """Wyodrębnia audio do pamięci lub unikalnego pliku tymczasowego (wywoływane w wątku roboczym)"""
+        if self.transcriber.cached_transcription(video_path)[1] is not None:
+            # Wynik jest w pamięci podręcznej - process_video nie będzie potrzebował audio
+            return None
+        if self.transcriber.batching_enabled():
+            # Wspólne dekodowanie wymaga próbek w pamięci niezależnie od trybu audio
+            return self.transcriber.extract_audio_array(video_path)
+        if self.transcriber.audio_mode == "memory":
+            return self.transcriber.extract_audio(video_path)
+        audio_path = os.path.join(self.temp_dir, f"audio_{index}.wav")
+        return self.transcriber.extract_audio(video_path, audio_path)
+    
+    def run(self, video_paths):
+        """Przetwarza listę plików i zwraca podsumowanie {done, skipped, failed}"""
+        pending, skipped = self.plan(video_paths)
+        summary = {"done": [], "skipped": [path for path, _ in skipped], "failed": []}
+        for video_path, output_file in skipped:
+            self.transcriber.update_status(f"Pominięto (plik SRT istnieje): {output_file}")
+        
+        if not pending:
+            return summary
+        
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        
+        pending = self.order(pending)
+        if self.schedule == "shortest":
+            # Zmierzone czasy transkrypcji poprawiają szacunki kosztu kolejnych uruchomień
+            self.transcriber.add_event_hook(REALTIME_FACTORS)
+        
+        if self.workers > 1:
+            return self._run_pool(pending, summary)
+        
+        self.transcriber.reset_cancel()
+        self.temp_dir = tempfile.mkdtemp(prefix="auto_transcriber_")
+        executor = ThreadPoolExecutor(max_workers=self.jobs)
+        futures = {}
+        next_index = 0
         try:
-            # Użyj ścieżki z pola tekstowego, jeśli jest dostępna
-            actual_output_file = self.output_file_input.text if self.output_file_input.text else output_file
-            self.transcriber.process_video(video_path, actual_output_file)
+            # Kolejka wyodrębniania audio: najwyżej `jobs` plików z wyprzedzeniem
+            while next_index < min(self.jobs, len(pending)):
+                futures[next_index] = executor.submit(self._extract, next_index, pending[next_index][0])
+                next_index += 1
             
-            # Po zakończeniu transkrypcji
-            def on_complete(dt):
-                self.transcribe_button.disabled = False
-                self.cancel_button.disabled = True
-                self.show_completion_dialog(output_file)
+            # Model ładowany raz, równolegle z wyodrębnianiem pierwszych plików
+            # (w trybie fragmentów z pulą procesów modele trzymają procesy robocze,
+            # a wynik z pamięci podręcznej nie wymaga modelu)
+            if self.transcriber.chunk_workers <= 1 and self.transcriber.cached_transcription(pending[0][0])[1] is None:
+                self.transcriber.load_model()
             
-            Clock.schedule_once(on_complete, 0)
+            # Krótkie nagrania czekające na wspólną transkrypcję i liczba ich okien
+            group = []
+            group_windows = 0
+            for index, (video_path, output_file, _duration) in enumerate(pending):
+                self.transcriber.update_status(f"[{index + 1}/{len(pending)}] {video_path}")
+                audio = None
+                future = futures.pop(index)
+                if next_index < len(pending):
+                    futures[next_index] = executor.submit(self._extract, next_index, pending[next_index][0])
+                    next_index += 1
+                try:
+                    audio = future.result()
+                    if self._batchable(audio):
+                        group.append((video_path, output_file, audio))
+                        group_windows += max(1, int(np.ceil(len(audio) / (WHISPER_WINDOW * SAMPLE_RATE))))
+                        if group_windows >= self.transcriber.batch_size:
+                            self._run_group(group, summary)
+                            group = []
+                            group_windows = 0
+                        continue
+                    if self.transcriber.process_video(video_path, output_file, audio=audio):
+                        summary["done"].append(video_path)
+                    else:
+                        summary["failed"].append(video_path)
+                except Exception as e:
+                    self.transcriber.update_status(f"Błąd przetwarzania {video_path}: {e}")
+                    summary["failed"].append(video_path)
+                finally:
+                    if isinstance(audio, str) and os.path.exists(audio):
+                        os.remove(audio)
+            if group:
+                self._run_group(group, summary)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for name in os.listdir(self.temp_dir):
+                os.remove(os.path.join(self.temp_dir, name))
+            os.rmdir(self.temp_dir)
+            self.temp_dir = None
+        
+        return summary
+    
+    def _batchable(self, audio):
+        """Czy nagranie trafia do wspólnej transkrypcji (krótkie audio w pamięci)"""
+        return (isinstance(audio, np.ndarray) and self.transcriber.batching_enabled()
+                and len(audio) <= self.transcriber.batch_max_length * SAMPLE_RATE)
+    
+    def _run_group(self, group, summary):
+        """Transkrybuje grupę krótkich nagrań razem i uzupełnia podsumowanie"""
+        self.transcriber.update_status(f"Wspólna transkrypcja {len(group)} krótkich nagrań")
+        try:
+            results = self.transcriber.process_batch(group)
         except Exception as e:
-            # Obsługa błędów
-            def on_error(dt):
-                self.transcribe_button.disabled = False
-                self.cancel_button.disabled = True
-                self.update_status(f"Błąd: {str(e)}")
-                self.show_error_dialog(str(e))
-            
-            Clock.schedule_once(on_error, 0)
-    
-    def cancel_transcription(self, instance):
-        """Anuluje proces transkrypcji"""
-        if self.transcription_thread and self.transcription_thread.is_alive():
-            # Ustawienie flagi anulowania w Transcriber
-            self.transcriber.cancel()
-            self.update_status("Anulowanie transkrypcji (poczekaj na zakończenie bieżącego etapu)...")
-            self.cancel_button.disabled = True
-    
-    def show_completion_dialog(self, output_file):
-        """Wyświetla dialog po zakończeniu transkrypcji"""
-        dialog = MDDialog(
-            title="Transkrypcja zakończona",
-            text=f"Plik SRT został utworzony: {output_file}",
-            buttons=[
-                MDFlatButton(
-                    text="OK",
-                    on_release=lambda x: dialog.dismiss()
-                ),
-                MDFlatButton(
-                    text="Otwórz folder",
-                    on_release=lambda x: self.open_output_folder(output_file)
-                )
-            ]
-        )
-        dialog.open()
-    
-    def show_error_dialog(self, error_message):
-        """Wyświetla dialog z błędem"""
-        dialog = MDDialog(
-            title="Błąd transkrypcji",
-            text=f"Wystąpił błąd podczas transkrypcji: {error_message}",
-            buttons=[
-                MDFlatButton(
-                    text="OK",
-                    on_release=lambda x: dialog.dismiss()
-                )
-            ]
+            self.transcriber.update_status(f"Błąd wspólnej transkrypcji: {e}")
+            results = [None] * len(group)
+        for (video_path, _output_file, _audio), result in zip(group, results):
+            summary["done" if result else "failed"].append(video_path)
+    
+    def _run_pool(self, pending, summary):
+        """Rozdziela pliki między procesy robocze, z których każdy ma własny model"""
+        pool = TranscriptionWorkerPool(
+            workers=min(self.workers, len(pending)),
+            model_name=self.transcriber.model_name,
+            language=self.transcriber.language,
+            audio_mode=self.transcriber.audio_mode,
+            threads_per_worker=self.threads_per_worker,
+            settings=self.transcriber.export_settings(),
+            schedule=self.schedule
         )
-        dialog.open()
+        pool.set_callbacks(progress_callback=self.transcriber.progress_callback,
+                           progress_details_callback=self.transcriber.progress_details_callback)
+        for hook in self.transcriber.event_hooks:
+            pool.add_event_hook(hook)
+        with pool:
+            futures = [(video_path, pool.submit_video(video_path, output_file, path_priority(video_path, self.priorities),
+                                                      duration))
+                       for video_path, output_file, duration in pending]
+            for video_path, future in futures:
+                try:
+                    if future.result():
+                        summary["done"].append(video_path)
+                    else:
+                        summary["failed"].append(video_path)
+                except Exception as e:
+                    self.transcriber.update_status(f"Błąd przetwarzania {video_path}: {e}")
+                    summary["failed"].append(video_path)
+        return summary
+
+
+def run_gui(args=None):
+    """Uruchamia interfejs graficzny (Kivy ładowane dopiero tutaj)"""
+    from auto_transcriber_gui import AutoTranscriberApp
+    audio_cache = model_cache_mb = None
+    if args is not None:
+        if args.audio_cache:
+            audio_cache = (args.cache_dir or "", args.audio_cache_size)
+        model_cache_mb = args.model_cache_mb
+    app = AutoTranscriberApp(audio_cache=audio_cache, model_cache_mb=model_cache_mb)
+    app.run()
+
+
+def run_bench(args):
+    """Obsługa polecenia `bench` (moduł benchmarku ładowany dopiero tutaj)"""
+    from auto_transcriber_bench import run_bench as run
+    return run(args)
+
+
+class ConsoleProgress:
+    """Wypisuje postęp z detalami (czas rzeczywisty, ETA) co określony krok procentowy"""
     
-    def open_output_folder(self, file_path):
-        """Otwiera folder zawierający plik wyjściowy"""
-        folder_path = os.path.dirname(os.path.abspath(file_path))
-        os.startfile(folder_path)
+    def __init__(self, step=5):
+        self.step = step
+        self.last = None
+    
+    def __call__(self, progress, details=None):
+        if self.last is not None and progress < self.last + self.step and progress != 100 and progress >= self.last:
+            return
+        self.last = progress
+        line = f"Postęp: {progress}%"
+        if details and details.get("duration"):
+            line += f" | audio {format_duration(details['position'])} / {format_duration(details['duration'])}"
+        if details and details.get("speed"):
+            line += f" | {details['speed']:.2f}x czasu rzeczywistego (RTF {details['realtime_factor']:.2f})"
+        if details and details.get("eta") is not None and progress < 100:
+            line += f" | ETA {format_duration(details['eta'])}"
+        print(line)
+
+
+def configure_transcriber(args):
+    """Tworzy Transcriber z opcji wspólnych dla poleceń (zob. add_transcriber_arguments); None przy błędzie"""
+    transcriber = Transcriber()
+    if not transcriber.set_model(args.model):
+        print(f"Nieznany model: {args.model}", file=sys.stderr)
+        return None
+    transcriber.set_backend(args.backend)
+    if not transcriber.set_inference(args.inference):
+        print(f"Tryb {args.inference} nie jest obsługiwany przez silnik {args.backend} na tym procesorze", file=sys.stderr)
+        return None
+    if not transcriber.set_language(args.lang):
+        print(f"Nieznany język: {args.lang}", file=sys.stderr)
+        return None
+    transcriber.set_audio_mode(args.audio_mode)
+    if args.model_cache_mb is not None and not transcriber.set_model_cache(args.model_cache_mb):
+        print("Limit pamięci modeli musi być dodatni", file=sys.stderr)
+        return None
+    transcriber.set_vad(args.vad)
+    if args.cache or args.cache_dir:
+        transcriber.set_cache(args.cache_dir or "", args.cache_size)
+    if args.audio_cache:
+        transcriber.set_audio_cache(args.cache_dir or "", args.audio_cache_size)
+    if args.chunk_workers > 1 and (args.workers > 1 or args.command in ("serve", "watch")):
+        # Procesy robocze puli nie mogą uruchamiać własnych procesów fragmentów
+        print("--chunk-workers nie działa z pulą procesów (--workers > 1, serve, watch); "
+              "bez tej opcji fragmenty są transkrybowane w procesie roboczym po kolei", file=sys.stderr)
+        return None
+    if args.chunk_length and not transcriber.set_chunking(args.chunk_length, args.chunk_overlap, args.chunk_workers):
+        print("Długość fragmentu musi być większa niż zakładka", file=sys.stderr)
+        return None
+    return transcriber
 
 
-class AutoTranscriberApp(MDApp):
-    """Główna klasa aplikacji"""
+def run_batch(args):
+    """Obsługa polecenia `batch`"""
+    transcriber = configure_transcriber(args)
+    if transcriber is None:
+        return 2
+    transcriber.set_callbacks(progress_details_callback=ConsoleProgress())
+    transcriber.set_streaming(args.stream, args.stream_window)
+    transcriber.set_checkpointing(args.resume)
+    if not transcriber.set_output_formats(args.formats):
+        print(f"Nieznany format wyjściowy: {', '.join(args.formats)}", file=sys.stderr)
+        return 2
+    if not transcriber.set_batching(args.batch_size, args.batch_max_length):
+        print("Rozmiar partii musi być co najmniej 1, a maksymalna długość nagrania dodatnia", file=sys.stderr)
+        return 2
     
-    def build(self):
-        # Ustawienia motywu
-        self.theme_cls.primary_palette = "BlueGray"  # Główny kolor
-        self.theme_cls.accent_palette = "DeepOrange"  # Kolor akcentu
-        self.theme_cls.primary_hue = "700"  # Ciemniejszy odcień koloru głównego
-        self.theme_cls.theme_style = "Dark"  # Ciemny motyw
-        
-        # Ustawienia okna
-        self.title = "Auto Transcriber"
-        Window.size = (1000, 750)  # Jeszcze bardziej zwiększona wysokość okna
-        Window.minimum_width, Window.minimum_height = 1000, 750  # Ustaw minimalny rozmiar taki sam jak aktualny
-        Window.clearcolor = (0.05, 0.05, 0.07, 1)  # Tło okna aplikacji
-        Window.resizable = False  # Zablokuj możliwość zmiany rozmiaru okna
-        
-        return TranscriberGUI()
+    video_paths = find_video_files(args.inputs)
+    if not video_paths:
+        print("Nie znaleziono plików wideo", file=sys.stderr)
+        return 1
+    
+    events = None
+    if args.events:
+        events = JsonLinesExporter(sys.stderr if args.events == "-" else args.events)
+        transcriber.add_event_hook(events)
+    metrics = None
+    if args.metrics:
+        metrics = PrometheusMetrics(args.metrics)
+        transcriber.add_event_hook(metrics)
+    
+    start_time = time.time()
+    batch = BatchTranscriber(
+        transcriber,
+        jobs=args.jobs,
+        output_dir=args.output_dir,
+        overwrite=args.overwrite,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        schedule=args.schedule,
+        priorities=args.priority
+    )
+    try:
+        summary = batch.run(video_paths)
+    finally:
+        transcriber.close()
+        if events:
+            events.close()
+        if metrics:
+            metrics.write(args.metrics)
+    
+    elapsed_time = time.time() - start_time
+    print(f"Gotowe: {len(summary['done'])}, pominięte: {len(summary['skipped'])}, "
+          f"błędy: {len(summary['failed'])} (czas: {elapsed_time:.2f} s)")
+    for video_path in summary["failed"]:
+        print(f"  błąd: {video_path}", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+def run_serve(args):
+    """Obsługa polecenia `serve` (moduł serwera ładowany dopiero tutaj)"""
+    from auto_transcriber_server import run_serve as run
+    return run(args)
+
 
+def run_watch(args):
+    """Obsługa polecenia `watch` (moduł demona ładowany dopiero tutaj)"""
+    from auto_transcriber_watch import run_watch as run
+    return run(args)
 
-def main():
+
+def add_transcriber_arguments(parser):
+    """Dodaje opcje modelu, języka, wykrywania mowy, fragmentów i pamięci podręcznej (zob. configure_transcriber)"""
+    parser.add_argument("--model", default="large", choices=list(Transcriber.AVAILABLE_MODELS), help="Model Whisper")
+    parser.add_argument("--backend", default="whisper", choices=list(BACKENDS),
+                        help="Silnik transkrypcji: whisper, faster-whisper (CTranslate2, szybszy na CPU) lub fake (testowy, bez modelu)")
+    parser.add_argument("--inference", default="fp32", choices=list(Transcriber.INFERENCE_MODES),
+                        help="Precyzja wnioskowania na CPU: int8 (kwantyzacja, ok. 2x mniej pamięci) lub bf16 (szybszy koder)")
+    parser.add_argument("--lang", default="pl", choices=list(Transcriber.AVAILABLE_LANGUAGES), help="Język transkrypcji (auto - wykrywanie na próbkach nagrania)")
+    parser.add_argument("--workers", type=int, default=1, help="Liczba procesów roboczych, każdy z własnym modelem w pamięci")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="Wątki PyTorch na proces (domyślnie rdzenie / procesy)")
+    parser.add_argument("--chunk-length", type=float, default=None, help="Dzieli długie nagrania na fragmenty o tej długości (sekundy, np. 600)")
+    parser.add_argument("--chunk-overlap", type=float, default=5.0, help="Zakładka między fragmentami (sekundy)")
+    parser.add_argument("--chunk-workers", type=int, default=1, help="Liczba procesów transkrybujących fragmenty równolegle")
+    parser.add_argument("--vad", action="store_true", help="Pomija ciszę przed transkrypcją (wykrywanie mowy na podstawie energii)")
+    parser.add_argument("--cache", action="store_true", help="Używa trwałej pamięci podręcznej wyników transkrypcji")
+    parser.add_argument("--cache-dir", default=None, help=f"Katalog pamięci podręcznej (domyślnie {CACHE_DIR})")
+    parser.add_argument("--cache-size", type=float, default=500, help="Limit rozmiaru pamięci podręcznej wyników (MB)")
+    parser.add_argument("--audio-cache", action="store_true",
+                        help="Zachowuje wyodrębnione audio (16 kHz int16) dla kolejnych uruchomień z innym modelem lub językiem")
+    parser.add_argument("--audio-cache-size", type=float, default=2048, help="Limit rozmiaru pamięci podręcznej audio (MB)")
+    parser.add_argument("--audio-mode", default="memory", choices=list(Transcriber.AUDIO_MODES), help="Tryb wyodrębniania audio")
+    parser.add_argument("--model-cache-mb", type=float, default=None,
+                        help="Limit pamięci załadowanych modeli w MB (w każdym procesie; domyślnie połowa RAM)")
+
+
+def add_scheduling_arguments(parser, aging=True):
+    """Dodaje opcje kolejności przetwarzania zadań (zob. JobScheduler)"""
+    parser.add_argument("--schedule", default="shortest", choices=["shortest", "fifo"],
+                        help="Kolejność zadań: shortest - najpierw najkrótsze nagrania (długość z ffprobe), fifo - w kolejności zgłoszenia")
+    if aging:
+        parser.add_argument("--aging", type=float, default=1.0,
+                            help="Postarzanie: sekundy szacowanego czasu przetwarzania odejmowane zadaniu za każdą sekundę oczekiwania (0 = bez postarzania)")
+    parser.add_argument("--priority", action="append", default=[], metavar="WZORZEC",
+                        help="Pliki pasujące do wzorca glob (ścieżka lub nazwa) są przetwarzane przed pozostałymi; można podać wielokrotnie")
+
+
+def build_parser():
+    """Tworzy parser argumentów wiersza poleceń"""
+    parser = argparse.ArgumentParser(
+        prog="auto_transcriber",
+        description="Automatyczna transkrypcja plików wideo do formatu SRT. "
+                    "Bez polecenia uruchamia interfejs graficzny."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    
+    gui = subparsers.add_parser("gui", help="Uruchamia interfejs graficzny")
+    gui.add_argument("--audio-cache", action="store_true",
+                     help="Zachowuje wyodrębnione audio, aby zmiana modelu lub języka nie wymagała ponownego dekodowania")
+    gui.add_argument("--audio-cache-size", type=float, default=2048, help="Limit rozmiaru pamięci podręcznej audio (MB)")
+    gui.add_argument("--cache-dir", default=None, help=f"Katalog pamięci podręcznej (domyślnie {CACHE_DIR})")
+    gui.add_argument("--model-cache-mb", type=float, default=None,
+                     help="Limit pamięci załadowanych modeli w MB (domyślnie połowa RAM)")
+    
+    batch = subparsers.add_parser("batch", help="Transkrypcja wsadowa katalogów/plików bez interfejsu graficznego")
+    batch.add_argument("inputs", nargs="+", help="Katalogi, wzorce glob lub pliki wideo")
+    add_transcriber_arguments(batch)
+    batch.add_argument("--jobs", type=int, default=1, help="Liczba plików, z których audio jest wyodrębniane z wyprzedzeniem")
+    batch.add_argument("--stream", action="store_true", help="Zapisuje napisy na bieżąco (plik .srt.part zamieniany na .srt po zakończeniu)")
+    batch.add_argument("--stream-window", type=float, default=120.0, help="Długość okna dekodowania w trybie strumieniowym (sekundy)")
+    batch.add_argument("--resume", action="store_true", help="Zapisuje stan zadań i wznawia przerwane transkrypcje od ostatniego okna")
+    batch.add_argument("--batch-size", type=int, default=1,
+                       help="Liczba 30-sekundowych okien krótkich nagrań dekodowanych razem w jednym przebiegu modelu (1 = wyłączone)")
+    batch.add_argument("--batch-max-length", type=float, default=60.0,
+                       help="Najdłuższe nagranie (sekundy) dekodowane wspólnie z innymi przy --batch-size > 1")
+    batch.add_argument("--formats", nargs="+", default=["srt"], choices=list(EXPORTERS),
+                       help="Formaty wyjściowe zapisywane z jednej transkrypcji (np. srt vtt txt json tsv)")
+    batch.add_argument("--output-dir", default=None, help="Katalog wyjściowy (domyślnie obok pliku wideo)")
+    batch.add_argument("--overwrite", action="store_true", help="Nadpisuje istniejące pliki SRT zamiast je pomijać")
+    batch.add_argument("--events", default=None, help="Zapisuje zdarzenia (etapy, ładowanie modelu, pamięć podręczna) jako JSON lines; - = stderr")
+    batch.add_argument("--metrics", default=None, help="Plik metryk w formacie tekstowym Prometheus (aktualizowany po każdym pliku)")
+    add_scheduling_arguments(batch, aging=False)
+    batch.set_defaults(func=run_batch)
+    
+    serve = subparsers.add_parser("serve", help="Lokalna usługa HTTP z kolejką zadań i modelami stale w pamięci")
+    add_transcriber_arguments(serve)
+    serve.add_argument("--host", default="127.0.0.1", help="Adres nasłuchiwania (domyślnie tylko lokalnie)")
+    serve.add_argument("--port", type=int, default=8765, help="Port HTTP")
+    serve.add_argument("--max-queue", type=int, default=16, help="Maksymalna liczba zadań oczekujących; kolejne są odrzucane (HTTP 503)")
+    serve.add_argument("--job-ttl", type=float, default=3600, help="Czas przechowywania wyników zakończonych zadań (sekundy)")
+    add_scheduling_arguments(serve)
+    serve.set_defaults(func=run_serve)
+    
+    watch = subparsers.add_parser("watch", help="Demon obserwujący katalogi: nowe pliki są transkrybowane automatycznie")
+    watch.add_argument("directories", nargs="+", help="Obserwowane katalogi (razem z podkatalogami)")
+    add_transcriber_arguments(watch)
+    watch.add_argument("--interval", type=float, default=5.0, help="Odstęp między skanowaniami katalogów (sekundy)")
+    watch.add_argument("--settle", type=float, default=10.0,
+                       help="Plik jest przetwarzany, gdy jego rozmiar i czas modyfikacji nie zmieniają się przez tyle sekund")
+    watch.add_argument("--queue", default=None, help=f"Plik trwałej kolejki zadań (domyślnie {CACHE_DIR}/watch_queue.sqlite3)")
+    watch.add_argument("--max-attempts", type=int, default=3, help="Liczba prób przetworzenia pliku przed oznaczeniem go jako błędny")
+    watch.add_argument("--formats", nargs="+", default=["srt"], choices=list(EXPORTERS), help="Formaty wyjściowe")
+    watch.add_argument("--resume", action="store_true", help="Zadania przerwane zamknięciem demona są wznawiane od ostatniego okna")
+    watch.add_argument("--output-dir", default=None, help="Katalog wyjściowy (domyślnie obok pliku wideo)")
+    watch.add_argument("--overwrite", action="store_true", help="Przetwarza także pliki, dla których istnieją już pliki wyjściowe")
+    watch.add_argument("--events", default=None, help="Zapisuje zdarzenia jako JSON lines; - = stderr")
+    watch.add_argument("--metrics", default=None, help="Plik metryk w formacie tekstowym Prometheus (aktualizowany po każdym pliku)")
+    add_scheduling_arguments(watch)
+    watch.set_defaults(func=run_watch)
+    
+    bench = subparsers.add_parser("bench", help="Benchmark etapów potoku na syntetycznych nagraniach (wynik JSON)")
+    bench.add_argument("--durations", type=float, nargs="+", default=[60.0], help="Długości nagrań testowych (sekundy)")
+    bench.add_argument("--signal", default="speech", choices=["speech", "tone"], help="Sygnał audio nagrań testowych")
+    bench.add_argument("--backends", nargs="+", default=["whisper"], choices=list(BACKENDS), help="Silniki transkrypcji")
+    bench.add_argument("--models", nargs="+", default=["tiny"], choices=list(Transcriber.AVAILABLE_MODELS), help="Modele")
+    bench.add_argument("--inference", nargs="+", default=["fp32"], choices=list(Transcriber.INFERENCE_MODES), help="Tryby wnioskowania")
+    bench.add_argument("--lang", default="pl", choices=list(Transcriber.AVAILABLE_LANGUAGES), help="Język transkrypcji")
+    bench.add_argument("--audio-mode", default="memory", choices=list(Transcriber.AUDIO_MODES), help="Tryb wyodrębniania audio")
+    bench.add_argument("--repeat", type=int, default=1, help="Liczba powtórzeń każdego przypadku")
+    bench.add_argument("--media-dir", default=None, help=f"Katalog nagrań testowych (domyślnie {CACHE_DIR}/bench)")
+    bench.add_argument("--output", default=None, help="Plik wynikowy JSON (domyślnie standardowe wyjście)")
+    bench.add_argument("--startup-only", action="store_true", help="Mierzy tylko czas uruchomienia programu (bez transkrypcji)")
+    bench.set_defaults(func=run_bench)
+    
+    return parser
+
+
+def main(argv=None):
     """Funkcja główna uruchamiająca aplikację"""
-    app = AutoTranscriberApp()
-    app.run()
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    
+    # Bez polecenia (lub z opcjami Kivy) uruchamiamy interfejs graficzny jak dotychczas
+    if not argv or (argv[0] not in CLI_COMMANDS and argv[0] not in ("-h", "--help")):
+        run_gui()
+        return 0
+    
+    args = parser.parse_args(argv)
+    if args.command == "gui":
+        run_gui(args)
+        return 0
+    return args.func(args)
 
 
 if __name__ == "__main__":
-    main()
+    multiprocessing.freeze_support()  # Procesy robocze w wersji spakowanej do .exe (Windows)
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from auto_transcriber import Transcriber, CACHE_DIR
+
+try:
+    import resource
+except ImportError:  # Windows - szczytowe RSS nie jest wtedy raportowane
+    resource = None
+
+# Sygnały testowe generowane przez ffmpeg (lavfi) dla zadanej długości d
+SIGNALS = {
+    # Czysty ton 440 Hz
+    "tone": "sine=frequency=440:sample_rate=16000:duration={d}",
+    # Sygnał mowopodobny: ton krtaniowy o zmiennej wysokości, sylaby ok. 4 Hz,
+    # frazy 2,6 s przedzielone 1,4 s ciszy (jak pauzy między zdaniami)
+    "speech": "aevalsrc=exprs='0.4*sin(2*PI*(140+40*sin(2*PI*0.7*t))*t)*(0.55+0.45*sin(2*PI*4*t))"
+              "*lt(mod(t\\,4)\\,2.6)':sample_rate=16000:duration={d}"
+}
+
+# Domyślny katalog wygenerowanych nagrań testowych (ponownie używanych między uruchomieniami)
+MEDIA_DIR = os.path.join(CACHE_DIR, "bench")
+
+
+def generate_test_video(duration, signal="speech", directory=MEDIA_DIR):
+    """Tworzy (lub zwraca istniejące) nagranie testowe: czarny obraz 320x240 i sygnał audio SIGNALS[signal]
+    
+    Plik jest zawsze taki sam dla tych samych parametrów, więc wyniki są
+    porównywalne między commitami i maszynami.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{signal}_{duration:g}s.mp4")
+    if os.path.exists(path):
+        return path
+    
+    partial = path + ".part.mp4"
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"color=c=black:s=320x240:r=10:d={duration}",
+        "-f", "lavfi", "-i", SIGNALS[signal].format(d=duration),
+        "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest",
+        "-map_metadata", "-1", "-fflags", "+bitexact",
+        partial
+    ]
+    subprocess.run(command, check=True)
+    os.replace(partial, path)
+    return path
+
+
+def _disk_write_bytes():
+    """Bajty zapisane na dysk przez proces (/proc/self/io, tylko Linux); None gdy niedostępne"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("write_bytes:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss():
+    """Szczytowe RSS procesu w bajtach"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # Linux podaje ru_maxrss w KB, macOS w bajtach
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+class StageRecorder:
+    """Mierzy czas, szczytowe RSS i zapis na dysk kolejnych etapów potoku"""
+    
+    def __init__(self):
+        self.stages = {}
+    
+    def run(self, name, function, *args):
+        written = _disk_write_bytes()
+        started = time.perf_counter()
+        result = function(*args)
+        stage = {"wall": time.perf_counter() - started, "peak_rss": _peak_rss()}
+        if written is not None:
+            stage["disk_write_bytes"] = _disk_write_bytes() - written
+        self.stages[name] = stage
+        return result
+
+
+def run_case(video_path, duration, settings, output_dir):
+    """Przetwarza jedno nagranie etap po etapie i zwraca pomiary (wykonywane w osobnym procesie)"""
+    transcriber = Transcriber()
+    transcriber.set_callbacks(status_callback=lambda message: None)
+    for name, value in settings.items():
+        if not getattr(transcriber, f"set_{name}")(value):
+            raise ValueError(f"Nieprawidłowe ustawienie {name}={value}")
+    
+    recorder = StageRecorder()
+    audio = None
+    output_file = os.path.join(output_dir, f"{os.getpid()}.srt")
+    # Komunikaty Transcriber trafiają na stderr, aby nie mieszać się z wynikiem JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            audio = recorder.run("extract_audio", transcriber.extract_audio, video_path)
+            recorder.run("load_model", transcriber.load_model)
+            segments = recorder.run("transcribe_audio", transcriber.transcribe_audio, audio)
+            recorder.run("create_srt_file", transcriber.create_srt_file, segments, output_file)
+        finally:
+            if isinstance(audio, str) and os.path.exists(audio):
+                os.remove(audio)
+            if os.path.exists(output_file):
+                os.remove(output_file)
+    
+    stages = recorder.stages
+    total = sum(stage["wall"] for stage in stages.values())
+    result = {
+        **settings,
+        "media": os.path.basename(video_path),
+        "media_duration": duration,
+        "segments": len(segments),
+        "stages": stages,
+        "total_wall": total,
+        "realtime_factor": stages["transcribe_audio"]["wall"] / duration,
+        "pipeline_realtime_factor": total / duration,
+        "peak_rss": _peak_rss()
+    }
+    if "disk_write_bytes" in stages["extract_audio"]:
+        result["disk_write_bytes"] = sum(stage["disk_write_bytes"] for stage in stages.values())
+    return result
+
+
+def _git_commit():
+    """Skrót bieżącego commita (jeśli benchmark jest uruchamiany z repozytorium)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Moduły, których import jest kosztowny; nie powinny być ładowane przy starcie programu
+# (numpy jest importowany przez auto_transcriber na poziomie modułu, więc go tu nie ma)
+HEAVY_MODULES = ("torch", "whisper", "moviepy", "proglog", "kivy", "kivymd")
+
+# Mierzone sposoby uruchomienia: sam import modułu i wyświetlenie pomocy CLI
+STARTUP_COMMANDS = {
+    "import": "import auto_transcriber",
+    "cli_help": "import auto_transcriber\n"
+                "try:\n    auto_transcriber.main(['batch', '--help'])\nexcept SystemExit:\n    pass"
+}
+
+
+def measure_startup(repeat=3):
+    """Mierzy czas uruchomienia programu w świeżych interpreterach
+    
+    Dla każdego polecenia z STARTUP_COMMANDS zwraca najkrótszy i mediany czas
+    (w sekundach) oraz listę ciężkich modułów załadowanych przy starcie.
+    """
+    probe = ("import sys, time, json, contextlib, io\n"
+             "started = time.perf_counter()\n"
+             "with contextlib.redirect_stdout(io.StringIO()):\n"
+             "    exec({code!r})\n"
+             "elapsed = time.perf_counter() - started\n"
+             "loaded = sorted(m for m in {heavy!r} if m in sys.modules)\n"
+             "sys.__stdout__.write(json.dumps({{'wall': elapsed, 'loaded': loaded}}))\n")
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for name, code in STARTUP_COMMANDS.items():
+        samples = []
+        loaded = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = subprocess.run([sys.executable, "-c", probe.format(code=code, heavy=HEAVY_MODULES)],
+                                    capture_output=True, text=True, cwd=cwd, check=True).stdout
+            process_wall = time.perf_counter() - started
+            measurement = json.loads(output)
+            samples.append((measurement["wall"], process_wall))
+            loaded = measurement["loaded"]
+        imports = sorted(sample[0] for sample in samples)
+        processes = sorted(sample[1] for sample in samples)
+        results[name] = {
+            "import_wall_min": imports[0],
+            "import_wall_median": imports[len(imports) // 2],
+            "process_wall_min": processes[0],
+            "process_wall_median": processes[len(processes) // 2],
+            "heavy_modules_loaded": loaded
+        }
+    return results
+
+
+def run_benchmark(durations, cases, signal="speech", repeat=1, media_dir=MEDIA_DIR, report=print):
+    """Uruchamia wszystkie przypadki (słowniki ustawień Transcriber) na nagraniach o podanych długościach
+    
+    Każdy pomiar odbywa się w świeżym procesie, aby szczytowe RSS i czas
+    ładowania modelu nie zależały od poprzednich przypadków.
+    """
+    media = [(generate_test_video(duration, signal, media_dir), duration) for duration in durations]
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for settings in cases:
+        for video_path, duration in media:
+            for run in range(repeat):
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        result = executor.submit(run_case, video_path, duration, settings, media_dir).result()
+                except Exception as e:
+                    # Nieobsługiwane ustawienie (np. bf16 bez wsparcia procesora) lub brak silnika
+                    # przerywa tylko ten przypadek - pozostałe pomiary trafiają do raportu
+                    results.append({**settings, "media": os.path.basename(video_path), "media_duration": duration,
+                                    "run": run + 1, "error": f"{type(e).__name__}: {e}"})
+                    report(f"{settings} | {os.path.basename(video_path)}: błąd: {e}")
+                    break
+                result["run"] = run + 1
+                results.append(result)
+                report(f"{settings} | {result['media']}: {result['total_wall']:.2f} s, "
+                       f"RTF {result['realtime_factor']:.3f}")
+    
+    return {
+        "commit": _git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version()
+        },
+        "signal": signal,
+        "startup": measure_startup(max(repeat, 3)),
+        "results": results
+    }
+
+
+def run_bench(args):
+    """Obsługa polecenia `bench`"""
+    cases = [
+        {"backend": backend, "model": model, "inference": inference, "language": args.lang, "audio_mode": args.audio_mode}
+        for backend in args.backends for model in args.models for inference in args.inference
+    ]
+    try:
+        if args.startup_only:
+            report = {"commit": _git_commit(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                      "python": platform.python_version(), "startup": measure_startup(max(args.repeat, 3))}
+        else:
+            report = run_benchmark(args.durations, cases, args.signal, args.repeat, args.media_dir or MEDIA_DIR,
+                                   report=lambda line: print(line, file=sys.stderr))
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Błąd benchmarku: {e}", file=sys.stderr)
+        return 1
+    
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Wyniki zapisane: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
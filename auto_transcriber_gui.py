@@ -0,0 +1,806 @@
+import os
+import threading
+
+# Kivy imports
+import kivy
+from kivy.app import App
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.filechooser import FileChooserListView
+from kivy.uix.progressbar import ProgressBar
+from kivy.uix.dropdown import DropDown
+from kivy.uix.textinput import TextInput
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.properties import StringProperty, BooleanProperty, ObjectProperty
+from kivy.uix.popup import Popup
+from kivy.graphics import Color, Rectangle, Line
+
+# KivyMD imports
+from kivymd.app import MDApp
+from kivymd.uix.button import MDRaisedButton, MDFlatButton
+from kivymd.uix.dialog import MDDialog
+from kivymd.uix.boxlayout import MDBoxLayout
+from kivymd.uix.card import MDCard
+from kivymd.uix.label import MDLabel
+from kivymd.uix.progressbar import MDProgressBar
+from kivymd.uix.selectioncontrol import MDSwitch
+from kivymd.uix.filemanager import MDFileManager
+from kivymd.uix.textfield import MDTextField
+
+from auto_transcriber import Transcriber, TranscriptionWorkerPool, UpdateChannel, format_duration
+
+class TranscriberGUI(MDBoxLayout):
+    """Główny interfejs użytkownika aplikacji
+    
+    Transkrypcja odbywa się w osobnym procesie roboczym (TranscriptionWorkerPool
+    z jednym procesem), który trzyma modele w pamięci między zadaniami, więc
+    dekodowanie nie konkuruje z Kivy o GIL. Obiekt Transcriber w procesie
+    interfejsu przechowuje tylko ustawienia przekazywane z każdym zadaniem.
+    """
+    
+    # Czas (sekundy) na reakcję zadania na anulowanie, po którym proces roboczy jest kończony
+    CANCEL_TIMEOUT = 2.0
+    
+    def __init__(self, audio_cache=None, model_cache_mb=None, **kwargs):
+        super(TranscriberGUI, self).__init__(**kwargs)
+        self.orientation = "vertical"
+        self.padding = [20, 20, 20, 20]  # Jednolite marginesy
+        self.spacing = 15  # Zwiększony odstęp między elementami
+        self.md_bg_color = [0.1, 0.1, 0.12, 1]  # Tło dla całego interfejsu
+        
+        self.transcriber = Transcriber()
+        self.transcriber.set_cache("")  # Ponowne uruchomienie dla tego samego pliku korzysta z zapisanego wyniku
+        if audio_cache is not None:
+            # Opcjonalnie (gui --audio-cache): zmiana modelu lub języka nie wymaga ponownego dekodowania wideo
+            self.transcriber.set_audio_cache(*audio_cache)
+        if model_cache_mb:
+            # Budżet pamięci modeli przekazywany procesowi roboczemu z ustawieniami
+            self.transcriber.set_model_cache(model_cache_mb)
+        self.selected_file = None
+        self.output_file = None
+        self.current_job = None  # Future zadania transkrypcji w procesie roboczym
+        self.preload_job = None
+        self.file_manager = None
+        # Status i postęp z wątku puli procesów trafiają do interfejsu najwyżej raz na klatkę
+        self.updates = UpdateChannel(notify=Clock.create_trigger(self.apply_updates))
+        
+        # Główna karta z całą zawartością
+        self.main_card = MDCard(
+            orientation="vertical",
+            padding=(20, 40, 20, 20),  # Jeszcze bardziej zwiększony padding górny
+            size_hint=(0.95, 0.92),  # Bardziej zmniejszona wysokość karty
+            pos_hint={"center_x": 0.5, "center_y": 0.5},
+            elevation=4,
+            md_bg_color=(0.1, 0.1, 0.12, 1)
+        )
+        
+        # Tytuł aplikacji
+        self.title_label = MDLabel(
+            text="Automatyczna transkrypcja plików wideo",
+            halign="center",
+            font_style="H5",
+            size_hint_y=None,
+            height=70,  # Jeszcze bardziej zwiększona wysokość etykiety tytułu
+            theme_text_color="Custom",
+            text_color=(0.9, 0.9, 0.9, 1),
+            padding=(0, 10, 0, 0)  # Dodatkowy padding górny
+        )
+        self.main_card.add_widget(self.title_label)
+        
+        # Opis aplikacji
+        self.description_label = MDLabel(
+            text="",
+            halign="center",
+            size_hint_y=None,
+            height=40,  # Zmniejszona wysokość
+            theme_text_color="Secondary",
+            font_style="Subtitle1"
+        )
+        self.main_card.add_widget(self.description_label)
+        
+        # Separator po tytule
+        self.separator1 = BoxLayout(
+            size_hint_y=None,
+            height=2,
+            padding=(0, 15, 0, 15),  # Zwiększony padding
+            pos_hint={"center_x": 0.5}  # Wycentrowanie w poziomie
+        )
+        with self.separator1.canvas:
+            Color(0.3, 0.3, 0.3, 1)
+            Rectangle(pos=self.separator1.pos, size=self.separator1.size)
+        self.main_card.add_widget(self.separator1)
+        
+        # Inicjalizacja file managera - nie będziemy go używać, zamiast tego użyjemy eksploratora Windows
+        
+        # Sekcja wyboru pliku wejściowego i wyjściowego
+        self.file_section = MDBoxLayout(
+            orientation="vertical",
+            size_hint_y=None,
+            height=220,  # Zwiększona wysokość sekcji dla dodatkowego pola
+            spacing=10,  # Zmniejszony odstęp
+            padding=[0, 10, 0, 10]
+        )
+        
+        # Nagłówek sekcji
+        self.file_section_header = MDLabel(
+            text="WYBIERZ PLIKI",
+            halign="center",
+            size_hint_y=None,
+            height=20,
+            bold=True,
+            theme_text_color="Primary"
+        )
+        self.file_section.add_widget(self.file_section_header)
+        
+        # Wybór pliku wejściowego - pole tekstowe z przyciskiem eksploratora
+        self.file_input_label = MDLabel(
+            text="Plik wideo wejściowy:",
+            size_hint_y=None,
+            height=20,
+            theme_text_color="Secondary"
+        )
+        self.file_section.add_widget(self.file_input_label)
+        
+        self.file_input_layout = MDBoxLayout(
+            orientation="horizontal",
+            size_hint_y=None,
+            height=50,
+            spacing=10
+        )
+        
+        # Pole tekstowe w stylu MDTextField dla pliku wejściowego
+        self.file_input = MDTextField(
+            hint_text="Ścieżka do pliku wideo",
+            helper_text="Wprowadź ścieżkę lub kliknij 'Przeglądaj'",
+            helper_text_mode="on_focus",
+            multiline=False,
+            size_hint_x=0.8
+        )
+        self.file_input.bind(text=self.on_file_input_change)
+        self.file_input_layout.add_widget(self.file_input)
+        
+        # Przycisk eksploratora dla pliku wejściowego
+        self.browse_button = MDRaisedButton(
+            text="Przeglądaj",
+            on_release=self.open_file_manager,
+            size_hint_x=0.2,
+            md_bg_color=self.theme_cls.accent_color
+        )
+        self.file_input_layout.add_widget(self.browse_button)
+        
+        self.file_section.add_widget(self.file_input_layout)
+        
+        # Wybór pliku wyjściowego - pole tekstowe z przyciskiem eksploratora
+        self.output_file_label = MDLabel(
+            text="Plik napisów wyjściowy:",
+            size_hint_y=None,
+            height=20,
+            theme_text_color="Secondary"
+        )
+        self.file_section.add_widget(self.output_file_label)
+        
+        self.output_file_layout = MDBoxLayout(
+            orientation="horizontal",
+            size_hint_y=None,
+            height=50,
+            spacing=10
+        )
+        
+        # Pole tekstowe w stylu MDTextField dla pliku wyjściowego
+        self.output_file_input = MDTextField(
+            hint_text="Ścieżka do pliku SRT",
+            helper_text="Wprowadź ścieżkę lub kliknij 'Przeglądaj'",
+            helper_text_mode="on_focus",
+            multiline=False,
+            size_hint_x=0.8
+        )
+        self.output_file_layout.add_widget(self.output_file_input)
+        
+        # Przycisk eksploratora dla pliku wyjściowego
+        self.output_browse_button = MDRaisedButton(
+            text="Przeglądaj",
+            on_release=self.open_output_file_manager,
+            size_hint_x=0.2,
+            md_bg_color=self.theme_cls.accent_color
+        )
+        self.output_file_layout.add_widget(self.output_browse_button)
+        
+        self.file_section.add_widget(self.output_file_layout)
+        
+        # Informacja o wybranych plikach
+        self.selected_file_label = MDLabel(
+            text="Nie wybrano plików",
+            halign="center",
+            size_hint_y=None,
+            height=20,
+            theme_text_color="Secondary",
+            font_style="Caption"
+        )
+        self.file_section.add_widget(self.selected_file_label)
+        
+        self.main_card.add_widget(self.file_section)
+        
+        # Separator (linia pozioma)
+        self.separator2 = BoxLayout(
+            size_hint_y=None,
+            height=2,
+            padding=[5, 5, 5, 5]
+        )
+        # Dodajemy kolor tła do separatora
+        with self.separator2.canvas.before:
+            Color(0.3, 0.3, 0.3, 1)
+            Rectangle(pos=self.separator2.pos, size=self.separator2.size)
+        self.main_card.add_widget(self.separator2)
+        
+
+        
+        # Sekcja opcji transkrypcji
+        self.options_section = MDBoxLayout(
+            orientation="vertical",
+            size_hint_y=None,
+            height=150,
+            spacing=10,
+            padding=[0, 10, 0, 10]
+        )
+        
+        # Nagłówek sekcji opcji
+        self.options_section_header = MDLabel(
+            text="OPCJE TRANSKRYPCJI",
+            halign="center",
+            size_hint_y=None,
+            height=30,
+            bold=True,
+            theme_text_color="Primary"
+        )
+        self.options_section.add_widget(self.options_section_header)
+        
+        # Opcje transkrypcji - dropdowny
+        self.options_layout = MDBoxLayout(
+            orientation="horizontal",
+            size_hint_y=None,
+            height=100,
+            spacing=20
+        )
+        
+        # Wybór języka
+        self.language_layout = MDBoxLayout(
+            orientation="vertical",
+            size_hint_x=0.5,
+            spacing=5
+        )
+        
+        self.language_label = MDLabel(
+            text="Język transkrypcji:",
+            size_hint_y=None,
+            height=20,
+            theme_text_color="Secondary"
+        )
+        self.language_layout.add_widget(self.language_label)
+        
+        # Dropdown języka
+        self.language_dropdown = DropDown()
+        self.language_dropdown.background_color = [0.2, 0.2, 0.25, 1]
+        
+        for lang_code, lang_name in self.transcriber.AVAILABLE_LANGUAGES.items():
+            btn = Button(
+                text=f"{lang_name} ({lang_code})",
+                size_hint_y=None,
+                height=44,
+                background_color=[0.25, 0.25, 0.3, 1],
+                background_normal="",
+                color=[0.9, 0.9, 0.9, 1]
+            )
+            btn.bind(on_release=lambda btn, lang_code=lang_code: self.select_language(lang_code, btn.text))
+            self.language_dropdown.add_widget(btn)
+        
+        self.language_button = Button(
+            text="Polski (pl)",
+            size_hint_y=None,
+            height=50,
+            background_color=[0.3, 0.3, 0.35, 1],
+            background_normal="",
+            color=[0.9, 0.9, 0.9, 1]
+        )
+        self.language_button.bind(on_release=self.language_dropdown.open)
+        self.language_layout.add_widget(self.language_button)
+        
+        self.options_layout.add_widget(self.language_layout)
+        
+        # Wybór modelu
+        self.model_layout = MDBoxLayout(
+            orientation="vertical",
+            size_hint_x=0.5,
+            spacing=5
+        )
+        
+        self.model_label = MDLabel(
+            text="Siła transkrypcji (model):",
+            size_hint_y=None,
+            height=20,
+            theme_text_color="Secondary"
+        )
+        self.model_layout.add_widget(self.model_label)
+        
+        # Dropdown modelu
+        self.model_dropdown = DropDown()
+        self.model_dropdown.background_color = [0.2, 0.2, 0.25, 1]
+        
+        for model_name, model_desc in self.transcriber.AVAILABLE_MODELS.items():
+            btn = Button(
+                text=f"{model_name} - {model_desc}",
+                size_hint_y=None,
+                height=44,
+                background_color=[0.25, 0.25, 0.3, 1],
+                background_normal="",
+                color=[0.9, 0.9, 0.9, 1]
+            )
+            btn.bind(on_release=lambda btn, model=model_name: self.select_model(model, btn.text))
+            self.model_dropdown.add_widget(btn)
+        
+        self.model_button = Button(
+            text="large - Najdokładniejszy, najwolniejszy",
+            size_hint_y=None,
+            height=50,
+            background_color=[0.3, 0.3, 0.35, 1],
+            background_normal="",
+            color=[0.9, 0.9, 0.9, 1]
+        )
+        self.model_button.bind(on_release=self.model_dropdown.open)
+        self.model_layout.add_widget(self.model_button)
+        
+        self.options_layout.add_widget(self.model_layout)
+        
+        self.options_section.add_widget(self.options_layout)
+        self.main_card.add_widget(self.options_section)
+        
+        # Separator (linia pozioma)
+        self.separator3 = BoxLayout(
+            size_hint_y=None,
+            height=2,
+            padding=[5, 5, 5, 5]
+        )
+        # Dodajemy kolor tła do separatora
+        with self.separator3.canvas.before:
+            Color(0.3, 0.3, 0.3, 1)
+            Rectangle(pos=self.separator3.pos, size=self.separator3.size)
+        self.main_card.add_widget(self.separator3)
+        
+        # Sekcja postępu
+        self.progress_section = MDBoxLayout(
+            orientation="vertical",
+            size_hint_y=None,
+            height=150,
+            spacing=10,
+            padding=[0, 10, 0, 10]
+        )
+        
+        # Nagłówek sekcji postępu
+        self.progress_section_header = MDLabel(
+            text="STATUS TRANSKRYPCJI",
+            halign="center",
+            size_hint_y=None,
+            height=30,
+            bold=True,
+            theme_text_color="Primary"
+        )
+        self.progress_section.add_widget(self.progress_section_header)
+        
+        # Pasek postępu - asynchroniczny
+        self.progress_bar = MDProgressBar(
+            value=0,
+            size_hint_y=None,
+            height=15,
+            color=self.theme_cls.accent_color,
+            running_duration=1,
+            catching_duration=1.5
+        )
+        self.progress_section.add_widget(self.progress_bar)
+        
+        # Status transkrypcji
+        self.status_label = MDLabel(
+            text="Gotowy do transkrypcji",
+            halign="center",
+            size_hint_y=None,
+            height=30,
+            theme_text_color="Primary",
+            font_style="Subtitle1"
+        )
+        self.progress_section.add_widget(self.status_label)
+        
+        # Dodatkowy label dla informacji o modelu i języku
+        self.info_label = MDLabel(
+            text="Model: large | Język: Polski (pl)",
+            halign="center",
+            size_hint_y=None,
+            height=30,
+            theme_text_color="Secondary",
+            font_style="Caption"
+        )
+        self.progress_section.add_widget(self.info_label)
+        
+        self.main_card.add_widget(self.progress_section)
+        
+        # Separator (linia pozioma)
+        self.separator4 = BoxLayout(
+            size_hint_y=None,
+            height=2,
+            padding=[5, 5, 5, 5]
+        )
+        # Dodajemy kolor tła do separatora
+        with self.separator4.canvas.before:
+            Color(0.3, 0.3, 0.3, 1)
+            Rectangle(pos=self.separator4.pos, size=self.separator4.size)
+        self.main_card.add_widget(self.separator4)
+        
+        # Sekcja przycisków akcji
+        self.buttons_section = MDBoxLayout(
+            orientation="vertical",
+            size_hint_y=None,
+            height=100,
+            spacing=10,
+            padding=[0, 20, 0, 10]
+        )
+        
+        # Przyciski akcji
+        self.buttons_layout = MDBoxLayout(
+            orientation="horizontal",
+            size_hint_y=None,
+            height=60,
+            spacing=20,
+            padding=[20, 0, 20, 0]
+        )
+        
+        self.transcribe_button = MDRaisedButton(
+            text="ROZPOCZNIJ TRANSKRYPCJĘ",
+            on_release=self.start_transcription,
+            disabled=True,
+            size_hint_x=0.6,
+            height=50,
+            md_bg_color=self.theme_cls.primary_color,
+            elevation=4,
+            font_style="Button"
+        )
+        self.buttons_layout.add_widget(self.transcribe_button)
+        
+        self.cancel_button = MDRaisedButton(
+            text="ANULUJ",
+            on_release=self.cancel_transcription,
+            disabled=True,
+            md_bg_color=[0.8, 0.2, 0.2, 1],
+            size_hint_x=0.4,
+            height=50,
+            elevation=4,
+            font_style="Button"
+        )
+        self.buttons_layout.add_widget(self.cancel_button)
+        
+        self.buttons_section.add_widget(self.buttons_layout)
+        self.main_card.add_widget(self.buttons_section)
+        
+        # Dodanie głównej karty do interfejsu
+        self.add_widget(self.main_card)
+        
+        # Proces roboczy transkrypcji; komunikaty i postęp trafiają do kanału aktualizacji
+        self.worker = TranscriptionWorkerPool(
+            workers=1,
+            model_name=self.transcriber.model_name,
+            language=self.transcriber.language,
+            audio_mode=self.transcriber.audio_mode,
+            settings=self.transcriber.export_settings(),
+            schedule="fifo"
+        )
+        self.worker.set_callbacks(
+            status_callback=self.update_status,
+            progress_details_callback=self.on_worker_progress
+        )
+        
+        # Proces roboczy (import whisper/torch i domyślny model) uruchamiany dopiero
+        # po wyświetleniu pierwszej klatki okna, aby nie opóźniać startu
+        Clock.schedule_once(lambda dt: self.worker.start(), 0.5)
+    
+    def on_file_input_change(self, instance, value):
+        """Obsługa zmiany tekstu w polu ścieżki pliku wejściowego"""
+        if os.path.isfile(value):
+            self.selected_file = value
+            filename = os.path.basename(self.selected_file)
+            
+            # Ustaw domyślną ścieżkę wyjściową i zaktualizuj pole
+            base_name = os.path.splitext(self.selected_file)[0]
+            self.output_file = f"{base_name}.srt"
+            self.output_file_input.text = self.output_file
+            
+            # Aktualizuj etykietę informacyjną
+            self.selected_file_label.text = f"Wejście: {filename} | Wyjście: {os.path.basename(self.output_file)}"
+            self.update_transcribe_button_state()
+        else:
+            self.selected_file = None
+            self.update_transcribe_button_state()
+            self.selected_file_label.text = "Nieprawidłowa ścieżka pliku wejściowego"
+    
+    def open_file_manager(self, instance):
+        """Otwiera eksplorator Windows do wyboru pliku wejściowego"""
+        import tkinter as tk
+        from tkinter import filedialog
+        
+        # Ukryj główne okno Tkinter
+        root = tk.Tk()
+        root.withdraw()
+        
+        # Otwieranie eksploratora Windows
+        file_types = [
+            ("Pliki wideo", "*.mp4;*.avi;*.mkv;*.mov;*.wmv"),
+            ("Wszystkie pliki", "*.*")
+        ]
+        path = filedialog.askopenfilename(
+            title="Wybierz plik wideo wejściowy",
+            filetypes=file_types,
+            initialdir=os.path.expanduser("~")
+        )
+        
+        # Obsługa wybranego pliku
+        if path and os.path.isfile(path):
+            self.file_input.text = path
+            self.selected_file = path
+            filename = os.path.basename(path)
+            
+            # Ustaw domyślną ścieżkę wyjściową i zaktualizuj pole
+            base_name = os.path.splitext(self.selected_file)[0]
+            self.output_file = f"{base_name}.srt"
+            self.output_file_input.text = self.output_file
+            
+            # Aktualizuj etykietę informacyjną
+            self.selected_file_label.text = f"Wejście: {filename} | Wyjście: {os.path.basename(self.output_file)}"
+            self.update_transcribe_button_state()
+        
+        # Zniszcz obiekt Tkinter
+        root.destroy()
+    
+    def open_output_file_manager(self, instance):
+        """Otwiera eksplorator Windows do wyboru pliku wyjściowego"""
+        import tkinter as tk
+        from tkinter import filedialog
+        
+        # Ukryj główne okno Tkinter
+        root = tk.Tk()
+        root.withdraw()
+        
+        # Otwieranie eksploratora Windows
+        file_types = [
+            ("Pliki napisów SRT", "*.srt"),
+            ("Wszystkie pliki", "*.*")
+        ]
+        
+        # Ustal domyślną nazwę pliku
+        default_filename = ""
+        if self.selected_file:
+            base_name = os.path.splitext(self.selected_file)[0]
+            default_filename = f"{os.path.basename(base_name)}.srt"
+        
+        # Ustal domyślny katalog
+        initial_dir = os.path.expanduser("~")
+        if self.selected_file:
+            initial_dir = os.path.dirname(self.selected_file)
+        
+        path = filedialog.asksaveasfilename(
+            title="Wybierz plik napisów wyjściowy",
+            filetypes=file_types,
+            initialdir=initial_dir,
+            initialfile=default_filename,
+            defaultextension=".srt"
+        )
+        
+        # Obsługa wybranego pliku
+        if path:
+            self.output_file = path
+            self.output_file_input.text = path
+            
+            # Aktualizuj etykietę informacyjną
+            if self.selected_file:
+                input_filename = os.path.basename(self.selected_file)
+                output_filename = os.path.basename(path)
+                self.selected_file_label.text = f"Wejście: {input_filename} | Wyjście: {output_filename}"
+            else:
+                self.selected_file_label.text = f"Wyjście: {os.path.basename(path)}"
+            
+            self.update_transcribe_button_state()
+        
+        # Zniszcz obiekt Tkinter
+        root.destroy()
+    
+    def update_transcribe_button_state(self):
+        """Aktualizuje stan przycisku transkrypcji na podstawie wybranych plików"""
+        # Przycisk jest aktywny tylko jeśli wybrano plik wejściowy
+        self.transcribe_button.disabled = not self.selected_file
+    
+    def select_language(self, lang_code, lang_text):
+        """Obsługa wyboru języka z dropdown"""
+        self.transcriber.set_language(lang_code)
+        # Proces roboczy uruchomiony ponownie (np. po wymuszonym anulowaniu) startuje z bieżącym językiem
+        self.worker.update_settings(self.transcriber.export_settings())
+        self.language_button.text = lang_text
+        self.language_dropdown.dismiss()
+        self.update_info_label()
+    
+    def select_model(self, model_name, model_text):
+        """Obsługa wyboru modelu z dropdown"""
+        self.transcriber.set_model(model_name)
+        self.preload_model()
+        self.model_button.text = model_text
+        self.model_dropdown.dismiss()
+        self.update_info_label()
+    
+    def preload_model(self):
+        """Ładuje wybrany model w procesie roboczym w tle (wcześniej użyte pozostają w jego pamięci)"""
+        if self.preload_job is not None:
+            self.preload_job.cancel()  # Poprzednio wybrany model, jeśli jeszcze nie zaczął się ładować
+        settings = self.transcriber.export_settings()
+        # Proces roboczy uruchomiony ponownie (np. po wymuszonym anulowaniu) ładuje od razu wybrany model
+        self.worker.update_settings(settings)
+        self.preload_job = self.worker.submit("load_model", settings=settings)
+    
+    def update_info_label(self, details=None):
+        """Aktualizuje etykietę informacyjną (opcjonalnie o szczegóły postępu)"""
+        lang_code = self.transcriber.language
+        lang_name = self.transcriber.AVAILABLE_LANGUAGES.get(lang_code, "Nieznany")
+        text = f"Model: {self.transcriber.model_name} | Język: {lang_name} ({lang_code})"
+        if details and details.get("duration"):
+            text += f" | Audio: {format_duration(details['position'])} / {format_duration(details['duration'])}"
+        if details and details.get("speed"):
+            text += f" | {details['speed']:.1f}x czasu rzeczywistego"
+        if details and details.get("eta") is not None:
+            text += f" | Pozostało: {format_duration(details['eta'])}"
+        self.info_label.text = text
+    
+    def update_progress(self, value, details=None):
+        """Aktualizuje pasek postępu (wywoływane z dowolnego wątku)"""
+        self.updates.publish("progress", (value, details))
+    
+    def on_worker_progress(self, progress, details=None):
+        """Postęp z procesu roboczego: pokazywany jest postęp bieżącego zadania (z długością nagrania)"""
+        job = self.current_job
+        if job is not None:
+            self.update_progress(*self.worker.job_progress(job))
+    
+    def update_status(self, message):
+        """Aktualizuje etykietę statusu (wywoływane z dowolnego wątku)"""
+        self.updates.publish("status", message)
+    
+    def apply_updates(self, dt):
+        """Przenosi do widżetów najnowszy status i postęp; starsze, niewyświetlone wartości są pomijane"""
+        updates = self.updates.drain()
+        if "status" in updates:
+            self.status_label.text = updates["status"]
+        if "progress" in updates:
+            value, details = updates["progress"]
+            self.progress_bar.value = value
+            if details:
+                self.update_info_label(details)
+    
+    def start_transcription(self, instance):
+        """Zleca transkrypcję procesowi roboczemu"""
+        if self.selected_file:
+            # Aktualizacja UI
+            self.transcribe_button.disabled = True
+            self.cancel_button.disabled = False
+            self.progress_bar.value = 0
+            self.update_status("Przygotowanie do transkrypcji...")
+            
+            # Użyj ścieżki z pola tekstowego, jeśli jest dostępna
+            output_file = self.output_file_input.text if self.output_file_input.text else self.output_file
+            job = self.worker.submit_video(self.selected_file, output_file, **self.transcriber.export_settings())
+            self.current_job = job
+            # Wynik przychodzi w wątku puli - obsługa w wątku interfejsu
+            job.add_done_callback(lambda future: Clock.schedule_once(lambda dt: self.on_transcription_done(future), 0))
+    
+    def on_transcription_done(self, job):
+        """Obsługa zakończenia zadania (sukces, anulowanie lub błąd)"""
+        if job is self.current_job:
+            self.current_job = None
+        self.transcribe_button.disabled = False
+        self.cancel_button.disabled = True
+        
+        error = None if job.cancelled() else job.exception()
+        if error is not None:
+            self.update_status(f"Błąd: {error}")
+            self.show_error_dialog(str(error))
+            return
+        result = None if job.cancelled() else job.result()
+        if result is None:
+            self.update_status("Transkrypcja anulowana")
+            return
+        self.show_completion_dialog(result)
+    
+    def cancel_transcription(self, instance):
+        """Anuluje proces transkrypcji"""
+        job = self.current_job
+        if job is not None and not job.done():
+            # Zadanie przerywa się samo przy najbliższym sprawdzeniu flagi anulowania
+            self.worker.cancel(job)
+            self.update_status("Anulowanie transkrypcji...")
+            self.cancel_button.disabled = True
+            Clock.schedule_once(lambda dt: self.force_cancel(job), self.CANCEL_TIMEOUT)
+    
+    def force_cancel(self, job):
+        """Kończy proces roboczy, jeśli zadanie nie zareagowało na anulowanie (np. w trakcie ładowania modelu)"""
+        if job.done():
+            return
+        self.update_status("Przerywanie procesu transkrypcji (model zostanie ponownie załadowany)...")
+        
+        def restart():
+            self.worker.terminate()
+            self.worker.start()
+        # Zakończenie procesu i uruchomienie nowego w tle, aby nie wstrzymywać interfejsu
+        threading.Thread(target=restart, daemon=True).start()
+    
+    def show_completion_dialog(self, output_file):
+        """Wyświetla dialog po zakończeniu transkrypcji"""
+        dialog = MDDialog(
+            title="Transkrypcja zakończona",
+            text=f"Plik SRT został utworzony: {output_file}",
+            buttons=[
+                MDFlatButton(
+                    text="OK",
+                    on_release=lambda x: dialog.dismiss()
+                ),
+                MDFlatButton(
+                    text="Otwórz folder",
+                    on_release=lambda x: self.open_output_folder(output_file)
+                )
+            ]
+        )
+        dialog.open()
+    
+    def show_error_dialog(self, error_message):
+        """Wyświetla dialog z błędem"""
+        dialog = MDDialog(
+            title="Błąd transkrypcji",
+            text=f"Wystąpił błąd podczas transkrypcji: {error_message}",
+            buttons=[
+                MDFlatButton(
+                    text="OK",
+                    on_release=lambda x: dialog.dismiss()
+                )
+            ]
+        )
+        dialog.open()
+    
+    def open_output_folder(self, file_path):
+        """Otwiera folder zawierający plik wyjściowy"""
+        folder_path = os.path.dirname(os.path.abspath(file_path))
+        os.startfile(folder_path)
+
+
+class AutoTranscriberApp(MDApp):
+    """Główna klasa aplikacji
+    
+    audio_cache to (katalog, limit MB) pamięci podręcznej audio lub None
+    (domyślnie wyłączona), model_cache_mb - limit pamięci załadowanych
+    modeli (None = połowa RAM).
+    """
+    
+    def __init__(self, audio_cache=None, model_cache_mb=None, **kwargs):
+        super(AutoTranscriberApp, self).__init__(**kwargs)
+        self.audio_cache = audio_cache
+        self.model_cache_mb = model_cache_mb
+    
+    def build(self):
+        # Ustawienia motywu
+        self.theme_cls.primary_palette = "BlueGray"  # Główny kolor
+        self.theme_cls.accent_palette = "DeepOrange"  # Kolor akcentu
+        self.theme_cls.primary_hue = "700"  # Ciemniejszy odcień koloru głównego
+        self.theme_cls.theme_style = "Dark"  # Ciemny motyw
+        
+        # Ustawienia okna
+        self.title = "Auto Transcriber"
+        Window.size = (1000, 750)  # Jeszcze bardziej zwiększona wysokość okna
+        Window.minimum_width, Window.minimum_height = 1000, 750  # Ustaw minimalny rozmiar taki sam jak aktualny
+        Window.clearcolor = (0.05, 0.05, 0.07, 1)  # Tło okna aplikacji
+        Window.resizable = False  # Zablokuj możliwość zmiany rozmiaru okna
+        
+        return TranscriberGUI(audio_cache=self.audio_cache, model_cache_mb=self.model_cache_mb)
+    
+    def on_stop(self):
+        # Proces roboczy kończony od razu, bez czekania na bieżące zadanie
+        self.root.worker.terminate()
@@ -0,0 +1,414 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from auto_transcriber import (Transcriber, TranscriptionWorkerPool, PrometheusMetrics, configure_transcriber,
+                              probe_duration, path_priority)
+
+# Ustawienia, które można zmienić dla pojedynczego zadania (model pozostaje bez zmian w pamięci procesów)
+JOB_SETTINGS = ("language", "vad")
+
+# Wartości parametru vad w adresie przy przesyłaniu surowych danych pliku
+VAD_QUERY_VALUES = {"1": True, "true": True, "yes": True, "0": False, "false": False, "no": False}
+
+# Formaty tekstowe wyniku (GET /jobs/<id>/result?format=...) i ich typy MIME
+RESULT_CONTENT_TYPES = {
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+    "txt": "text/plain",
+    "tsv": "text/tab-separated-values"
+}
+
+
+class JobQueueFull(Exception):
+    """Zgłaszany, gdy kolejka oczekujących zadań jest pełna"""
+
+
+def job_settings_error(settings):
+    """Zwraca opis błędu w ustawieniach zadania lub None, gdy są poprawne
+    
+    Ustawienia są sprawdzane przed dodaniem do kolejki, aby nieprawidłowa
+    wartość kończyła się odpowiedzią 400, a nie błędem w procesie roboczym.
+    """
+    language = settings.get("language")
+    if language is not None and language not in Transcriber.AVAILABLE_LANGUAGES:
+        return f"Nieobsługiwany język: {language}"
+    vad = settings.get("vad")
+    if vad is not None and not isinstance(vad, bool):
+        return f"Nieprawidłowa wartość vad (oczekiwano true lub false): {vad}"
+    return None
+
+
+class TranscriptionService:
+    """Kolejka zadań transkrypcji obsługiwana przez procesy robocze z modelami stale w pamięci
+    
+    Niezależna od HTTP (ServiceRequestHandler tylko tłumaczy żądania na jej
+    metody). Zadania przechodzą przez stany queued -> running -> done,
+    failed lub cancelled; wyniki zakończonych zadań są przechowywane przez
+    job_ttl sekund. Kolejność oczekujących zadań ustala pula (schedule,
+    aging); priorytet zadania bez jawnej wartości wynika z wzorców priorities.
+    """
+    
+    def __init__(self, transcriber, workers=1, max_queue=16, threads_per_worker=None, job_ttl=3600,
+                 schedule="shortest", aging=1.0, priorities=()):
+        self.transcriber = transcriber  # Ustawienia procesów roboczych i formatowanie wyników
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+        self.priorities = list(priorities)
+        self.pool = TranscriptionWorkerPool(
+            workers=workers,
+            model_name=transcriber.model_name,
+            language=transcriber.language,
+            audio_mode=transcriber.audio_mode,
+            threads_per_worker=threads_per_worker,
+            settings=transcriber.export_settings(),
+            schedule=schedule,
+            aging=aging
+        )
+        self.metrics = PrometheusMetrics()
+        self.pool.add_event_hook(self.metrics)
+        for hook in transcriber.event_hooks:
+            self.pool.add_event_hook(hook)
+        self.upload_dir = tempfile.mkdtemp(prefix="auto_transcriber_uploads_")
+        self.jobs = {}
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Uruchamia procesy robocze (modele są ładowane od razu, przed pierwszym zadaniem)"""
+        self.pool.start()
+    
+    def shutdown(self):
+        """Anuluje oczekujące zadania, zatrzymuje procesy i usuwa przesłane pliki"""
+        self.pool.shutdown(wait=False)
+        shutil.rmtree(self.upload_dir, ignore_errors=True)
+    
+    def upload_path(self, filename):
+        """Zwraca nową ścieżkę w katalogu przesłanych plików (z rozszerzeniem z nazwy pliku)"""
+        fd, path = tempfile.mkstemp(dir=self.upload_dir, suffix=os.path.splitext(filename or "")[1])
+        os.close(fd)
+        return path
+    
+    def submit(self, video_path, settings=None, uploaded=False, priority=None):
+        """Dodaje zadanie do kolejki i zwraca jego opis; JobQueueFull, gdy kolejka jest pełna"""
+        settings = {name: value for name, value in (settings or {}).items() if name in JOB_SETTINGS}
+        if priority is None:
+            priority = path_priority(video_path, self.priorities)
+        duration = probe_duration(video_path) if self.pool.schedule == "shortest" else None
+        self._expire()
+        with self._lock:
+            if self.pool.queue_length() >= self.max_queue:
+                raise JobQueueFull()
+            future = self.pool.submit("transcribe_video", video_path, settings=settings, priority=priority,
+                                      duration=duration)
+            job = {
+                "id": str(future.job_id),
+                "source": video_path,
+                "settings": settings,
+                "priority": priority,
+                "future": future,
+                "uploaded": uploaded,
+                "created": time.time(),
+                "finished": None
+            }
+            self.jobs[job["id"]] = job
+        future.add_done_callback(lambda _future: self._job_finished(job))
+        return self.status(job["id"])
+    
+    def _job_finished(self, job):
+        """Zapisuje czas zakończenia i usuwa przesłany plik źródłowy"""
+        job["finished"] = time.time()
+        if job["uploaded"] and os.path.exists(job["source"]):
+            os.remove(job["source"])
+    
+    def _expire(self):
+        """Usuwa zakończone zadania starsze niż job_ttl"""
+        limit = time.time() - self.job_ttl
+        with self._lock:
+            for job_id in [job_id for job_id, job in self.jobs.items() if job["finished"] and job["finished"] < limit]:
+                del self.jobs[job_id]
+    
+    def get(self, job_id):
+        """Zwraca zadanie lub None"""
+        with self._lock:
+            return self.jobs.get(job_id)
+    
+    def list(self):
+        """Opisy wszystkich przechowywanych zadań"""
+        self._expire()
+        with self._lock:
+            job_ids = list(self.jobs)
+        return [self.status(job_id) for job_id in job_ids]
+    
+    def status(self, job_id):
+        """Opis stanu zadania (słownik gotowy do serializacji JSON) lub None"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        future = job["future"]
+        progress, details = self.pool.job_progress(future)
+        error = None
+        if future.cancelled():
+            state = "cancelled"
+        elif future.done():
+            error = future.exception()
+            state = "failed" if error else "done" if future.result() is not None else "cancelled"
+            progress = 100 if state == "done" else progress
+        elif future.running():
+            state = "running"
+        else:
+            state = "queued"
+        status = {
+            "id": job["id"],
+            "status": state,
+            "source": os.path.basename(job["source"]) if job["uploaded"] else job["source"],
+            "settings": job["settings"],
+            "priority": job["priority"],
+            "progress": progress,
+            "created": job["created"],
+            "finished": job["finished"]
+        }
+        if details:
+            status.update({key: details.get(key) for key in ("position", "duration", "realtime_factor", "eta")})
+        if error:
+            status["error"] = str(error)
+        return status
+    
+    def result(self, job_id):
+        """Segmenty zakończonego zadania; None, jeśli zadanie nie zakończyło się sukcesem"""
+        job = self.get(job_id)
+        if job is None or not job["future"].done() or job["future"].cancelled() or job["future"].exception():
+            return None
+        return job["future"].result()
+    
+    def cancel(self, job_id):
+        """Anuluje zadanie oczekujące lub przerywa wykonywane; False, jeśli już zakończone"""
+        job = self.get(job_id)
+        if job is None or job["future"].done():
+            return False
+        return self.pool.cancel(job["future"])
+    
+    def render_metrics(self):
+        """Metryki Prometheus zdarzeń puli uzupełnione o bieżący stan kolejki"""
+        states = [status["status"] for status in self.list()]
+        gauges = [
+            ("queue_length", "Zadania oczekujące na wolny proces roboczy", self.pool.queue_length()),
+            ("queue_capacity", "Maksymalna liczba zadań oczekujących", self.max_queue),
+            ("jobs_running", "Zadania wykonywane w procesach roboczych", states.count("running")),
+            ("workers", "Liczba procesów roboczych", self.pool.workers)
+        ]
+        lines = [self.metrics.render()]
+        for name, help_text, value in gauges:
+            name = f"{PrometheusMetrics.PREFIX}_{name}"
+            lines.append(f"# HELP {name} {help_text}\n# TYPE {name} gauge\n{name} {value}\n")
+        return "".join(lines)
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """Interfejs HTTP usługi (JSON)
+    
+    POST   /jobs                 zlecenie: JSON {"path": ..., "language": ..., "vad": ..., "priority": ...}
+                                 lub surowe dane pliku (?filename=...&language=...&priority=...)
+    GET    /jobs                 lista zadań
+    GET    /jobs/<id>            stan zadania
+    GET    /jobs/<id>/result     wynik: ?format=srt (domyślnie), vtt, txt, tsv lub json
+    DELETE /jobs/<id>            anulowanie (także POST /jobs/<id>/cancel)
+    GET    /metrics              metryki Prometheus
+    GET    /health               stan usługi
+    """
+    
+    server_version = "AutoTranscriber/1.0"
+    
+    @property
+    def service(self):
+        return self.server.service
+    
+    def send_json(self, status, payload):
+        self.send_text(status, json.dumps(payload, ensure_ascii=False), "application/json")
+    
+    def send_text(self, status, text, content_type="text/plain", headers=None):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_error_json(self, status, message, headers=None):
+        self.send_text(status, json.dumps({"error": message}, ensure_ascii=False), "application/json", headers)
+    
+    def route(self):
+        """Dzieli ścieżkę żądania na części i parametry zapytania"""
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return parts, query
+    
+    def do_GET(self):
+        parts, query = self.route()
+        if parts == ["health"]:
+            self.send_json(200, {"status": "ok", "queue_length": self.service.pool.queue_length()})
+        elif parts == ["metrics"]:
+            self.send_text(200, self.service.render_metrics(), "text/plain; version=0.0.4")
+        elif parts == ["jobs"]:
+            self.send_json(200, {"jobs": self.service.list()})
+        elif len(parts) == 2 and parts[0] == "jobs":
+            status = self.service.status(parts[1])
+            if status is None:
+                self.send_error_json(404, "Nie znaleziono zadania")
+            else:
+                self.send_json(200, status)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            self.send_result(parts[1], query.get("format", "srt"))
+        else:
+            self.send_error_json(404, "Nieznany adres")
+    
+    def send_result(self, job_id, output_format):
+        status = self.service.status(job_id)
+        if status is None:
+            self.send_error_json(404, "Nie znaleziono zadania")
+            return
+        if status["status"] != "done":
+            self.send_json(409, status)
+            return
+        segments = self.service.result(job_id)
+        if output_format == "json":
+            self.send_json(200, {"id": job_id, "segments": segments})
+        elif output_format in RESULT_CONTENT_TYPES:
+            self.send_text(200, self.service.transcriber.format_transcription(segments, output_format),
+                           RESULT_CONTENT_TYPES[output_format])
+        else:
+            self.send_error_json(400, f"Nieznany format wyniku: {output_format}")
+    
+    def do_POST(self):
+        parts, query = self.route()
+        if parts == ["jobs"]:
+            self.submit_job(query)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            self.cancel_job(parts[1])
+        else:
+            self.send_error_json(404, "Nieznany adres")
+    
+    def do_DELETE(self):
+        parts, _query = self.route()
+        if len(parts) == 2 and parts[0] == "jobs":
+            self.cancel_job(parts[1])
+        else:
+            self.send_error_json(404, "Nieznany adres")
+    
+    def submit_job(self, query):
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.send_error_json(411, "Wymagany nagłówek Content-Length")
+            return
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_error_json(400, f"Nieprawidłowy nagłówek Content-Length: {self.headers['Content-Length']}")
+            return
+        uploaded = None
+        
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self.send_error_json(400, "Nieprawidłowy JSON")
+                return
+            if not isinstance(request, dict):
+                self.send_error_json(400, "Treść żądania musi być obiektem JSON")
+                return
+            video_path = request.get("path")
+            if not video_path or not os.path.isfile(video_path):
+                self.send_error_json(400, f"Plik nie istnieje: {video_path}")
+                return
+            settings = request
+        else:
+            # Surowe dane pliku zapisywane strumieniowo do katalogu usługi
+            uploaded = video_path = self.service.upload_path(query.get("filename"))
+            with open(uploaded, "wb") as f:
+                remaining = length
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, 1 << 20))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            if remaining > 0:
+                # Połączenie zamknięte przed przesłaniem całego pliku
+                os.remove(uploaded)
+                self.send_error_json(400, f"Przesłano niekompletny plik (brakuje {remaining} B)")
+                return
+            settings = dict(query)
+            if "vad" in settings:
+                settings["vad"] = VAD_QUERY_VALUES.get(settings["vad"].lower(), settings["vad"])
+        
+        priority = settings.get("priority")
+        try:
+            priority = None if priority is None else int(priority)
+        except (TypeError, ValueError):
+            if uploaded:
+                os.remove(uploaded)
+            self.send_error_json(400, f"Nieprawidłowy priorytet: {priority}")
+            return
+        
+        error = job_settings_error(settings)
+        if error:
+            if uploaded:
+                os.remove(uploaded)
+            self.send_error_json(400, error)
+            return
+        
+        try:
+            status = self.service.submit(video_path, settings, uploaded=uploaded is not None, priority=priority)
+        except JobQueueFull:
+            if uploaded:
+                os.remove(uploaded)
+            self.send_error_json(503, "Kolejka zadań jest pełna", {"Retry-After": "10"})
+            return
+        self.send_json(202, status)
+    
+    def cancel_job(self, job_id):
+        status = self.service.status(job_id)
+        if status is None:
+            self.send_error_json(404, "Nie znaleziono zadania")
+        elif not self.service.cancel(job_id):
+            self.send_json(409, status)
+        else:
+            self.send_json(202, self.service.status(job_id))
+
+
+def run_serve(args):
+    """Obsługa polecenia `serve`"""
+    transcriber = configure_transcriber(args)
+    if transcriber is None:
+        return 2
+    
+    service = TranscriptionService(transcriber, workers=args.workers, max_queue=args.max_queue,
+                                   threads_per_worker=args.threads_per_worker, job_ttl=args.job_ttl,
+                                   schedule=args.schedule, aging=args.aging, priorities=args.priority)
+    service.pool.set_callbacks(status_callback=lambda message: print(message, file=sys.stderr))
+    server = ThreadingHTTPServer((args.host, args.port), ServiceRequestHandler)
+    server.service = service
+    # SIGTERM (np. zatrzymanie usługi systemowej) kończy pracę jak Ctrl+C: procesy robocze i pliki są sprzątane
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    service.start()
+    print(f"Usługa transkrypcji nasłuchuje na http://{args.host}:{server.server_port} "
+          f"(model: {transcriber.model_name}, procesy: {args.workers})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
@@ -0,0 +1,302 @@
+import os
+import sys
+import time
+import signal
+import sqlite3
+import threading
+
+from auto_transcriber import (TranscriptionWorkerPool, JsonLinesExporter, PrometheusMetrics, CACHE_DIR,
+                              configure_transcriber, default_output_path, find_video_files, probe_duration,
+                              path_priority, format_duration)
+
+# Domyślna ścieżka trwałej kolejki zadań
+QUEUE_PATH = os.path.join(CACHE_DIR, "watch_queue.sqlite3")
+
+
+class JobQueue:
+    """Trwała kolejka plików do transkrypcji (SQLite), zachowywana między uruchomieniami demona
+    
+    Każdy plik ma jeden wiersz identyfikowany ścieżką; zmiana rozmiaru lub
+    czasu modyfikacji ponownie kolejkuje plik. Stany: pending -> running ->
+    done lub failed (skipped - plik miał już wszystkie pliki wyjściowe).
+    Zadania running przerwane zamknięciem demona wracają przy starcie do
+    pending. Kolejność pobierania ustala take() (priorytet, długość
+    nagrania, postarzanie jak w JobScheduler). Obiekt jest używany tylko z
+    wątku, który go utworzył.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            output TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            queued REAL NOT NULL,
+            finished REAL,
+            error TEXT,
+            duration REAL,
+            priority INTEGER NOT NULL DEFAULT 0
+        )
+    """
+    
+    # Kolumny dodane po pierwszej wersji schematu (uzupełniane w istniejących bazach)
+    ADDED_COLUMNS = {"duration": "REAL", "priority": "INTEGER NOT NULL DEFAULT 0"}
+    
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        with self.db:
+            self.db.execute(self.SCHEMA)
+            columns = {row[1] for row in self.db.execute("PRAGMA table_info(jobs)")}
+            for name, definition in self.ADDED_COLUMNS.items():
+                if name not in columns:
+                    self.db.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+            self.db.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+    
+    def close(self):
+        self.db.close()
+    
+    def enqueue(self, path, size, mtime_ns, output, skip=False, duration=None, priority=0):
+        """Dodaje plik nowy lub zmieniony od ostatniego dodania; zwraca True, jeśli trafił do kolejki
+        
+        Przy skip=True plik jest tylko zapamiętywany jako pominięty.
+        """
+        row = self.db.execute("SELECT size, mtime_ns FROM jobs WHERE path = ?", (path,)).fetchone()
+        if row == (size, mtime_ns):
+            return False
+        if row is None and skip:
+            status = "skipped"
+        else:
+            status = "pending"
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO jobs (path, size, mtime_ns, output, status, attempts, queued, duration, priority) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)",
+                (path, size, mtime_ns, output, status, time.time(), duration, priority)
+            )
+        return status == "pending"
+    
+    def take(self, limit, realtime_factor=0.0, aging=1.0):
+        """Zwraca do limit zadań [(ścieżka, plik wyjściowy, długość, priorytet)] i oznacza je jako running
+        
+        Najpierw wyższy priorytet, potem najmniejszy klucz długość *
+        realtime_factor + aging * czas dodania (realtime_factor=0 - kolejność dodania).
+        """
+        if limit <= 0:
+            return []
+        rows = self.db.execute(
+            "SELECT path, output, duration, priority FROM jobs WHERE status = 'pending' "
+            "ORDER BY priority DESC, COALESCE(duration, 0) * ? + ? * queued, queued LIMIT ?",
+            (realtime_factor, aging, limit)
+        ).fetchall()
+        with self.db:
+            self.db.executemany("UPDATE jobs SET status = 'running', attempts = attempts + 1 WHERE path = ?",
+                                [(row[0],) for row in rows])
+        return rows
+    
+    def set_duration(self, path, duration):
+        """Zapisuje długość nagrania (sekundy) odczytaną po dodaniu pliku"""
+        with self.db:
+            self.db.execute("UPDATE jobs SET duration = ? WHERE path = ?", (duration, path))
+    
+    def attempts(self, path):
+        row = self.db.execute("SELECT attempts FROM jobs WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else 0
+    
+    def finish(self, path, status, output=None, error=None):
+        """Zapisuje wynik zadania (done, failed lub pending - ponowienie)"""
+        with self.db:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, output = COALESCE(?, output), error = ?, finished = ? WHERE path = ?",
+                (status, output, error, time.time() if status != "pending" else None, path)
+            )
+    
+    def counts(self):
+        """Liczba zadań w poszczególnych stanach"""
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+class FolderWatcher:
+    """Wykrywa nowe i zmienione pliki wideo w katalogach przez okresowe skanowanie
+    
+    Plik jest uznawany za kompletny, gdy jego rozmiar i czas modyfikacji nie
+    zmieniły się przez settle sekund (kopiowanie lub nagrywanie zakończone).
+    Skanowanie nie wymaga dodatkowych bibliotek i działa także na udziałach
+    sieciowych, na których powiadomienia systemu plików bywają zawodne.
+    """
+    
+    def __init__(self, directories, settle=10.0):
+        self.directories = directories
+        self.settle = settle
+        self._seen = {}  # ścieżka -> (rozmiar, czas modyfikacji, od kiedy bez zmian)
+    
+    def scan(self, now=None):
+        """Zwraca [(ścieżka, rozmiar, mtime_ns)] niepustych plików niezmienionych od co najmniej settle sekund"""
+        now = time.monotonic() if now is None else now
+        stable = []
+        seen = {}
+        for path in find_video_files(self.directories):
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError:  # Plik usunięty lub przeniesiony w trakcie skanowania
+                continue
+            previous = self._seen.get(path)
+            since = previous[2] if previous and previous[:2] == (stat.st_size, stat.st_mtime_ns) else now
+            seen[path] = (stat.st_size, stat.st_mtime_ns, since)
+            if stat.st_size > 0 and now - since >= self.settle:
+                stable.append((path, stat.st_size, stat.st_mtime_ns))
+        self._seen = seen
+        return stable
+
+
+class WatchDaemon:
+    """Demon obserwujący katalogi: nowe pliki trafiają do JobQueue i są transkrybowane przez stałą pulę procesów
+    
+    Procesy robocze ładują model raz przy starcie i trzymają go w pamięci
+    przez cały czas działania. Pliki wyjściowe są zapisywane obok pliku
+    źródłowego (lub w output_dir) jak w trybie wsadowym; pliki, dla których
+    istnieją już wszystkie formaty wyjściowe, są pomijane (chyba że
+    overwrite). Nieudane zadania są ponawiane do max_attempts razy.
+    Przy schedule="shortest" krótsze nagrania wyprzedzają dłuższe (z
+    postarzaniem aging), a pliki pasujące do wzorców priorities - wszystkie.
+    """
+    
+    def __init__(self, transcriber, directories, queue, workers=1, threads_per_worker=None, output_dir=None,
+                 overwrite=False, interval=5.0, settle=10.0, max_attempts=3, schedule="shortest", aging=1.0,
+                 priorities=()):
+        self.transcriber = transcriber
+        self.queue = queue
+        self.watcher = FolderWatcher(directories, settle)
+        self.output_dir = output_dir
+        self.overwrite = overwrite
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.aging = aging
+        self.priorities = list(priorities)
+        self.pool = TranscriptionWorkerPool(
+            workers=workers,
+            model_name=transcriber.model_name,
+            language=transcriber.language,
+            audio_mode=transcriber.audio_mode,
+            threads_per_worker=threads_per_worker,
+            settings=transcriber.export_settings(),
+            schedule=schedule,
+            aging=aging
+        )
+        for hook in transcriber.event_hooks:
+            self.pool.add_event_hook(hook)
+        self.running = {}  # Future -> ścieżka pliku źródłowego
+        self._wake = threading.Event()
+        self._stopping = False
+    
+    def stop(self):
+        """Kończy pętlę run() (bezpieczne z obsługi sygnału i innych wątków)"""
+        self._stopping = True
+        self._wake.set()
+    
+    def run(self):
+        """Pętla demona: skanowanie, kolejkowanie i zlecanie zadań aż do stop()"""
+        self.pool.start()
+        counts = self.queue.counts()
+        self.transcriber.update_status(f"Obserwowane katalogi: {', '.join(self.watcher.directories)} "
+                                       f"(oczekujące zadania: {counts.get('pending', 0)})")
+        try:
+            while not self._stopping:
+                self.poll()
+                self._wake.wait(self.interval)
+                self._wake.clear()
+        finally:
+            # Zadania przerwane w trakcie pozostają w stanie running i wracają do kolejki przy kolejnym starcie
+            self.pool.shutdown(wait=False)
+    
+    def poll(self):
+        """Jeden obieg: nowe stabilne pliki do kolejki, wyniki zakończonych zadań, zlecenie kolejnych"""
+        for path, size, mtime_ns in self.watcher.scan():
+            output_file = default_output_path(path, self.output_dir)
+            outputs = self.transcriber.output_paths(output_file).values()
+            skip = not self.overwrite and all(os.path.exists(output) for output in outputs)
+            if self.queue.enqueue(path, size, mtime_ns, output_file, skip=skip, priority=path_priority(path, self.priorities)):
+                duration = probe_duration(path) if self.pool.schedule == "shortest" else None
+                if duration is not None:
+                    self.queue.set_duration(path, duration)
+                    self.transcriber.update_status(f"Nowy plik w kolejce: {path} ({format_duration(duration)})")
+                else:
+                    self.transcriber.update_status(f"Nowy plik w kolejce: {path}")
+        
+        self._collect()
+        
+        # Procesy robocze mają zawsze zadanie w zapasie, więc nie czekają na kolejny obieg
+        jobs = self.queue.take(self.pool.workers * 2 - len(self.running), self.pool.estimate_cost(1.0), self.aging)
+        for path, output_file, duration, priority in jobs:
+            if self.output_dir:
+                os.makedirs(self.output_dir, exist_ok=True)
+            future = self.pool.submit_video(path, output_file, priority, duration)
+            future.add_done_callback(lambda _future: self._wake.set())
+            self.running[future] = path
+    
+    def _collect(self):
+        """Zapisuje w kolejce wyniki zakończonych zadań"""
+        for future, path in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[future]
+            try:
+                result = future.result()
+                error = None if result else "anulowano"
+            except Exception as e:
+                result = None
+                error = str(e)
+            if result:
+                self.queue.finish(path, "done", output=result)
+                self.transcriber.update_status(f"Gotowe: {path} -> {result}")
+            elif self.queue.attempts(path) < self.max_attempts:
+                self.queue.finish(path, "pending", error=error)
+                self.transcriber.update_status(f"Błąd przetwarzania {path} (zadanie zostanie ponowione): {error}")
+            else:
+                self.queue.finish(path, "failed", error=error)
+                self.transcriber.update_status(f"Błąd przetwarzania {path}: {error}")
+
+
+def run_watch(args):
+    """Obsługa polecenia `watch`"""
+    transcriber = configure_transcriber(args)
+    if transcriber is None:
+        return 2
+    if not transcriber.set_output_formats(args.formats):
+        print(f"Nieznany format wyjściowy: {', '.join(args.formats)}", file=sys.stderr)
+        return 2
+    transcriber.set_checkpointing(args.resume)
+    directories = [path for path in args.directories if os.path.isdir(path)]
+    if len(directories) != len(args.directories):
+        print("Obserwować można tylko istniejące katalogi", file=sys.stderr)
+        return 2
+    
+    events = None
+    if args.events:
+        events = JsonLinesExporter(sys.stderr if args.events == "-" else args.events)
+        transcriber.add_event_hook(events)
+    if args.metrics:
+        transcriber.add_event_hook(PrometheusMetrics(args.metrics))
+    
+    queue = JobQueue(args.queue or QUEUE_PATH)
+    daemon = WatchDaemon(transcriber, directories, queue, workers=max(1, args.workers),
+                         threads_per_worker=args.threads_per_worker, output_dir=args.output_dir,
+                         overwrite=args.overwrite, interval=args.interval, settle=args.settle,
+                         max_attempts=args.max_attempts, schedule=args.schedule, aging=args.aging,
+                         priorities=args.priority)
+    daemon.pool.set_callbacks(status_callback=lambda message: print(message, file=sys.stderr))
+    # SIGTERM (np. zatrzymanie usługi systemowej) kończy pracę jak Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.close()
+        if events:
+            events.close()
+    return 0
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Moduły programu leżą w katalogu głównym repozytorium
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_transcriber import SAMPLE_RATE, Transcriber
+
+
+@pytest.fixture
+def speech_audio():
+    """Tworzy syntetyczne nagranie: lista (czy mowa, sekundy) -> tablica float32 16 kHz
+    
+    Mowę udaje szum o stałej głośności, cisza to zera, więc fragmenty mowy
+    wykrywane przez detect_speech_regions (i FakeBackend) są powtarzalne.
+    """
+    def make(pattern, seed=0):
+        rng = np.random.default_rng(seed)
+        parts = []
+        for speech, seconds in pattern:
+            samples = int(seconds * SAMPLE_RATE)
+            parts.append(rng.standard_normal(samples) * 0.3 if speech else np.zeros(samples))
+        return np.concatenate(parts).astype(np.float32)
+    return make
+
+
+@pytest.fixture
+def transcriber():
+    """Transcriber z silnikiem testowym (bez pobierania modelu)"""
+    transcriber = Transcriber()
+    transcriber.set_backend("fake")
+    transcriber.set_model("tiny")
+    yield transcriber
+    transcriber.close()
+
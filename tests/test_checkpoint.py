@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from auto_transcriber import JobCheckpoint
+
+PATTERN = [(False, 1), (True, 8), (False, 2), (True, 8), (False, 2), (True, 8), (False, 2), (True, 8), (False, 1)]
+
+
+def read_cues(path):
+    """Czasy napisów (start, end) z pliku SRT"""
+    with open(path, encoding="utf-8") as f:
+        return [line.split(" --> ") for line in f.read().splitlines() if " --> " in line]
+
+
+@pytest.fixture
+def job(tmp_path, transcriber):
+    """Plik źródłowy (tylko jego rozmiar i czas modyfikacji trafiają do stanu) i ścieżka wyniku"""
+    source = tmp_path / "film.mp4"
+    source.write_bytes(b"wideo")
+    transcriber.set_checkpointing(True)
+    transcriber.set_streaming(True, 10)
+    return str(source), str(tmp_path / "film.srt")
+
+
+def test_interrupted_job_resumes_from_checkpoint(transcriber, speech_audio, job, tmp_path):
+    source, output_file = job
+    audio = speech_audio(PATTERN)
+    reference = str(tmp_path / "reference.srt")
+    transcriber.stream_to_srt(audio, reference, transcriber.job_checkpoint(source, reference))
+    
+    # Anulowanie w połowie: częściowy plik i stan zadania pozostają na dysku
+    transcriber.set_callbacks(progress_callback=lambda progress: transcriber.cancel() if progress >= 50 else None)
+    assert transcriber.stream_to_srt(audio, output_file, transcriber.job_checkpoint(source, output_file)) is None
+    assert not os.path.exists(output_file)
+    with open(f"{output_file}.checkpoint.json", encoding="utf-8") as f:
+        state = json.load(f)
+    assert 0 < state["offset"] < len(audio) / 16000
+    assert len(read_cues(f"{output_file}.part")) >= len(state["segments"]) > 0
+    
+    transcriber.reset_cancel()
+    transcriber.set_callbacks()
+    checkpoint = transcriber.job_checkpoint(source, output_file)
+    assert checkpoint.offset == state["offset"]
+    assert transcriber.stream_to_srt(audio, output_file, checkpoint) == output_file
+    
+    # Wznowiony wynik ma te same napisy co przebieg bez przerwy, a stan zadania jest usuwany
+    assert read_cues(output_file) == read_cues(reference)
+    assert sorted(os.listdir(tmp_path)) == ["film.mp4", "film.srt", "reference.srt"]
+
+
+def test_checkpoint_is_ignored_after_settings_change(transcriber, job):
+    source, output_file = job
+    checkpoint = transcriber.job_checkpoint(source, output_file)
+    checkpoint.segments = [{"start": 0.0, "end": 1.0, "text": "a"}]
+    checkpoint.save(5.0, "a")
+    
+    assert transcriber.job_checkpoint(source, output_file).offset == 5.0
+    transcriber.set_model("base")
+    assert transcriber.job_checkpoint(source, output_file).offset == 0.0
+
+
+def test_checkpoint_is_ignored_after_source_change(transcriber, job):
+    source, output_file = job
+    transcriber.job_checkpoint(source, output_file).save(5.0, "")
+    with open(source, "ab") as f:
+        f.write(b" zmienione")
+    assert transcriber.job_checkpoint(source, output_file).offset == 0.0
+
+
+def test_damaged_checkpoint_is_ignored(tmp_path):
+    output_file = str(tmp_path / "film.srt")
+    with open(f"{output_file}.checkpoint.json", "w", encoding="utf-8") as f:
+        f.write("{niepełny")
+    assert not JobCheckpoint(output_file, {}).load()
@@ -0,0 +1,66 @@
+import pytest
+
+from auto_transcriber import SAMPLE_RATE, merge_chunk_segments, split_audio_chunks
+
+PATTERN = [(False, 1), (True, 3), (False, 4), (True, 6), (False, 2), (True, 2), (False, 5)]
+
+
+def speech_spans(transcription):
+    """Łączy przylegające segmenty w ciągłe przedziały mowy"""
+    spans = []
+    for segment in transcription:
+        if spans and segment["start"] - spans[-1][1] < 0.05:
+            spans[-1][1] = segment["end"]
+        else:
+            spans.append([segment["start"], segment["end"]])
+    return spans
+
+
+def test_split_covers_whole_recording(speech_audio):
+    audio = speech_audio(PATTERN)
+    chunks = split_audio_chunks(audio, chunk_length=6, overlap=1)
+    
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(audio)
+    assert chunks[0][2] == 0.0 and chunks[-1][3] == float("inf")
+    for (start, end, _keep_from, keep_to), (next_start, _next_end, next_keep_from, _next_keep_to) in zip(chunks, chunks[1:]):
+        # Przedziały zachowywanych segmentów stykają się, a fragmenty zachodzą na siebie
+        assert keep_to == next_keep_from
+        assert next_start < end
+        assert end - start <= (6 + 1) * SAMPLE_RATE
+
+
+def test_short_recording_is_one_chunk(speech_audio):
+    audio = speech_audio([(True, 3)])
+    assert split_audio_chunks(audio, chunk_length=6) == [(0, len(audio), 0.0, float("inf"))]
+
+
+def test_merge_drops_overlap_duplicates_and_trims():
+    chunks = [(0, 10 * SAMPLE_RATE, 0.0, 9.0), (8 * SAMPLE_RATE, 20 * SAMPLE_RATE, 9.0, float("inf"))]
+    chunk_segments = [
+        [{"start": 1.0, "end": 4.0, "text": " A "}, {"start": 8.0, "end": 9.8, "text": "C"},
+         {"start": 9.2, "end": 9.9, "text": "X"}],
+        # Czasy względem początku drugiego fragmentu (8 s)
+        [{"start": 0.6, "end": 1.6, "text": "C"}, {"start": 1.4, "end": 3.0, "text": "D"},
+         {"start": 4.0, "end": 5.0, "text": " "}]
+    ]
+    
+    merged = merge_chunk_segments(chunks, chunk_segments)
+    
+    # X ma środek poza przedziałem pierwszego fragmentu, powtórzone C z zakładki jest pomijane,
+    # D zaczynające się przed końcem C jest przycinane, a pusty tekst odrzucany
+    assert [segment["text"] for segment in merged] == ["A", "C", "D"]
+    assert [(segment["start"], segment["end"]) for segment in merged] == [(1.0, 4.0), (8.0, 9.8), (9.8, 11.0)]
+
+
+def test_chunked_transcription_matches_whole(transcriber, speech_audio):
+    audio = speech_audio(PATTERN)
+    whole = transcriber.transcribe_audio(audio)
+    transcriber.set_chunking(6, 1)
+    chunked = transcriber.transcribe_audio(audio)
+    
+    assert chunked
+    assert all(a["end"] <= b["start"] for a, b in zip(chunked, chunked[1:]))
+    assert len(speech_spans(chunked)) == len(speech_spans(whole))
+    for chunked_span, whole_span in zip(speech_spans(chunked), speech_spans(whole)):
+        assert chunked_span == pytest.approx(whole_span, abs=0.05)
@@ -0,0 +1,78 @@
+import json
+import os
+
+from auto_transcriber import EXPORTERS, SrtStreamWriter, format_timestamp
+
+TRANSCRIPTION = [
+    {"start": 0.5, "end": 2.25, "text": "Ala ma\tkota"},
+    {"start": 3661.25, "end": 3662.5, "text": "Drugi"}
+]
+
+
+def test_format_timestamp():
+    assert format_timestamp(0) == "00:00:00,000"
+    assert format_timestamp(3661.25) == "01:01:01,250"
+    assert format_timestamp(59.9999, ".") == "00:01:00.000"
+    assert format_timestamp(-1) == "00:00:00,000"
+
+
+def test_srt():
+    assert EXPORTERS["srt"].format(TRANSCRIPTION) == (
+        "1\n00:00:00,500 --> 00:00:02,250\nAla ma\tkota\n\n"
+        "2\n01:01:01,250 --> 01:01:02,500\nDrugi\n\n"
+    )
+
+
+def test_vtt():
+    assert EXPORTERS["vtt"].format(TRANSCRIPTION) == (
+        "WEBVTT\n\n"
+        "00:00:00.500 --> 00:00:02.250\nAla ma\tkota\n\n"
+        "01:01:01.250 --> 01:01:02.500\nDrugi\n\n"
+    )
+
+
+def test_txt_and_tsv():
+    assert EXPORTERS["txt"].format(TRANSCRIPTION) == "Ala ma\tkota\nDrugi\n"
+    # Tabulator w tekście zastępowany spacją, czasy w milisekundach
+    assert EXPORTERS["tsv"].format(TRANSCRIPTION) == "start\tend\ttext\n500\t2250\tAla ma kota\n3661250\t3662500\tDrugi\n"
+
+
+def test_json_includes_metadata():
+    data = json.loads(EXPORTERS["json"].format(TRANSCRIPTION, {"model": "tiny", "language": "pl"}))
+    assert data["model"] == "tiny" and data["language"] == "pl"
+    assert [segment["id"] for segment in data["segments"]] == [1, 2]
+    assert data["segments"][1]["start"] == 3661.25
+
+
+def test_write_outputs_all_formats_in_one_pass(transcriber, tmp_path):
+    assert transcriber.set_output_formats(["srt", "vtt", "txt", "json", "tsv"])
+    assert not transcriber.set_output_formats(["srt", "docx"])
+    output_file = str(tmp_path / "film.napisy")
+    
+    paths = transcriber.write_outputs(TRANSCRIPTION, output_file)
+    
+    # SRT ma dokładnie podaną ścieżkę, pozostałe formaty leżą obok z własnym rozszerzeniem
+    assert paths == [output_file] + [str(tmp_path / f"film.{extension}") for extension in ("vtt", "txt", "json", "tsv")]
+    for name, path in zip(["srt", "vtt", "txt", "json", "tsv"], paths):
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == transcriber.format_transcription(TRANSCRIPTION, name)
+    with open(paths[3], encoding="utf-8") as f:
+        assert json.load(f)["backend"] == "fake"
+
+
+def test_stream_writer_finalize_and_abort(tmp_path):
+    output_file = str(tmp_path / "stream.srt")
+    writer = SrtStreamWriter(output_file)
+    for segment in TRANSCRIPTION:
+        writer.write(segment)
+    assert not os.path.exists(output_file)
+    writer.finalize()
+    with open(output_file, encoding="utf-8") as f:
+        assert f.read() == EXPORTERS["srt"].format(TRANSCRIPTION)
+    
+    aborted = SrtStreamWriter(str(tmp_path / "aborted.srt"))
+    aborted.write(TRANSCRIPTION[0])
+    aborted.abort(keep_partial=True)
+    assert os.path.exists(aborted.part_file)
+    aborted.abort()
+    assert os.listdir(tmp_path) == ["stream.srt"]
@@ -0,0 +1,37 @@
+from auto_transcriber import JobScheduler
+
+
+def drain(scheduler):
+    return [scheduler.pop() for _ in range(len(scheduler))]
+
+
+def test_shortest_job_first_without_aging():
+    scheduler = JobScheduler(aging=0.0)
+    scheduler.push("long", cost=100.0, queued=0.0)
+    scheduler.push("short", cost=10.0, queued=95.0)
+    scheduler.push("medium", cost=50.0, queued=50.0)
+    assert drain(scheduler) == ["short", "medium", "long"]
+
+
+def test_aging_lets_waiting_job_overtake():
+    # Klucz koszt + aging * czas dodania: long 100 + 0, short 10 + 95
+    scheduler = JobScheduler(aging=1.0)
+    scheduler.push("long", cost=100.0, queued=0.0)
+    scheduler.push("short", cost=10.0, queued=95.0)
+    scheduler.push("fresh", cost=10.0, queued=80.0)
+    assert drain(scheduler) == ["fresh", "long", "short"]
+
+
+def test_priority_beats_cost_and_age():
+    scheduler = JobScheduler(aging=1.0)
+    scheduler.push("old", cost=0.0, queued=0.0)
+    scheduler.push("urgent", cost=1000.0, priority=1, queued=100.0)
+    assert drain(scheduler) == ["urgent", "old"]
+
+
+def test_equal_keys_keep_submission_order():
+    scheduler = JobScheduler(aging=0.0)
+    for name in ("a", "b", "c"):
+        scheduler.push(name, queued=0.0)
+    assert drain(scheduler) == ["a", "b", "c"]
+    assert len(scheduler) == 0
@@ -0,0 +1,148 @@
+import http.client
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import wave
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from auto_transcriber_server import ServiceRequestHandler, TranscriptionService, job_settings_error
+
+
+@pytest.fixture
+def make_server(transcriber):
+    """Uruchamia serwer HTTP usługi na wolnym porcie; zwraca (usługa, port)"""
+    started = []
+    
+    def make(**options):
+        service = TranscriptionService(transcriber, **{"schedule": "fifo", **options})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ServiceRequestHandler)
+        server.service = service
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append(server)
+        return service, server.server_port
+    
+    yield make
+    for server in started:
+        server.shutdown()
+        server.server_close()
+        server.service.shutdown()
+
+
+def request(port, method, path, body=None, headers=None):
+    """Wysyła żądanie i zwraca (status, odpowiedź JSON)"""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        connection.close()
+
+
+def post_json(port, payload):
+    return request(port, "POST", "/jobs", json.dumps(payload), {"Content-Type": "application/json"})
+
+
+def test_job_settings_error():
+    assert job_settings_error({}) is None
+    assert job_settings_error({"language": "pl", "vad": True}) is None
+    assert "xx" in job_settings_error({"language": "xx"})
+    assert job_settings_error({"vad": "tak"}) is not None
+    assert job_settings_error({"vad": 1}) is not None
+
+
+@pytest.mark.parametrize("body", [
+    b"{niepoprawny",
+    b"[\"film.mp4\"]",
+    b"{\"path\": \"/nie/ma/takiego/pliku.mp4\"}",
+])
+def test_invalid_json_requests(make_server, body):
+    service, port = make_server()
+    status, response = request(port, "POST", "/jobs", body, {"Content-Type": "application/json"})
+    assert status == 400 and response["error"]
+    assert service.pool.queue_length() == 0
+
+
+@pytest.mark.parametrize("settings", [{"language": "xx"}, {"vad": "tak"}, {"priority": "wysoki"}])
+def test_invalid_job_settings(make_server, tmp_path, settings):
+    source = tmp_path / "film.mp4"
+    source.write_bytes(b"wideo")
+    service, port = make_server()
+    status, response = post_json(port, {"path": str(source), **settings})
+    assert status == 400 and response["error"]
+    assert service.jobs == {}
+
+
+def test_content_length_validation(make_server):
+    service, port = make_server()
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.putrequest("POST", "/jobs?filename=film.mp4")
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 411
+    connection.close()
+    
+    status, _response = request(port, "POST", "/jobs?filename=film.mp4", b"", {"Content-Length": "sto"})
+    assert status == 400
+
+
+def test_rejected_uploads_are_removed(make_server):
+    service, port = make_server()
+    status, _response = request(port, "POST", "/jobs?filename=film.mp4&language=xx", b"wideo")
+    assert status == 400
+    
+    # Połączenie zamknięte przed przesłaniem zapowiedzianej liczby bajtów
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as client:
+        client.sendall(b"POST /jobs?filename=film.mp4 HTTP/1.1\r\nHost: test\r\nContent-Length: 100\r\n\r\nwideo")
+        client.shutdown(socket.SHUT_WR)
+        response = b""
+        while chunk := client.recv(4096):
+            response += chunk
+    assert response.startswith(b"HTTP/1.0 400")
+    assert "niekompletny" in json.loads(response.split(b"\r\n\r\n", 1)[1])["error"]
+    assert os.listdir(service.upload_dir) == []
+
+
+def test_full_queue(make_server, tmp_path):
+    source = tmp_path / "film.mp4"
+    source.write_bytes(b"wideo")
+    service, port = make_server(max_queue=0)
+    status, response = post_json(port, {"path": str(source)})
+    assert status == 503 and response["error"]
+    status, _response = request(port, "POST", "/jobs?filename=film.mp4", b"wideo")
+    assert status == 503
+    assert os.listdir(service.upload_dir) == []
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="wymaga ffmpeg")
+def test_uploaded_job_is_transcribed(make_server, speech_audio, tmp_path):
+    source = str(tmp_path / "nagranie.wav")
+    audio = speech_audio([(False, 1), (True, 3), (False, 1)])
+    with wave.open(source, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+    service, port = make_server()
+    with open(source, "rb") as f:
+        status, job = request(port, "POST", "/jobs?filename=nagranie.wav&language=pl", f.read())
+    assert status == 202 and job["status"] in ("queued", "running")
+    
+    deadline = time.time() + 120
+    while job["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.2)
+        _status, job = request(port, "GET", f"/jobs/{job['id']}")
+    assert job["status"] == "done"
+    
+    status, result = request(port, "GET", f"/jobs/{job['id']}/result?format=json")
+    assert status == 200
+    assert [segment["text"] for segment in result["segments"]] == ["Segment 1 (pl, 00:00:00)"]
+    assert result["segments"][0]["start"] == pytest.approx(0.8, abs=0.05)
+    # Przesłany plik jest usuwany po zakończeniu zadania
+    assert os.listdir(service.upload_dir) == []
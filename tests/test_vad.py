@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from auto_transcriber import (SAMPLE_RATE, compact_speech, detect_speech_regions, map_segments_to_original,
+                              map_time_to_original)
+
+
+def test_detect_speech_regions(speech_audio):
+    audio = speech_audio([(False, 1), (True, 3), (False, 4), (True, 2), (False, 1)])
+    regions = [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in detect_speech_regions(audio)]
+    
+    # Granice przesunięte o margines padding=0.2 s
+    assert len(regions) == 2
+    assert regions[0] == pytest.approx((0.8, 4.2), abs=0.05)
+    assert regions[1] == pytest.approx((7.8, 10.2), abs=0.05)
+
+
+def test_silence_has_no_speech():
+    assert detect_speech_regions(np.zeros(5 * SAMPLE_RATE, dtype=np.float32)) == []
+
+
+def test_compact_speech_map():
+    audio = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+    regions = [(1 * SAMPLE_RATE, 3 * SAMPLE_RATE), (6 * SAMPLE_RATE, 7 * SAMPLE_RATE)]
+    
+    compacted, speech_map = compact_speech(audio, regions, gap=0.5)
+    
+    assert len(compacted) == int(3.5 * SAMPLE_RATE)
+    assert speech_map == [(0.0, 1.0, 2.0), (2.5, 6.0, 1.0)]
+    assert compacted[int(2.5 * SAMPLE_RATE)] == audio[6 * SAMPLE_RATE]
+    
+    assert map_time_to_original(0.5, speech_map) == pytest.approx(1.5)
+    assert map_time_to_original(3.0, speech_map) == pytest.approx(6.5)
+    # Czas w sztucznej przerwie jest przypisywany do końca poprzedniego fragmentu
+    assert map_time_to_original(2.2, speech_map) == pytest.approx(3.0)
+    
+    mapped = map_segments_to_original([{"start": 0.2, "end": 1.8, "text": "a", "words": []}], speech_map)
+    assert mapped == [{"start": pytest.approx(1.2), "end": pytest.approx(2.8), "text": "a", "words": []}]
+
+
+def test_vad_transcription_uses_original_timeline(transcriber, speech_audio):
+    audio = speech_audio([(False, 1), (True, 3), (False, 4), (True, 6), (False, 2), (True, 2), (False, 5)])
+    regions = [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in detect_speech_regions(audio)]
+    whole = transcriber.transcribe_audio(audio)
+    
+    decoded = []
+    transcriber.set_callbacks(progress_details_callback=lambda progress, details: decoded.append(details["duration"]))
+    transcriber.set_vad(True)
+    with_vad = transcriber.transcribe_audio(audio)
+    
+    # Model dostaje tylko sklejoną mowę, a czasy segmentów wracają na oś oryginału
+    assert decoded[-1] < sum(end - start for start, end in regions) + 1.0 < len(audio) / SAMPLE_RATE
+    assert with_vad[0]["start"] == pytest.approx(whole[0]["start"], abs=0.05)
+    assert with_vad[-1]["end"] == pytest.approx(whole[-1]["end"], abs=0.05)
+    for segment in with_vad:
+        for time in (segment["start"], segment["end"]):
+            assert any(start - 0.05 <= time <= end + 0.05 for start, end in regions)